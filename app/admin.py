@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 from sqladmin import Admin, ModelView
 from app.config import settings
+from app.database.database import install_sqlite_pragmas
 from app.models.users import UserModel
 from app.models.roles import RoleModel
 from app.models.flight import FlightModel, AirportModel
@@ -24,6 +25,7 @@ engine = create_engine(
     echo=False,
     connect_args={"check_same_thread": False} if 'sqlite' in db_url else {}
 )
+install_sqlite_pragmas(engine)
 
 
 class UserAdmin(ModelView, model=UserModel):
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from starlette.responses import Response
 
-from app.api.dependencies import DBDep, UserIdDep
+from app.api.dependencies import DBDep, ReadDBDep, UserIdDep
 from app.exceptions.auth import (
     UserAlreadyExistsError,
     UserAlreadyExistsHTTPError,
@@ -9,6 +9,8 @@ from app.exceptions.auth import (
     UserNotFoundHTTPError,
     InvalidPasswordError,
     InvalidPasswordHTTPError,
+    PasswordHasherBusyError,
+    PasswordHasherBusyHTTPError,
 )
 from app.schemes.users import SUserAddRequest, SUserAuth
 from app.schemes.relations_users_roles import SUserGetWithRels
@@ -26,12 +28,15 @@ async def register_user(
         await AuthService(db).register_user(user_data)
     except UserAlreadyExistsError:
         raise UserAlreadyExistsHTTPError
+    except PasswordHasherBusyError:
+        raise PasswordHasherBusyHTTPError
     return {"status": "OK"}
 
 
 @router.post("/login", summary="Аутентификация пользователя")
 async def login_user(
-    db: DBDep,
+    # Только чтение: иначе BEGIN IMMEDIATE занял бы блокировку записи
+    db: ReadDBDep,
     response: Response,
     user_data: SUserAuth,
 ) -> dict[str, str]:
@@ -41,12 +46,14 @@ async def login_user(
         raise UserNotFoundHTTPError
     except InvalidPasswordError:
         raise InvalidPasswordHTTPError
+    except PasswordHasherBusyError:
+        raise PasswordHasherBusyHTTPError
     response.set_cookie("access_token", access_token)
     return {"access_token": access_token}
 
 
 @router.get("/me", summary="Получение текущего пользователя для профиля")
-async def get_me(db: DBDep, user_id: UserIdDep) -> SUserGetWithRels | None:
+async def get_me(db: ReadDBDep, user_id: UserIdDep) -> SUserGetWithRels | None:
     try:
         user: None | SUserGetWithRels = await AuthService(db).get_me(user_id)
     except UserNotFoundError:
@@ -1,118 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.db_manager import get_db_session
-from app.repositories.booking_repository import BookingRepository
-from app.repositories.flight_repository import FlightRepository
-from app.models.booking import BookingStatus, BookingModel
-from app.schemes.bookings import BookingCreate, BookingRead, BookingListRead
-import random
-import string
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.api.dependencies import DBDep, ReadDBDep
+from app.database.database import is_database_busy
+from app.exceptions.base import DatabaseBusyHTTPError
+from app.models.booking import BookingStatus
+from app.schemes.bookings import (
+    BookingBatchCreate,
+    BookingBatchItemResult,
+    BookingBatchRead,
+    BookingCreate,
+    BookingListRead,
+    BookingRead,
+)
+from app.services.booking_service import BookingService
+from app.utils.responses import rows_response
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
 
-def generate_booking_number() -> str:
-    """Generate unique booking number"""
-    return "BK" + "".join(random.choices(string.digits, k=8))
-
-
 @router.get("/", response_model=list[BookingListRead])
 async def get_all_bookings(
-    db_session: AsyncSession = Depends(get_db_session),
+    db: ReadDBDep,
+    status: BookingStatus | None = Query(None),
+    flight_id: int | None = Query(None),
+    user_id: int | None = Query(None),
+    date_from: datetime | None = Query(None, description="created_at >= date_from"),
+    date_to: datetime | None = Query(None, description="created_at < date_to"),
+    sort: Literal[
+        "id", "-id", "created_at", "-created_at", "total_price", "-total_price"
+    ] = Query("id"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
 ):
-    """Get all bookings"""
+    """Get a page of bookings (filters, sorting; next page offset in X-Next-Offset)"""
     try:
-        logger.info("[Bookings GET] Fetching all bookings")
-        booking_repo = BookingRepository(db_session)
-        bookings = await booking_repo.get_all_bookings()
-        logger.info(f"[Bookings GET] Found {len(bookings)} bookings")
-        return bookings
+        logger.debug("[Bookings GET] Fetching bookings page")
+        bookings, next_offset = await BookingService(db).list_bookings(
+            limit,
+            offset,
+            sort=sort,
+            status=status,
+            flight_id=flight_id,
+            user_id=user_id,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        headers = {"X-Next-Offset": str(next_offset)} if next_offset is not None else None
+        logger.debug("[Bookings GET] Found %d bookings", len(bookings))
+        # Колонки запроса = поля BookingListRead: строки сразу в JSON
+        return rows_response(bookings, headers)
     except Exception as e:
-        logger.error(f"[Bookings GET] Error: {str(e)}", exc_info=True)
+        logger.error("[Bookings GET] Error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
 @router.post("/", response_model=BookingRead, status_code=201)
 async def create_booking(
     booking_data: BookingCreate,
-    db_session: AsyncSession = Depends(get_db_session),
+    db: DBDep,
 ):
     """Create a new booking"""
-    logger.info(f"[Bookings POST] Starting creation")
-    logger.info(f"[Bookings POST] Data received: {booking_data.dict()}")
-    
+    # Тело брони (имя, email, телефон) не логируем: это персональные данные
     try:
-        # Get repositories
-        booking_repo = BookingRepository(db_session)
-        flight_repo = FlightRepository(db_session)
-        
-        # Validate flight
-        logger.info(f"[Bookings POST] Checking flight {booking_data.flight_id}")
-        flight = await flight_repo.get_flight_by_id(booking_data.flight_id)
-        if not flight:
-            logger.error(f"[Bookings POST] Flight not found: {booking_data.flight_id}")
-            raise HTTPException(status_code=400, detail="Flight not found")
-        
-        logger.info(f"[Bookings POST] Flight found: {flight.flight_number}")
-        logger.info(f"[Bookings POST] Available seats: {flight.available_seats}, Requested: {booking_data.seats_count}")
-        
-        # Check seats
-        if flight.available_seats < booking_data.seats_count:
-            logger.error(f"[Bookings POST] Not enough seats")
-            raise HTTPException(status_code=400, detail="Not enough available seats")
-        
-        # Create booking
-        booking_number = generate_booking_number()
-        total_price = flight.price * booking_data.seats_count
-        
-        logger.info(f"[Bookings POST] Creating booking number: {booking_number}")
-        logger.info(f"[Bookings POST] Total price: {total_price}")
-        
-        booking_dict = {
-            "user_id": 1,
-            "flight_id": booking_data.flight_id,
-            "booking_number": booking_number,
-            "passenger_name": booking_data.passenger_name,
-            "passenger_email": booking_data.passenger_email,
-            "passenger_phone": booking_data.passenger_phone,
-            "seats_count": booking_data.seats_count,
-            "total_price": total_price,
-            "status": BookingStatus.PENDING,
-        }
-        
-        booking = await booking_repo.create_booking(booking_dict)
-        logger.info(f"[Bookings POST] Booking created: id={booking.id}")
-        
-        # Update flight seats
-        logger.info(f"[Bookings POST] Updating flight seats")
-        new_available = flight.available_seats - booking_data.seats_count
-        await flight_repo.update_flight(
-            booking_data.flight_id,
-            {"available_seats": new_available},
-        )
-        logger.info(f"[Bookings POST] Flight updated")
-        
-        logger.info(f"[Bookings POST] Success! Booking: {booking.booking_number}")
+        # Seats are reserved with one conditional UPDATE in the booking transaction
+        service = BookingService(db)
+        booking = await service.create_booking(user_id=1, booking_data=booking_data)
+        logger.debug("[Bookings POST] Success! Booking: %s", booking.booking_number)
         return booking
         
-    except HTTPException:
-        raise
+    except ValueError as e:
+        logger.error("[Bookings POST] Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        if is_database_busy(e):
+            logger.warning("[Bookings POST] Database is busy: %s", e)
+            raise DatabaseBusyHTTPError
+        logger.error("[Bookings POST] Error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.post("/batch", response_model=BookingBatchRead, status_code=201)
+async def create_bookings_batch(
+    batch: BookingBatchCreate,
+    response: Response,
+    db: DBDep,
+):
+    """Create many bookings in one transaction (group / agency reservations)"""
+    logger.debug("[Bookings BATCH] %d items, mode=%s", len(batch.items), batch.mode)
+    try:
+        results = await BookingService(db).create_bookings_batch(
+            user_id=1,
+            items=batch.items,
+            all_or_nothing=batch.mode == "all_or_nothing",
+        )
+    except ValueError as e:
+        logger.error("[Bookings BATCH] Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"[Bookings POST] Error: {str(e)}", exc_info=True)
+        if is_database_busy(e):
+            logger.warning("[Bookings BATCH] Database is busy: %s", e)
+            raise DatabaseBusyHTTPError
+        logger.error("[Bookings BATCH] Error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+    created = sum(1 for booking, _ in results if booking is not None)
+    if batch.mode == "all_or_nothing" and created < len(results):
+        response.status_code = 409
+    return BookingBatchRead(
+        mode=batch.mode,
+        created=created,
+        failed=len(results) - created,
+        results=[
+            BookingBatchItemResult(
+                index=index,
+                success=booking is not None,
+                booking=BookingRead.model_validate(booking) if booking is not None else None,
+                error=error,
+            )
+            for index, (booking, error) in enumerate(results)
+        ],
+    )
+
 
 @router.get("/{booking_id}", response_model=BookingRead)
 async def get_booking(
     booking_id: int,
-    db_session: AsyncSession = Depends(get_db_session),
+    db: ReadDBDep,
 ):
     """Get booking by ID"""
     try:
-        booking_repo = BookingRepository(db_session)
-        booking = await booking_repo.get_booking_by_id(booking_id)
+        booking = await db.bookings.get_booking_by_id(booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
         return booking
@@ -125,49 +145,30 @@ async def get_booking(
 @router.delete("/{booking_id}", status_code=200)
 async def delete_booking(
     booking_id: int,
+    db: DBDep,
     is_admin: bool = False,
-    db_session: AsyncSession = Depends(get_db_session),
 ):
     """Delete a booking by ID (Admin only)"""
-    logger.info(f"[Bookings DELETE] Attempting to delete booking {booking_id}")
-    logger.info(f"[Bookings DELETE] User is_admin: {is_admin}")
+    logger.debug("[Bookings DELETE] Deleting booking %s, is_admin=%s", booking_id, is_admin)
     
     # Check if user is admin
     if not is_admin:
-        logger.error(f"[Bookings DELETE] Access denied - user is not admin")
+        logger.error("[Bookings DELETE] Access denied - user is not admin")
         raise HTTPException(status_code=403, detail="Only administrators can delete bookings")
     
     try:
-        booking_repo = BookingRepository(db_session)
-        flight_repo = FlightRepository(db_session)
-        
-        # Get booking
-        booking = await booking_repo.get_booking_by_id(booking_id)
-        if not booking:
-            logger.error(f"[Bookings DELETE] Booking not found: {booking_id}")
-            raise HTTPException(status_code=404, detail="Booking not found")
-        
-        logger.info(f"[Bookings DELETE] Found booking: {booking.booking_number}")
-        
-        # Get flight to restore seats
-        flight = await flight_repo.get_flight_by_id(booking.flight_id)
-        if flight:
-            logger.info(f"[Bookings DELETE] Restoring {booking.seats_count} seats to flight {flight.flight_number}")
-            new_available = flight.available_seats + booking.seats_count
-            await flight_repo.update_flight(
-                booking.flight_id,
-                {"available_seats": new_available},
-            )
-            logger.info(f"[Bookings DELETE] Flight seats updated")
-        
-        # Delete booking
-        await booking_repo.delete_booking(booking_id)
-        logger.info(f"[Bookings DELETE] Booking {booking_id} deleted successfully")
+        # Удаление брони, ее платежа и возврат мест - одна транзакция
+        booking = await BookingService(db).delete_booking(booking_id)
+        logger.debug("[Bookings DELETE] Booking %s deleted successfully", booking_id)
         
         return {"message": f"Booking {booking.booking_number} deleted successfully", "booking_id": booking_id}
         
-    except HTTPException:
-        raise
+    except ValueError as e:
+        logger.error("[Bookings DELETE] Booking not found: %s", booking_id)
+        raise HTTPException(status_code=404, detail="Booking not found")
     except Exception as e:
-        logger.error(f"[Bookings DELETE] Error: {str(e)}", exc_info=True)
+        if is_database_busy(e):
+            logger.warning("[Bookings DELETE] Database is busy: %s", e)
+            raise DatabaseBusyHTTPError
+        logger.error("[Bookings DELETE] Error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -3,10 +3,12 @@ from typing import Annotated
 from fastapi import Depends, Request
 from pydantic import BaseModel, Field
 
-from app.database.database import async_session_maker
+from app.database.database import async_read_session_maker, async_session_maker
 from app.exceptions.auth import (
     InvalidJWTTokenError,
     InvalidTokenHTTPError,
+    JWTTokenExpiredError,
+    JWTTokenExpiredHTTPError,
     NoAccessTokenHTTPError,
 )
 from app.services.auth import AuthService
@@ -28,11 +30,15 @@ def get_token(request: Request) -> str:
     return token
 
 
-def get_current_user_id(token: str = Depends(get_token)) -> int:
+async def get_current_user_id(token: str = Depends(get_token)) -> int:
+    # async: зависимость выполняется в event loop без перехода в threadpool,
+    # а декодированные claims берутся из кэша до истечения exp
     try:
-        data = AuthService.decode_token(token)
+        data = AuthService.decode_token_cached(token)
     except InvalidJWTTokenError:
         raise InvalidTokenHTTPError
+    except JWTTokenExpiredError:
+        raise JWTTokenExpiredHTTPError
     return data["user_id"]
 
 
@@ -44,4 +50,10 @@ async def get_db():
         yield db
 
 
+async def get_read_db():
+    async with DBManager(session_factory=async_read_session_maker) as db:
+        yield db
+
+
 DBDep = Annotated[DBManager, Depends(get_db)]
+ReadDBDep = Annotated[DBManager, Depends(get_read_db)]
@@ -1,7 +1,12 @@
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
-from app.database.db_manager import get_db_session
+from app.database.database import async_read_session_maker, is_database_busy
+from app.database.db_manager import get_read_session, get_write_session
 from app.services.flight_service import FlightService, AirportService
 from app.schemes.flights import (
     FlightCreate,
@@ -10,101 +15,125 @@ from app.schemes.flights import (
     AirportCreate,
     AirportRead,
     FlightUpdate,
+    FlightAvailabilityRead,
+    FareCalendarRead,
+    RouteRead,
+    SeatMapRead,
 )
+from app.exceptions.base import DatabaseBusyHTTPError
+from app.utils.responses import models_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/flights", tags=["flights"])
 
+# Списки уже собраны в памяти как модели - сериализуются напрямую, без response_model
+AIRPORT_LIST = TypeAdapter(list[AirportRead])
+FLIGHT_LIST = TypeAdapter(list[FlightListRead])
+
 
 # ============== АЭРОПОРТЫ (AIRPORTS) ==============
 @router.post("/airports", response_model=AirportRead, status_code=201)
 async def create_airport(
-    airport_data: AirportCreate, db_session: AsyncSession = Depends(get_db_session)
+    airport_data: AirportCreate, db_session: AsyncSession = Depends(get_write_session)
 ):
-    logger.info(f"[POST /flights/airports] Creating airport: {airport_data.code}")
+    logger.debug("[POST /flights/airports] Creating airport: %s", airport_data.code)
     try:
         service = AirportService(db_session)
         airport = await service.create_airport(airport_data)
-        await db_session.commit()
-        logger.info(f"[POST /flights/airports] Airport created successfully: {airport.id}")
+        logger.info("[POST /flights/airports] Airport created successfully: %s", airport.id)
         return airport
     except ValueError as e:
-        logger.error(f"[POST /flights/airports] Validation error: {str(e)}")
+        logger.error("[POST /flights/airports] Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"[POST /flights/airports] Error creating airport: {str(e)}")
+        logger.error("[POST /flights/airports] Error creating airport: %s", e)
         await db_session.rollback()
+        if is_database_busy(e):
+            raise DatabaseBusyHTTPError
         raise HTTPException(status_code=500, detail="Error creating airport")
 
 
 @router.get("/airports/", response_model=list[AirportRead])
-async def get_airports(db_session: AsyncSession = Depends(get_db_session)):
-    logger.info("[GET /flights/airports/] Getting all airports")
+async def get_airports(db_session: AsyncSession = Depends(get_read_session)):
+    logger.debug("[GET /flights/airports/] Getting all airports")
     try:
         service = AirportService(db_session)
         airports = await service.get_all_airports()
-        logger.info(f"[GET /flights/airports/] Found {len(airports) if airports else 0} airports")
-        return airports if airports else []
+        logger.debug("[GET /flights/airports/] Found %s airports", len(airports) if airports else 0)
+        return models_response(AIRPORT_LIST, airports or [])
     except Exception as e:
-        logger.error(f"[GET /flights/airports/] Error getting airports: {str(e)}")
+        logger.error("[GET /flights/airports/] Error getting airports: %s", e)
         return []
 
 
+@router.get("/airports/suggest", response_model=list[AirportRead])
+async def suggest_airports(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db_session: AsyncSession = Depends(get_read_session),
+):
+    """Автодополнение аэропортов (регистрируется до /airports/{airport_id})"""
+    service = AirportService(db_session)
+    return await service.suggest_airports(q, limit)
+
+
 @router.get("/airports/{airport_id}", response_model=AirportRead)
 async def get_airport(
-    airport_id: int, db_session: AsyncSession = Depends(get_db_session)
+    airport_id: int, db_session: AsyncSession = Depends(get_read_session)
 ):
-    logger.info(f"[GET /flights/airports/{airport_id}] Getting airport")
+    logger.debug("[GET /flights/airports/%s] Getting airport", airport_id)
     try:
         service = AirportService(db_session)
         airport = await service.get_airport(airport_id)
-        logger.info(f"[GET /flights/airports/{airport_id}] Found airport: {airport.code}")
+        logger.debug("[GET /flights/airports/%s] Found airport: %s", airport_id, airport.code)
         return airport
     except ValueError as e:
-        logger.error(f"[GET /flights/airports/{airport_id}] Airport not found: {str(e)}")
+        logger.error("[GET /flights/airports/%s] Airport not found: %s", airport_id, e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"[GET /flights/airports/{airport_id}] Error getting airport: {str(e)}")
+        logger.error("[GET /flights/airports/%s] Error getting airport: %s", airport_id, e)
         raise HTTPException(status_code=500, detail="Error getting airport")
 
 
 @router.delete("/airports/{airport_id}", status_code=204)
 async def delete_airport(
-    airport_id: int, db_session: AsyncSession = Depends(get_db_session)
+    airport_id: int, db_session: AsyncSession = Depends(get_write_session)
 ):
-    logger.info(f"[DELETE /flights/airports/{airport_id}] Deleting airport")
+    logger.debug("[DELETE /flights/airports/%s] Deleting airport", airport_id)
     try:
         service = AirportService(db_session)
         await service.delete_airport(airport_id)
-        await db_session.commit()
-        logger.info(f"[DELETE /flights/airports/{airport_id}] Airport deleted successfully")
+        logger.info("[DELETE /flights/airports/%s] Airport deleted successfully", airport_id)
     except ValueError as e:
-        logger.error(f"[DELETE /flights/airports/{airport_id}] Airport not found: {str(e)}")
+        logger.error("[DELETE /flights/airports/%s] Airport not found: %s", airport_id, e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"[DELETE /flights/airports/{airport_id}] Error deleting airport: {str(e)}")
+        logger.error("[DELETE /flights/airports/%s] Error deleting airport: %s", airport_id, e)
         await db_session.rollback()
+        if is_database_busy(e):
+            raise DatabaseBusyHTTPError
         raise HTTPException(status_code=500, detail="Error deleting airport")
 
 
 # ============== РЕЙСЫ (FLIGHTS) ==============
 @router.post("/", response_model=FlightRead, status_code=201)
 async def create_flight(
-    flight_data: FlightCreate, db_session: AsyncSession = Depends(get_db_session)
+    flight_data: FlightCreate, db_session: AsyncSession = Depends(get_write_session)
 ):
-    logger.info(f"[POST /flights/] Creating flight: {flight_data.flight_number}")
+    logger.debug("[POST /flights/] Creating flight: %s", flight_data.flight_number)
     try:
         service = FlightService(db_session)
         flight = await service.create_flight(flight_data)
-        await db_session.commit()
-        logger.info(f"[POST /flights/] Flight created: {flight.id}")
+        logger.info("[POST /flights/] Flight created: %s", flight.id)
         return flight
     except ValueError as e:
-        logger.error(f"[POST /flights/] Validation error: {str(e)}")
+        logger.error("[POST /flights/] Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"[POST /flights/] Error creating flight: {str(e)}")
+        logger.error("[POST /flights/] Error creating flight: %s", e)
         await db_session.rollback()
+        if is_database_busy(e):
+            raise DatabaseBusyHTTPError
         raise HTTPException(status_code=500, detail="Error creating flight")
 
 
@@ -113,9 +142,13 @@ async def get_flights(
     departure_airport_id: int | None = Query(None),
     arrival_airport_id: int | None = Query(None),
     departure_date: str | None = Query(None),
-    db_session: AsyncSession = Depends(get_db_session),
+    cursor: str | None = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    limit: int = Query(100, ge=1, le=500),
+    stream: bool = Query(False, description="Отдать все рейсы потоком NDJSON"),
+    db_session: AsyncSession = Depends(get_read_session),
 ):
-    logger.info(f"[GET /flights/] Getting flights with filters: from={departure_airport_id}, to={arrival_airport_id}")
+    logger.debug("[GET /flights/] Getting flights with filters: from=%s, to=%s", departure_airport_id, arrival_airport_id)
+    headers = {}
     try:
         service = FlightService(db_session)
         if departure_airport_id or arrival_airport_id or departure_date:
@@ -124,72 +157,160 @@ async def get_flights(
                 arrival_airport_id=arrival_airport_id,
                 departure_date=departure_date,
             )
+        elif stream:
+            after = service.decode_cursor(cursor)
+            return StreamingResponse(
+                _stream_flights_ndjson(after), media_type="application/x-ndjson"
+            )
         else:
-            flights = await service.get_all_flights()
-        logger.info(f"[GET /flights/] Found {len(flights) if flights else 0} flights")
-        return flights if flights else []
+            # Keyset-пагинация по (departure_time, id); следующая страница - в заголовке
+            flights, next_cursor = await service.get_flights_page(
+                limit, service.decode_cursor(cursor)
+            )
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+        logger.debug("[GET /flights/] Found %s flights", len(flights) if flights else 0)
+        return models_response(FLIGHT_LIST, flights or [], headers)
     except ValueError as e:
-        logger.error(f"[GET /flights/] Validation error: {str(e)}")
+        logger.error("[GET /flights/] Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"[GET /flights/] Error getting flights: {str(e)}")
+        logger.error("[GET /flights/] Error getting flights: %s", e)
         return []
 
 
+async def _stream_flights_ndjson(after):
+    """Отдельная сессия живет столько же, сколько поток ответа"""
+    async with async_read_session_maker() as session:
+        async for flight in FlightService(session).stream_flights(after):
+            # Словарь уже в форме FlightListRead - без валидации моделью
+            yield orjson.dumps(flight) + b"\n"
+
+
+@router.get("/routes", response_model=list[RouteRead])
+async def search_routes(
+    departure_airport_id: int = Query(...),
+    arrival_airport_id: int = Query(...),
+    departure_date: date = Query(...),
+    max_stops: int = Query(1, ge=0, le=3),
+    min_connection_minutes: int = Query(60, ge=0, le=24 * 60),
+    passengers: int = Query(1, ge=1, le=9),
+    limit: int = Query(10, ge=1, le=50),
+    db_session: AsyncSession = Depends(get_read_session),
+):
+    """Маршруты A -> B с пересадками (регистрируется до /{flight_id})"""
+    logger.debug("[GET /flights/routes] %s -> %s on %s, stops <= %s", departure_airport_id, arrival_airport_id, departure_date, max_stops)
+    routes = await FlightService(db_session).search_routes(
+        departure_airport_id,
+        arrival_airport_id,
+        departure_date,
+        max_stops=max_stops,
+        min_connection_minutes=min_connection_minutes,
+        passengers=passengers,
+        limit=limit,
+    )
+    logger.debug("[GET /flights/routes] Found %d routes", len(routes))
+    return routes
+
+
+@router.get("/calendar", response_model=FareCalendarRead)
+async def get_fare_calendar(
+    departure_airport_id: int = Query(..., alias="from"),
+    arrival_airport_id: int = Query(..., alias="to"),
+    month: str = Query(..., description="Месяц в формате YYYY-MM"),
+    db_session: AsyncSession = Depends(get_read_session),
+):
+    """Календарь низких цен по дням месяца (регистрируется до /{flight_id})"""
+    logger.debug("[GET /flights/calendar] %s -> %s, %s", departure_airport_id, arrival_airport_id, month)
+    try:
+        return await FlightService(db_session).get_fare_calendar(
+            departure_airport_id, arrival_airport_id, month
+        )
+    except ValueError as e:
+        logger.error("[GET /flights/calendar] Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{flight_id}", response_model=FlightRead)
 async def get_flight(
-    flight_id: int, db_session: AsyncSession = Depends(get_db_session)
+    flight_id: int, db_session: AsyncSession = Depends(get_read_session)
 ):
-    logger.info(f"[GET /flights/{flight_id}] Getting flight")
+    logger.debug("[GET /flights/%s] Getting flight", flight_id)
     try:
         service = FlightService(db_session)
         flight = await service.get_flight(flight_id)
-        logger.info(f"[GET /flights/{flight_id}] Found flight: {flight.flight_number}")
+        logger.debug("[GET /flights/%s] Found flight: %s", flight_id, flight.flight_number)
         return flight
     except ValueError as e:
-        logger.error(f"[GET /flights/{flight_id}] Flight not found: {str(e)}")
+        logger.error("[GET /flights/%s] Flight not found: %s", flight_id, e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"[GET /flights/{flight_id}] Error getting flight: {str(e)}")
+        logger.error("[GET /flights/%s] Error getting flight: %s", flight_id, e)
         raise HTTPException(status_code=500, detail="Error getting flight")
 
 
+@router.get("/{flight_id}/seats", response_model=SeatMapRead)
+async def get_flight_seats(
+    flight_id: int,
+    adjacent: int | None = Query(None, ge=1, le=6, description="Найти N соседних мест в одном ряду"),
+    db_session: AsyncSession = Depends(get_read_session),
+):
+    try:
+        return await FlightService(db_session).get_seat_map(flight_id, adjacent)
+    except ValueError as e:
+        logger.error("[GET /flights/%s/seats] Flight not found: %s", flight_id, e)
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/{flight_id}/availability", response_model=FlightAvailabilityRead)
+async def get_flight_availability(
+    flight_id: int, db_session: AsyncSession = Depends(get_read_session)
+):
+    try:
+        return await FlightService(db_session).get_availability(flight_id)
+    except ValueError as e:
+        logger.error("[GET /flights/%s/availability] Flight not found: %s", flight_id, e)
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.put("/{flight_id}", response_model=FlightRead)
 async def update_flight(
     flight_id: int,
     flight_data: FlightUpdate,
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_write_session),
 ):
-    logger.info(f"[PUT /flights/{flight_id}] Updating flight")
+    logger.debug("[PUT /flights/%s] Updating flight", flight_id)
     try:
         service = FlightService(db_session)
         flight = await service.update_flight(flight_id, flight_data)
-        await db_session.commit()
-        logger.info(f"[PUT /flights/{flight_id}] Flight updated")
+        logger.info("[PUT /flights/%s] Flight updated", flight_id)
         return flight
     except ValueError as e:
-        logger.error(f"[PUT /flights/{flight_id}] Flight not found: {str(e)}")
+        logger.error("[PUT /flights/%s] Flight not found: %s", flight_id, e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"[PUT /flights/{flight_id}] Error updating flight: {str(e)}")
+        logger.error("[PUT /flights/%s] Error updating flight: %s", flight_id, e)
         await db_session.rollback()
+        if is_database_busy(e):
+            raise DatabaseBusyHTTPError
         raise HTTPException(status_code=500, detail="Error updating flight")
 
 
 @router.delete("/{flight_id}", status_code=204)
 async def delete_flight(
-    flight_id: int, db_session: AsyncSession = Depends(get_db_session)
+    flight_id: int, db_session: AsyncSession = Depends(get_write_session)
 ):
-    logger.info(f"[DELETE /flights/{flight_id}] Deleting flight")
+    logger.debug("[DELETE /flights/%s] Deleting flight", flight_id)
     try:
         service = FlightService(db_session)
         await service.delete_flight(flight_id)
-        await db_session.commit()
-        logger.info(f"[DELETE /flights/{flight_id}] Flight deleted")
+        logger.info("[DELETE /flights/%s] Flight deleted", flight_id)
     except ValueError as e:
-        logger.error(f"[DELETE /flights/{flight_id}] Flight not found: {str(e)}")
+        logger.error("[DELETE /flights/%s] Flight not found: %s", flight_id, e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"[DELETE /flights/{flight_id}] Error deleting flight: {str(e)}")
+        logger.error("[DELETE /flights/%s] Error deleting flight: %s", flight_id, e)
         await db_session.rollback()
+        if is_database_busy(e):
+            raise DatabaseBusyHTTPError
         raise HTTPException(status_code=500, detail="Error deleting flight")
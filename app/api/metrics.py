@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.metrics import CONTENT_TYPE, metrics
+
+router = APIRouter(tags=["Метрики"])
+
+
+@router.get("/metrics", summary="Метрики в формате Prometheus", include_in_schema=False)
+def get_metrics() -> Response:
+    # sync-обработчик: в режиме нескольких воркеров читаются файлы снимков,
+    # FastAPI выполнит его в пуле потоков, не блокируя event loop
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
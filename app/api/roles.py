@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.dependencies import DBDep
+from app.api.dependencies import DBDep, ReadDBDep
 from app.exceptions.roles import (
     RoleAlreadyExistsError,
     RoleAlreadyExistsHTTPError,
@@ -28,14 +28,14 @@ async def create_new_role(
 
 @router.get("/roles", summary="Получение списка ролей")
 async def get_all_roles(
-    db: DBDep,
+    db: ReadDBDep,
 ) -> list[SRoleGet]:
     return await RoleService(db).get_roles()
 
 
 @router.get("/roles/{id}", summary="Получение конкретной роли")
 async def get_role(
-    db: DBDep,
+    db: ReadDBDep,
     id: int,
 ) -> SRoleGetWithRels:
     return await RoleService(db).get_role(role_id=id)
@@ -6,6 +6,70 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     DB_NAME: str
+
+    # Пул потоков для bcrypt: число потоков и сколько запросов может ждать в очереди
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # Сколько декодированных JWT держать в памяти (LRU, каждая запись живет до exp)
+    JWT_CACHE_SIZE: int = 10_000
+
+    # PRAGMA, которые выполняются на каждом новом соединении с SQLite
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64_000  # отрицательное значение - в КиБ (~64 МБ)
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    # Номер инстанса (0..255) для генератора номеров брони и транзакций;
+    # у каждого хоста, пишущего в одну БД, он должен быть свой
+    ID_NODE: int = 0
+
+    # Отдельные пулы соединений: на запись и только на чтение (mode=ro).
+    # Писатель в SQLite один: лишние соединения на запись только крутятся
+    # в busy_timeout (без очереди, кто-то ждет дольше таймаута), а ожидание
+    # соединения из пула идет по очереди
+    DB_WRITE_POOL_SIZE: int = 1
+    DB_READ_POOL_SIZE: int = 10
+
+    # Неоплаченная (PENDING) бронь держит места BOOKING_HOLD_TTL_SECONDS секунд
+    # (0 - бессрочно); фоновая задача снимает просроченные пачками.
+    # По умолчанию выключено: в API нет маршрута оплаты/подтверждения брони,
+    # и с TTL любая созданная через API бронь отменилась бы сама
+    BOOKING_HOLD_TTL_SECONDS: int = 0
+    HOLD_SWEEP_INTERVAL_SECONDS: float = 30.0
+    HOLD_SWEEP_BATCH_SIZE: int = 200
+    # Пауза между пачками: busy-handler SQLite у других писателей спит
+    # до десятков мс, без паузы они не успевают взять блокировку
+    HOLD_SWEEP_BATCH_PAUSE_SECONDS: float = 0.05
+
+    # Раз в столько секунд фоновая задача подтягивает в read-модель рейсов
+    # изменения других процессов (только измененные строки); 0 - выключено
+    FLIGHT_VIEW_MAX_AGE_SECONDS: float = 60.0
+
+    # Логи: общий уровень логгера "app" и уровни отдельных модулей
+    # (в .env - JSON: LOG_LEVELS='{"app.repositories": "DEBUG"}'),
+    # формат text или json, итоговая строка на каждый HTTP-запрос.
+    # Запись идет из отдельного потока; при переполнении очереди записи отбрасываются
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: dict[str, str] = {}
+    LOG_FORMAT: str = "text"
+    LOG_REQUESTS: bool = True
+    LOG_QUEUE_SIZE: int = 10_000
+
+    # Профилирование запросов: заголовок Server-Timing (время, число SQL, время в БД)
+    # и журнал SQL-выражений дольше SLOW_QUERY_LOG_MS миллисекунд (0 - выключен)
+    SERVER_TIMING: bool = True
+    SLOW_QUERY_LOG_MS: float = 0.0
+
+    # Метрики Prometheus на GET /metrics. При нескольких воркерах uvicorn задайте
+    # METRICS_DIR (общая для воркеров папка, очищается перед запуском): каждый
+    # процесс раз в METRICS_FLUSH_SECONDS пишет туда снимок, /metrics их складывает
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: str = ""
+    METRICS_FLUSH_SECONDS: float = 5.0
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env")
     )
@@ -18,6 +82,23 @@ class Settings(BaseSettings):
     def get_db_url(self):
         return f"sqlite+aiosqlite:///{self.DB_NAME}"
 
+    @property
+    def get_db_read_url(self):
+        # URI-форма SQLite: соединение открывается только на чтение
+        return f"sqlite+aiosqlite:///file:{self.DB_NAME}?mode=ro&uri=true"
+
+    @property
+    def sqlite_pragmas(self) -> dict:
+        return {
+            "journal_mode": self.SQLITE_JOURNAL_MODE,
+            "synchronous": self.SQLITE_SYNCHRONOUS,
+            "busy_timeout": self.SQLITE_BUSY_TIMEOUT_MS,
+            "mmap_size": self.SQLITE_MMAP_SIZE,
+            "cache_size": self.SQLITE_CACHE_SIZE,
+            "temp_store": self.SQLITE_TEMP_STORE,
+            "foreign_keys": "ON" if self.SQLITE_FOREIGN_KEYS else "OFF",
+        }
+
     @property
     def auth_data(self):
         return {"secret_key": self.SECRET_KEY, "algorithm": self.ALGORITHM}
@@ -1,4 +1,7 @@
-from sqlalchemy import NullPool
+import time
+
+from sqlalchemy import AsyncAdaptedQueuePool, NullPool, event
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
@@ -6,13 +9,109 @@ from sqlalchemy.ext.asyncio import (
 
 from app.config import settings
 from app.database.base import Base
+from app.database.query_stats import install_query_stats
+from app.metrics import db_pool_checkout_wait
 
-engine = create_async_engine(settings.get_db_url)
 
-engine_null_pool = create_async_engine(settings.get_db_url, poolclass=NullPool)
 
+def set_sqlite_pragmas(dbapi_connection, connection_record, read_only: bool = False) -> None:
+    """Настраивает каждое новое соединение с SQLite значениями из settings"""
+    cursor = dbapi_connection.cursor()
+    for name, value in settings.sqlite_pragmas.items():
+        # Режим журнала меняется только соединением с правом записи
+        if read_only and name == "journal_mode":
+            continue
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def install_sqlite_pragmas(engine, read_only: bool = False) -> None:
+    """Вешает set_sqlite_pragmas на событие connect (sync- или async-движка)"""
+
+    def on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, connection_record, read_only=read_only)
+
+    event.listen(getattr(engine, "sync_engine", engine), "connect", on_connect)
+
+
+def install_immediate_transactions(engine) -> None:
+    """
+    Транзакции движка начинаются с BEGIN IMMEDIATE: блокировка записи берется
+    сразу, и конкурирующий писатель ждет ее в busy_timeout на BEGIN. В
+    отложенной транзакции (SELECT, потом UPDATE) SQLite отказывает без
+    ожидания, если снимок уже устарел (SQLITE_BUSY_SNAPSHOT).
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    def on_connect(dbapi_connection, connection_record):
+        # Драйвер сам транзакции не открывает - их начинает on_begin
+        dbapi_connection.isolation_level = None
+
+    def on_begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    event.listen(sync_engine, "connect", on_connect)
+    event.listen(sync_engine, "begin", on_begin)
+
+
+def is_database_busy(error: BaseException) -> bool:
+    """Запись не дождалась блокировки SQLite (busy_timeout) или соединения из пула"""
+    if isinstance(error, PoolTimeoutError):
+        return True
+    return isinstance(error, OperationalError) and "database is locked" in str(error)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, который пишет в метрики время ожидания соединения (db_pool_checkout_wait_seconds)"""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, (self.metrics_name,))
+
+    def recreate(self):
+        # engine.dispose() заменяет пул новым - имя для метрик переносим
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def install_pool_metrics(engine, name: str) -> None:
+    """Подписывает пул движка в метриках (движок создан с poolclass=TimedQueuePool)"""
+    engine.sync_engine.pool.metrics_name = name
+
+
+# ✍️ Движок на запись: брони, изменения справочников, регистрация
+engine = create_async_engine(
+    settings.get_db_url, pool_size=settings.DB_WRITE_POOL_SIZE, max_overflow=0, poolclass=TimedQueuePool
+)
+install_sqlite_pragmas(engine)
+install_immediate_transactions(engine)
+install_query_stats(engine)
+install_pool_metrics(engine, "write")
+write_engine = engine
+
+# 📖 Движок только на чтение со своим пулом: поиск и списки не занимают
+# соединения, нужные записи
+read_engine = create_async_engine(
+    settings.get_db_read_url, pool_size=settings.DB_READ_POOL_SIZE, poolclass=TimedQueuePool
+)
+install_sqlite_pragmas(read_engine, read_only=True)
+install_query_stats(read_engine)
+install_pool_metrics(read_engine, "read")
+
+engine_null_pool = create_async_engine(settings.get_db_url, poolclass=NullPool)
+install_sqlite_pragmas(engine_null_pool)
+install_immediate_transactions(engine_null_pool)
+install_query_stats(engine_null_pool)
 
-async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+async_session_maker = async_sessionmaker(bind=write_engine, expire_on_commit=False)
+async_write_session_maker = async_session_maker
+async_read_session_maker = async_sessionmaker(bind=read_engine, expire_on_commit=False)
 async_session_maker_null_pool = async_sessionmaker(
     bind=engine_null_pool, expire_on_commit=False
 )
@@ -24,5 +123,5 @@ def register_models():
     """Отложенный импорт моделей"""
     from app.models.users import UserModel
     from app.models.roles import RoleModel
-    from app.models.flight import FlightModel, AirportModel
+    from app.models.flight import FlightModel, AirportModel, FlightSeatModel
     from app.models.booking import BookingModel, PaymentModel
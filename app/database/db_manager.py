@@ -1,6 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.database import async_session_maker
+from app.database.database import async_read_session_maker, async_session_maker
+from app.repositories.booking_repository import BookingRepository, PaymentRepository
+from app.repositories.flight_repository import AirportRepository, FlightRepository
 from app.repositories.roles import RolesRepository
+from app.repositories.seat_repository import SeatRepository
 from app.repositories.users import UsersRepository
 
 
@@ -14,6 +17,11 @@ class DBManager:
         # Пример:
         self.users = UsersRepository(self.session)
         self.roles = RolesRepository(self.session)
+        self.flights = FlightRepository(self.session)
+        self.airports = AirportRepository(self.session)
+        self.bookings = BookingRepository(self.session)
+        self.payments = PaymentRepository(self.session)
+        self.seats = SeatRepository(self.session)
         return self
 
     async def __aexit__(self, *args):
@@ -23,8 +31,21 @@ class DBManager:
     async def commit(self):
         await self.session.commit()
 
+    async def rollback(self):
+        await self.session.rollback()
+
 
-async def get_db_session() -> AsyncSession:
-    """Get database session for dependency injection"""
+async def get_write_session() -> AsyncSession:
+    """Сессия движка на запись (POST/PUT/PATCH/DELETE)"""
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_session() -> AsyncSession:
+    """Сессия движка только на чтение (GET)"""
+    async with async_read_session_maker() as session:
+        yield session
+
+
+# Старое имя зависимости: сессия на запись
+get_db_session = get_write_session
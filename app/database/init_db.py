@@ -7,9 +7,15 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from app.database.base import Base
 from app.config import settings
+from app.database.database import install_sqlite_pragmas
+from app.database.seat_backfill import backfill_flight_seats
 from app.models.flight import FlightModel, AirportModel
+from app.models.roles import RoleModel
+from app.models.users import UserModel
+from app.services.auth import AuthService
 from datetime import datetime
 import logging
+import secrets
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,7 @@ def init_database_sync():
         sync_db_url = db_url.replace('sqlite+aiosqlite:///', 'sqlite:///')
         
         sync_engine = create_engine(sync_db_url, echo=False)
+        install_sqlite_pragmas(sync_engine)
         
         # Проверим есть ли таблицы
         with sync_engine.connect() as conn:
@@ -42,6 +49,18 @@ def init_database_sync():
             print("✅ Таблицы созданы")
         else:
             print(f"✅ БД уже инициализирована ({len(tables)} таблиц)")
+            missing = set(Base.metadata.tables) - set(tables)
+            if missing:
+                # Новые таблицы (например, flight_seats) досоздаются в старой БД
+                Base.metadata.create_all(sync_engine, tables=[Base.metadata.tables[name] for name in missing])
+                print(f"✅ Досозданы таблицы: {', '.join(sorted(missing))}")
+
+        # Брони без строк в flight_seats (старая БД) - иначе карта мест
+        # сочтет их места свободными
+        with sync_engine.begin() as conn:
+            seats = backfill_flight_seats(conn)
+        if seats:
+            print(f"✅ Закреплено мест за старыми бронями: {seats}")
         
         # Загружаем тестовые данные (ВсЕГДА, если них нет!)
         print("🌱 Проверяю тестовые данные...")
@@ -52,6 +71,26 @@ def init_database_sync():
         try:
             # Проверяем и очищаем если нужно
             
+            # Проверяем роли и демо-пользователя: бронирования пока
+            # создаются от user_id=1, а внешние ключи в SQLite включены
+            users_count = db.execute(text("SELECT COUNT(*) FROM users")).scalar()
+            if users_count == 0:
+                print("🔴 Пользователи отсутствуют. Создаю демо-пользователя...")
+                role = db.query(RoleModel).filter_by(name='user').first()
+                if role is None:
+                    role = RoleModel(name='user')
+                    db.add(role)
+                    db.flush()
+                db.add(UserModel(
+                    name='Демо пользователь',
+                    email='demo@example.com',
+                    # Случайный пароль нигде не сохраняется: войти под демо нельзя
+                    hashed_password=AuthService.hash_password(secrets.token_urlsafe(32)),
+                    role_id=role.id,
+                ))
+                db.commit()
+                print("✅ Демо-пользователь создан")
+
             # Проверяем аэропорты
             airports_count = db.execute(text("SELECT COUNT(*) FROM airports")).scalar()
             if airports_count == 0:
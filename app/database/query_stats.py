@@ -0,0 +1,113 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.config import settings
+
+slow_logger = logging.getLogger("app.sql.slow")
+
+_SPACES = re.compile(r"\s+")
+_PARAM_LISTS = re.compile(r"\bIN \(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class RequestStats:
+    """Счетчики одного HTTP-запроса: SQL-выражения, время в БД, строки"""
+
+    __slots__ = ("started", "sql_count", "sql_ms", "rows")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.rows = 0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+# Ставится middleware на время запроса; фоновые задачи работают без него
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def normalize_statement(statement: str) -> str:
+    """Одна форма для запросов, отличающихся только литералами и длиной IN (...)"""
+    statement = _SPACES.sub(" ", statement).strip()
+    statement = _LITERALS.sub("?", statement)
+    return _PARAM_LISTS.sub("IN (?, ...)", statement)
+
+
+class SlowQueryLog:
+    """
+    🐢 Журнал медленных SQL-выражений (включается порогом threshold_ms > 0).
+
+    Пишет нормализованный текст без параметров (в них бывают персональные
+    данные) и копит по нему число и суммарное время - не больше max_statements
+    разных выражений.
+    """
+
+    def __init__(self, threshold_ms: float = 0, max_statements: int = 200) -> None:
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self._statements: dict[str, list[float]] = {}
+        self.total = 0
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        normalized = normalize_statement(statement)
+        self.total += 1
+        entry = self._statements.get(normalized)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+        elif len(self._statements) < self.max_statements:
+            self._statements[normalized] = [1, elapsed_ms, elapsed_ms]
+        slow_logger.warning(
+            "Slow query %.1f ms: %s",
+            elapsed_ms,
+            normalized,
+            extra={"sql_ms": round(elapsed_ms, 2), "statement": normalized},
+        )
+
+    def stats(self, top: int = 10) -> dict:
+        ordered = sorted(self._statements.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "total": self.total,
+            "top": [
+                {"statement": statement, "count": count, "total_ms": round(total_ms, 2), "max_ms": round(max_ms, 2)}
+                for statement, (count, total_ms, max_ms) in ordered[:top]
+            ],
+        }
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_MS)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_ms += elapsed_ms
+        # SELECT: адаптер aiosqlite уже выбрал строки в буфер; DML - затронутые строки
+        if cursor.description is not None:
+            stats.rows += len(getattr(cursor, "_rows", ()))
+        elif cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+    if slow_query_log.threshold_ms and elapsed_ms >= slow_query_log.threshold_ms:
+        slow_query_log.record(statement, elapsed_ms)
+
+
+def install_query_stats(engine) -> None:
+    """Вешает учет времени SQL на движок (sync- или async-)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
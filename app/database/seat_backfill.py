@@ -0,0 +1,63 @@
+"""
+💺 Досоздание мест (flight_seats) для броней, сделанных до карты мест
+
+Брони из старой БД (и вставленные в обход сервиса) занимают места в
+flights.available_seats, но строк в flight_seats у них нет - карта мест
+считала бы эти места свободными. Каждой такой не отмененной броне
+выдаются первые свободные номера ее рейса.
+
+Синхронная функция: вызывается из init_db и из миграции alembic.
+"""
+import logging
+from collections import defaultdict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_flight_seats(conn: Connection) -> int:
+    """Дозакрепляет недостающие места за бронями; возвращает число вставленных мест"""
+    missing = conn.execute(text(
+        "SELECT b.id, b.flight_id, b.seats_count - COUNT(s.id) FROM bookings b "
+        "LEFT JOIN flight_seats s ON s.booking_id = b.id "
+        "WHERE b.status != 'CANCELLED' "
+        "GROUP BY b.id HAVING COUNT(s.id) < b.seats_count "
+        "ORDER BY b.flight_id, b.id"
+    )).all()
+    if not missing:
+        return 0
+
+    by_flight: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for booking_id, flight_id, seats_missing in missing:
+        by_flight[flight_id].append((booking_id, seats_missing))
+
+    rows = []
+    for flight_id, bookings in by_flight.items():
+        total_seats = conn.execute(
+            text("SELECT total_seats FROM flights WHERE id = :id"), {"id": flight_id}
+        ).scalar() or 0
+        taken = set(conn.execute(
+            text("SELECT seat_number FROM flight_seats WHERE flight_id = :id"), {"id": flight_id}
+        ).scalars())
+        free = (seat for seat in range(1, total_seats + 1) if seat not in taken)
+        for booking_id, seats_missing in bookings:
+            for _ in range(seats_missing):
+                seat = next(free, None)
+                if seat is None:
+                    # Рейс продан сверх вместимости - лишним местам номера не достанется
+                    logger.warning("[SeatBackfill] Flight %s has no free seat for booking %s", flight_id, booking_id)
+                    break
+                rows.append({"flight_id": flight_id, "seat_number": seat, "booking_id": booking_id})
+
+    if rows:
+        conn.execute(
+            text(
+                "INSERT INTO flight_seats (flight_id, seat_number, booking_id) "
+                "VALUES (:flight_id, :seat_number, :booking_id)"
+            ),
+            rows,
+        )
+    logger.info("[SeatBackfill] Assigned %d seats to %d bookings", len(rows), len(missing))
+    return len(rows)
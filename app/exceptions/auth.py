@@ -21,6 +21,10 @@ class UserNotFoundError(MyAppError):
     detail = "Пользователя не существует"
 
 
+class PasswordHasherBusyError(MyAppError):
+    detail = "Сервис проверки паролей перегружен, попробуйте позже"
+
+
 class InvalidTokenHTTPError(MyAppHTTPError):
     status_code = 401
     detail = "Неверный токен доступа"
@@ -49,3 +53,8 @@ class UserNotFoundHTTPError(MyAppHTTPError):
 class InvalidPasswordHTTPError(MyAppHTTPError):
     status_code = 401
     detail = "Неверный пароль"
+
+
+class PasswordHasherBusyHTTPError(MyAppHTTPError):
+    status_code = 503
+    detail = "Сервис проверки паролей перегружен, попробуйте позже"
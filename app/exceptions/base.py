@@ -26,3 +26,13 @@ class ObjectAlreadyExistsError(MyAppError):
 
 class InvalidDateRangeError(MyAppError):
     detail = "Дата заезда не может быть позже даты выезда"
+
+
+class DatabaseBusyHTTPError(MyAppHTTPError):
+    status_code = 503
+    detail = "База данных занята, повторите запрос позже"
+    retry_after = 1
+
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Retry-After": str(self.retry_after)}
@@ -0,0 +1,108 @@
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
+
+import orjson
+
+from app.config import settings
+
+# Атрибуты, которые есть у любой LogRecord; остальное пришло через extra=...
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись; поля из extra=... попадают в объект как есть"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        data.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(data, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Кладет запись в очередь и сразу возвращается в event loop.
+
+    В вызывающем потоке только подставляются аргументы сообщения (и только
+    для записей, прошедших проверку уровня); время, JSON и traceback
+    форматирует поток QueueListener. Переполненная очередь не блокирует
+    запрос - запись отбрасывается и считается в dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogSubsystem:
+    """
+    📝 Логи приложения: уровни из Settings, очередь и поток записи.
+
+    configure() вызывается при импорте main и сразу запускает поток записи;
+    stop() на shutdown дописывает все, что осталось в очереди, start() на
+    startup запускает поток снова (приложение в тестах стартует не один раз).
+    """
+
+    def __init__(self) -> None:
+        self.handler: NonBlockingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+        self.running = False
+
+    def configure(self, stream: TextIO | None = None) -> None:
+        if self.handler is not None:
+            self.stop()
+            logging.getLogger("app").removeHandler(self.handler)
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+        log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+        self.handler = NonBlockingQueueHandler(log_queue)
+        self.listener = QueueListener(log_queue, output, respect_handler_level=True)
+
+        app_logger = logging.getLogger("app")
+        app_logger.addHandler(self.handler)
+        app_logger.setLevel(settings.LOG_LEVEL.upper())
+        app_logger.propagate = False
+        for name, level in settings.LOG_LEVELS.items():
+            logging.getLogger(name).setLevel(level.upper())
+        self.start()
+
+    def start(self) -> None:
+        if self.listener is not None and not self.running:
+            self.listener.start()
+            self.running = True
+
+    def stop(self) -> None:
+        if self.listener is not None and self.running:
+            self.listener.stop()
+            self.running = False
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.handler.queue.qsize() if self.handler else 0,
+            "dropped": self.handler.dropped if self.handler else 0,
+        }
+
+
+log_subsystem = LogSubsystem()
@@ -0,0 +1,448 @@
+import asyncio
+import functools
+import glob
+import logging
+import math
+import os
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Границы корзин гистограмм времени, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+# collect() -> {labels: значение} - метрики, которые считывают чужие счетчики на scrape
+Collect = Callable[[], dict[Labels, float]]
+
+
+class Metric:
+    """
+    Метрика с потоковыми шардами: каждый поток пишет только в свой словарь
+    {labels: значение}, поэтому запись идет без блокировок. Scrape копирует
+    словари всех потоков (dict.copy атомарна под GIL) и складывает их.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), collect: Collect | None = None) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._shards: dict[int, dict] = {}
+
+    def _shard(self) -> dict:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, {})
+        return shard
+
+    def samples(self) -> dict:
+        if self.collect is not None:
+            return self.collect()
+        total: dict = {}
+        for shard in list(self._shards.values()):
+            for labels, value in shard.copy().items():
+                total[labels] = total.get(labels, 0.0) + value
+        return total
+
+    def reset(self) -> None:
+        self._shards = {}
+
+
+class Counter(Metric):
+    """Только растет: число запросов, броней, попаданий в кэш"""
+
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Текущее значение: запросы в обработке, глубина очереди"""
+
+    kind = "gauge"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    """
+    Распределение значений по корзинам buckets (+Inf добавляется сама).
+    Значение серии - [число в каждой корзине (не накопительно)..., сумма].
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> dict:
+        total: dict = {}
+        for shard in list(self._shards.values()):
+            for labels, counts in shard.copy().items():
+                # Список меняет поток-владелец: берем копию, сумма может
+                # разойтись с корзинами на одно наблюдение - для scrape не страшно
+                counts = list(counts)
+                current = total.get(labels)
+                total[labels] = counts if current is None else [a + b for a, b in zip(current, counts)]
+        return total
+
+
+def _merge(kind: str, current, value):
+    if current is None:
+        return value
+    if kind == "histogram":
+        return [a + b for a, b in zip(current, value)]
+    return current + value
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    📈 Метрики приложения в текстовом формате Prometheus (GET /metrics).
+
+    Один процесс: render() складывает потоковые шарды всех метрик.
+    Несколько воркеров uvicorn (directory задана): каждый процесс раз в
+    flush_interval секунд и на shutdown пишет снимок своих метрик в
+    directory/metrics_<pid>.json, а render() в любом воркере складывает свой
+    живой снимок с файлами остальных. Счетчики и гистограммы завершившихся
+    процессов остаются в сумме, их gauge - нет. Папку очищают перед запуском.
+    """
+
+    def __init__(self, directory: str = "", flush_interval: float = 5.0) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metrics: dict[str, Metric] = {}
+        # name -> (documentation, labelnames, fn(итог по всем процессам) -> {labels: value})
+        self._derived: dict[str, tuple[str, tuple[str, ...], Callable[[dict], dict]]] = {}
+        self._task: asyncio.Task | None = None
+        self.flushes = 0
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = (), collect: Collect | None = None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, collect))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), collect: Collect | None = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def derived_gauge(self, name: str, documentation: str, labelnames: Iterable[str], fn: Callable[[dict], dict]) -> None:
+        """Gauge, который считается из уже сложенных метрик (например, доля попаданий в кэш)"""
+        self._derived[name] = (documentation, tuple(labelnames), fn)
+
+    def snapshot(self) -> dict[str, dict]:
+        """{имя метрики: {labels: значение}} этого процесса"""
+        result = {}
+        for name, metric in self._metrics.items():
+            try:
+                result[name] = metric.samples()
+            except Exception:
+                logger.exception("[Metrics] Collector %s failed", name)
+        return result
+
+    # ---------- несколько процессов ----------
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics_{pid}.json")
+
+    def flush(self, snapshot: dict | None = None) -> None:
+        """Атомарно записывает снимок этого процесса в directory"""
+        if not self.directory:
+            return
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        data = {name: [[list(labels), value] for labels, value in samples.items()] for name, samples in snapshot.items()}
+        path = self._path(os.getpid())
+        with open(path + ".tmp", "wb") as file:
+            file.write(orjson.dumps(data))
+        os.replace(path + ".tmp", path)
+        self.flushes += 1
+
+    def _read_other_processes(self) -> Iterable[tuple[bool, dict]]:
+        own = self._path(os.getpid())
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+            if path == own:
+                continue
+            try:
+                pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+                with open(path, "rb") as file:
+                    data = orjson.loads(file.read())
+            except (ValueError, OSError):
+                continue
+            yield _pid_alive(pid), data
+
+    def collect_all(self) -> dict[str, dict]:
+        """Снимок этого процесса плюс снимки остальных воркеров"""
+        total = self.snapshot()
+        if not self.directory:
+            return total
+        for alive, data in self._read_other_processes():
+            for name, samples in data.items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                merged = total.setdefault(name, {})
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    merged[labels] = _merge(metric.kind, merged.get(labels), value)
+        return total
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                snapshot = self.snapshot()
+                await asyncio.to_thread(self.flush, snapshot)
+            except Exception:
+                logger.exception("[Metrics] Flush failed")
+
+    def start(self) -> None:
+        if not self.directory or self._task is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="metrics-flush")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.flush()
+
+    # ---------- экспозиция ----------
+
+    def render(self) -> str:
+        total = self.collect_all()
+        lines: list[str] = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(total.get(name, {}).items()):
+                if metric.kind == "histogram":
+                    self._render_histogram(lines, metric, labels, value)
+                else:
+                    lines.append(f"{name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+        for name, (documentation, labelnames, fn) in self._derived.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in sorted(fn(total).items()):
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _render_histogram(lines: list[str], metric: Histogram, labels: Labels, counts: list) -> None:
+        cumulative = 0
+        for bound, count in zip((*metric.buckets, math.inf), counts):
+            cumulative += count
+            le = _format_labels((*metric.labelnames, "le"), (*labels, _format_value(bound)))
+            lines.append(f"{metric.name}_bucket{le} {_format_value(cumulative)}")
+        suffix = _format_labels(metric.labelnames, labels)
+        lines.append(f"{metric.name}_sum{suffix} {_format_value(counts[-1])}")
+        lines.append(f"{metric.name}_count{suffix} {_format_value(cumulative)}")
+
+    def stats(self) -> dict:
+        return {"metrics": len(self._metrics), "directory": self.directory, "flushes": self.flushes}
+
+
+metrics = MetricsRegistry(settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
+
+# ---------- метрики, которые пишет код приложения ----------
+
+http_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, until the response body is sent",
+    ("method", "route", "status"),
+)
+db_pool_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the SQLAlchemy pool (including opening a new one)",
+    ("engine",),
+)
+password_hash_queue_wait = metrics.histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a bcrypt job waited for a free thread",
+    ("operation",),
+)
+password_hash_duration = metrics.histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash/verify time in the worker thread",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5),
+)
+bookings_total = metrics.counter(
+    "bookings_total",
+    "Booking operations by action and outcome (ok, rejected - ValueError, error)",
+    ("action", "outcome"),
+)
+
+
+def _cache_hit_ratio(total: dict) -> dict:
+    lookups: dict[str, list[float]] = {}
+    for (cache, result), value in total.get("cache_requests_total", {}).items():
+        lookups.setdefault(cache, [0.0, 0.0])[result == "hit"] += value
+    return {(cache,): hits / (hits + misses) for cache, (misses, hits) in lookups.items() if hits + misses}
+
+
+def register_collectors() -> None:
+    """
+    Метрики, которые на scrape читают счетчики синглтонов (кэши, пулы,
+    очереди). Отложенный импорт: app.metrics не тянет за собой сервисы и БД.
+    """
+    if "cache_requests_total" in metrics._metrics:
+        return
+    from app.database.database import read_engine, write_engine
+    from app.database.query_stats import slow_query_log
+    from app.logging_config import log_subsystem
+    from app.services.airport_cache import airport_cache
+    from app.services.flight_availability import flight_availability
+    from app.services.hold_sweeper import hold_sweeper
+    from app.services.password_hasher import password_hasher
+    from app.services.role_cache import role_cache
+    from app.services.token_cache import token_claims_cache
+
+    caches = {"airports": airport_cache, "roles": role_cache, "jwt_claims": token_claims_cache}
+    engines = {"write": write_engine, "read": read_engine}
+
+    def cache_requests() -> dict:
+        samples = {}
+        for name, cache in caches.items():
+            samples[(name, "hit")] = cache.hits
+            samples[(name, "miss")] = cache.misses
+        return samples
+
+    def pool_connections() -> dict:
+        samples = {}
+        for name, engine in engines.items():
+            pool = engine.sync_engine.pool
+            if hasattr(pool, "checkedout"):
+                samples[(name, "checked_out")] = pool.checkedout()
+                samples[(name, "idle")] = pool.checkedin()
+        return samples
+
+    metrics.counter("cache_requests_total", "In-memory cache lookups", ("cache", "result"), collect=cache_requests)
+    metrics.derived_gauge("cache_hit_ratio", "Share of cache lookups served from memory", ("cache",), _cache_hit_ratio)
+    metrics.gauge("db_pool_connections", "Pooled connections by state", ("engine", "state"), collect=pool_connections)
+    metrics.gauge(
+        "password_hash_queue_depth",
+        "bcrypt jobs waiting for a free thread",
+        collect=lambda: {(): password_hasher.queue_depth},
+    )
+    metrics.counter(
+        "password_hash_rejected_total",
+        "bcrypt jobs rejected because the queue was full (HTTP 503)",
+        collect=lambda: {(): password_hasher.rejected},
+    )
+    metrics.gauge(
+        "flight_view_flights",
+        "Flights in the in-memory availability view",
+        collect=lambda: {(): flight_availability.stats()["flights"]},
+    )
+    metrics.counter(
+        "hold_sweeper_expired_bookings_total",
+        "PENDING bookings cancelled after their seat hold expired",
+        collect=lambda: {(): hold_sweeper.expired_bookings},
+    )
+    metrics.counter(
+        "log_records_dropped_total",
+        "Log records dropped because the log queue was full",
+        collect=lambda: {(): log_subsystem.stats()["dropped"]},
+    )
+    metrics.counter(
+        "slow_queries_total",
+        "SQL statements slower than SLOW_QUERY_LOG_MS",
+        collect=lambda: {(): slow_query_log.total},
+    )
+
+    password_hasher.add_metrics_hook(_observe_password_hash)
+
+
+def _observe_password_hash(operation: str, queue_wait: float, hash_seconds: float) -> None:
+    password_hash_queue_wait.observe(queue_wait, (operation,))
+    password_hash_duration.observe(hash_seconds, (operation,))
+
+
+def count_outcome(action: str):
+    """Декоратор async-метода: bookings_total{action, outcome} по результату вызова"""
+
+    def decorator(func):
+        ok, rejected, error = (action, "ok"), (action, "rejected"), (action, "error")
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                result = await func(*args, **kwargs)
+            except ValueError:
+                bookings_total.inc(rejected)
+                raise
+            except Exception:
+                bookings_total.inc(error)
+                raise
+            bookings_total.inc(ok)
+            return result
+
+        return wrapper
+
+    return decorator
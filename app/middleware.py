@@ -0,0 +1,117 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.query_stats import RequestStats, current_request_stats
+from app.metrics import http_request_duration, http_requests_in_flight
+
+access_logger = logging.getLogger("app.access")
+
+
+class RequestStatsMiddleware:
+    """
+    ⏱️ Профиль каждого HTTP-запроса: общее время, число SQL, время в БД, строки.
+
+    Счетчики копятся в RequestStats из contextvar - их пополняют слушатели
+    SQLAlchemy на движках (app.database.query_stats). Итог уходит в:
+      - заголовок Server-Timing (app - до начала ответа, db - время SQL);
+      - одну строку access-лога "app.access" по окончании ответа.
+    Чистый ASGI (без BaseHTTPMiddleware): тело ответа не оборачивается,
+    потоковые ответы учитываются целиком. Строка запроса не пишется -
+    в параметрах бывают персональные данные.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True, log_requests: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self.log_requests = log_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        log_request = self.log_requests and access_logger.isEnabledFor(logging.INFO)
+        if scope["type"] != "http" or not (self.server_timing or log_request):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    timing = (
+                        f'app;dur={stats.elapsed_ms():.1f}, '
+                        f'db;dur={stats.sql_ms:.1f};desc="{stats.sql_count} queries, {stats.rows} rows"'
+                    )
+                    message["headers"] = [*message.get("headers", ()), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_request_stats.reset(token)
+            if log_request:
+                self._log(scope, status, stats)
+
+    @staticmethod
+    def _log(scope: Scope, status: int, stats: RequestStats) -> None:
+        duration_ms = stats.elapsed_ms()
+        access_logger.info(
+            "%s %s %d %.1fms sql=%d/%.1fms rows=%d",
+            scope["method"],
+            scope["path"],
+            status,
+            duration_ms,
+            stats.sql_count,
+            stats.sql_ms,
+            stats.rows,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "sql_count": stats.sql_count,
+                "sql_ms": round(stats.sql_ms, 2),
+                "rows": stats.rows,
+            },
+        )
+
+
+class MetricsMiddleware:
+    """
+    📈 Метрики HTTP: запросы в обработке и гистограмма времени по шаблону
+    маршрута ("/flights/{flight_id}", а не конкретный путь - число серий
+    ограничено числом маршрутов). Время - до отправки всего тела ответа.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # Маршрут роутер FastAPI кладет в scope после сопоставления пути
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                (scope["method"], route.path if route is not None else "unmatched", str(status)),
+            )
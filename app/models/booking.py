@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
-from sqlalchemy import String, ForeignKey, DateTime, Integer, Enum
+from sqlalchemy import String, ForeignKey, DateTime, Integer, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.database import Base
 import enum
@@ -19,11 +19,16 @@ class BookingStatus(str, enum.Enum):
 
 class BookingModel(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Фильтр списка броней по статусу с сортировкой/диапазоном по дате
+        Index("ix_bookings_status_created_at", "status", "created_at"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     booking_number: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
     
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    flight_id: Mapped[int] = mapped_column(ForeignKey("flights.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    flight_id: Mapped[int] = mapped_column(ForeignKey("flights.id"), nullable=False, index=True)
     
     passenger_name: Mapped[str] = mapped_column(String(150), nullable=False)  # Increased from 100 to 150
     passenger_email: Mapped[str] = mapped_column(String(150), nullable=False)  # Increased from 100 to 150
@@ -1,5 +1,5 @@
 """Flight and Airport models"""
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 from datetime import datetime
@@ -16,17 +16,21 @@ class AirportModel(Base):
     country = Column(String(255))
     
     # Relationships
+    # Коллекции рейсов аэропорта никогда не грузятся неявно: с lazy="selectin"
+    # каждый аэропорт тянул за собой все свои рейсы. Нужны - явный selectinload.
     departing_flights = relationship(
         "FlightModel",
         foreign_keys="FlightModel.departure_airport_id",
         back_populates="departure_airport",
-        lazy="selectin"
+        lazy="select",
+        passive_deletes=True,
     )
     arriving_flights = relationship(
         "FlightModel",
         foreign_keys="FlightModel.arrival_airport_id",
         back_populates="arrival_airport",
-        lazy="selectin"
+        lazy="select",
+        passive_deletes=True,
     )
 
 
@@ -39,23 +43,39 @@ class FlightModel(Base):
     airline = Column(String(255))
     departure_airport_id = Column(Integer, ForeignKey("airports.id"), nullable=False)
     arrival_airport_id = Column(Integer, ForeignKey("airports.id"), nullable=False)
-    departure_time = Column(DateTime, default=datetime.now)
+    departure_time = Column(DateTime, default=datetime.now, index=True)
     arrival_time = Column(DateTime)
     total_seats = Column(Integer, default=180)
     available_seats = Column(Integer, default=180)
     price = Column(Float, default=0.0)
     
     # Relationships
+    # Аэропорты подгружаются только запросами, которым они нужны для ответа
+    # (см. FlightRepository, параметр with_airports)
     departure_airport = relationship(
         "AirportModel",
         foreign_keys=[departure_airport_id],
         back_populates="departing_flights",
-        lazy="selectin"
+        lazy="select",
     )
     arrival_airport = relationship(
         "AirportModel",
         foreign_keys=[arrival_airport_id],
         back_populates="arriving_flights",
-        lazy="selectin"
+        lazy="select",
     )
     bookings = relationship("BookingModel", back_populates="flight", cascade="all, delete-orphan")
+
+
+class FlightSeatModel(Base):
+    """Занятое место на рейсе: строка есть - место закреплено за бронью"""
+    __tablename__ = "flight_seats"
+    __table_args__ = (
+        # Одно место рейса не может достаться двум броням, даже при гонке процессов
+        UniqueConstraint("flight_id", "seat_number", name="uq_flight_seats_flight_seat"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    flight_id = Column(Integer, ForeignKey("flights.id"), nullable=False)
+    seat_number = Column(Integer, nullable=False)  # 1..total_seats
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, index=True)
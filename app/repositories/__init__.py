@@ -1,9 +1,11 @@
 from app.repositories.flight_repository import FlightRepository, AirportRepository
 from app.repositories.booking_repository import BookingRepository, PaymentRepository
+from app.repositories.seat_repository import SeatRepository
 
 __all__ = [
     'FlightRepository',
     'AirportRepository',
     'BookingRepository',
     'PaymentRepository',
+    'SeatRepository',
 ]
@@ -28,7 +28,6 @@ class BaseRepository:
 
         if limit is not None and offset is not None:
             query = query.limit(limit).offset(offset)
-        # print(query.compile(bind=engine, compile_kwargs={"literal_binds": True}))
         result = await self.session.execute(query)
         result = [
             self.schema.model_validate(model, from_attributes=True)
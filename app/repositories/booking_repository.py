@@ -1,10 +1,31 @@
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.booking import BookingModel, PaymentModel, BookingStatus
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Колонки списка броней (ровно поля BookingListRead) - без загрузки ORM-сущностей
+BOOKING_LIST_COLUMNS = (
+    BookingModel.id,
+    BookingModel.booking_number,
+    BookingModel.flight_id,
+    BookingModel.passenger_name,
+    BookingModel.passenger_email,
+    BookingModel.passenger_phone,
+    BookingModel.seats_count,
+    BookingModel.total_price,
+    BookingModel.status,
+)
+
+# Допустимые сортировки списка: "-" в начале - по убыванию
+BOOKING_SORT_COLUMNS = {
+    "id": BookingModel.id,
+    "created_at": BookingModel.created_at,
+    "total_price": BookingModel.total_price,
+}
+
 
 class BookingRepository:
     def __init__(self, db_session: AsyncSession):
@@ -35,62 +56,138 @@ class BookingRepository:
         return result.scalars().all()
 
     async def get_all_bookings(self) -> list[BookingModel]:
-        logger.info("[BookingRepo] Fetching all bookings")
+        logger.debug("[BookingRepo] Fetching all bookings")
         result = await self.db_session.execute(select(BookingModel))
         bookings = result.scalars().all()
-        logger.info(f"[BookingRepo] Found {len(bookings)} bookings")
+        logger.debug("[BookingRepo] Found %d bookings", len(bookings))
         return bookings
 
+    async def list_bookings(
+        self,
+        limit: int,
+        offset: int = 0,
+        sort: str = "id",
+        status: BookingStatus | None = None,
+        flight_id: int | None = None,
+        user_id: int | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+    ) -> list[dict]:
+        """Страница списка броней: фильтры, сортировка и только нужные колонки"""
+        query = select(*BOOKING_LIST_COLUMNS)
+        if status is not None:
+            query = query.where(BookingModel.status == status)
+        if flight_id is not None:
+            query = query.where(BookingModel.flight_id == flight_id)
+        if user_id is not None:
+            query = query.where(BookingModel.user_id == user_id)
+        if date_from is not None:
+            query = query.where(BookingModel.created_at >= date_from)
+        if date_to is not None:
+            query = query.where(BookingModel.created_at < date_to)
+
+        column = BOOKING_SORT_COLUMNS[sort.lstrip("-")]
+        if sort.startswith("-"):
+            query = query.order_by(column.desc(), BookingModel.id.desc())
+        else:
+            query = query.order_by(column, BookingModel.id)
+
+        result = await self.db_session.execute(query.limit(limit).offset(offset))
+        # Обычные dict из кортежей строк: заметно дешевле RowMapping и сразу годятся для orjson
+        keys = result.keys()
+        return [dict(zip(keys, row)) for row in result.all()]
+
+    # Методы записи не делают commit: транзакцией владеет сервис (DBManager),
+    # а RETURNING отдает строку сразу, без refresh после коммита
+
     async def create_booking(self, booking_data: dict) -> BookingModel:
-        logger.info(f"[BookingRepo] Creating booking with number {booking_data.get('booking_number')}")
-        try:
-            booking = BookingModel(**booking_data)
-            self.db_session.add(booking)
-            logger.info(f"[BookingRepo] Added booking to session")
-            
-            await self.db_session.flush()
-            logger.info(f"[BookingRepo] Flushed booking to database, ID: {booking.id}")
-            
-            await self.db_session.commit()
-            logger.info(f"[BookingRepo] Committed booking, ID: {booking.id}")
-            
-            await self.db_session.refresh(booking)
-            logger.info(f"[BookingRepo] Refreshed booking data")
-            
-            return booking
-        except Exception as e:
-            logger.error(f"[BookingRepo] Error creating booking: {str(e)}", exc_info=True)
-            await self.db_session.rollback()
-            raise
+        logger.debug("[BookingRepo] Creating booking with number %s", booking_data.get('booking_number'))
+        result = await self.db_session.execute(
+            insert(BookingModel).values(**booking_data).returning(BookingModel)
+        )
+        booking = result.scalar_one()
+        logger.debug("[BookingRepo] Inserted booking, ID: %s", booking.id)
+        return booking
+
+    async def create_bookings(self, rows: list[dict]) -> list[BookingModel]:
+        """Многострочный INSERT ... RETURNING; порядок ответа совпадает с rows"""
+        logger.debug("[BookingRepo] Inserting %d bookings", len(rows))
+        # sort_by_parameter_order на SQLite откатывается к INSERT на каждую строку,
+        # поэтому порядок восстанавливаем сами по уникальному booking_number
+        result = await self.db_session.scalars(
+            insert(BookingModel).returning(BookingModel), rows
+        )
+        by_number = {booking.booking_number: booking for booking in result.all()}
+        return [by_number[row["booking_number"]] for row in rows]
 
     async def update_booking(
-        self, booking_id: int, booking_data: dict
+        self, booking_id: int, booking_data: dict, *where
     ) -> BookingModel | None:
-        logger.info(f"[BookingRepo] Updating booking {booking_id}")
-        booking = await self.get_booking_by_id(booking_id)
-        if booking:
-            for key, value in booking_data.items():
-                if value is not None:
-                    setattr(booking, key, value)
-            await self.db_session.flush()
-            await self.db_session.commit()
-            await self.db_session.refresh(booking)
-            logger.info(f"[BookingRepo] Updated booking {booking_id}")
-        return booking
+        """UPDATE ... RETURNING; where - дополнительные условия (например, на статус)"""
+        logger.debug("[BookingRepo] Updating booking %s", booking_id)
+        values = {key: value for key, value in booking_data.items() if value is not None}
+        result = await self.db_session.execute(
+            update(BookingModel)
+            .where(BookingModel.id == booking_id, *where)
+            .values(**values)
+            .returning(BookingModel)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
 
-    async def delete_booking(self, booking_id: int) -> bool:
-        logger.info(f"[BookingRepo] Deleting booking {booking_id}")
-        booking = await self.get_booking_by_id(booking_id)
-        if booking:
-            await self.db_session.delete(booking)
-            await self.db_session.commit()
-            logger.info(f"[BookingRepo] Deleted booking {booking_id}")
-            return True
-        return False
+    async def delete_booking(self, booking_id: int) -> BookingModel | None:
+        """Удаляет бронь вместе с ее платежом и возвращает удаленную строку"""
+        logger.debug("[BookingRepo] Deleting booking %s", booking_id)
+        await self.db_session.execute(
+            delete(PaymentModel).where(PaymentModel.booking_id == booking_id)
+        )
+        result = await self.db_session.execute(
+            delete(BookingModel).where(BookingModel.id == booking_id).returning(BookingModel)
+        )
+        return result.scalar_one_or_none()
 
-    async def cancel_booking(self, booking_id: int) -> BookingModel | None:
-        logger.info(f"[BookingRepo] Cancelling booking {booking_id}")
-        return await self.update_booking(booking_id, {"status": BookingStatus.CANCELLED})
+    async def cancel_booking(
+        self, booking_id: int, from_status: BookingStatus
+    ) -> BookingModel | None:
+        """Отменяет бронь, только если она все еще в статусе from_status (иначе None)"""
+        logger.debug("[BookingRepo] Cancelling booking %s", booking_id)
+        return await self.update_booking(
+            booking_id,
+            {"status": BookingStatus.CANCELLED},
+            BookingModel.status == from_status,
+        )
+
+    async def confirm_booking(self, booking_id: int) -> BookingModel | None:
+        """Подтверждает бронь, ожидающую оплаты (иначе None: отменена, истекла или уже подтверждена)"""
+        logger.debug("[BookingRepo] Confirming booking %s", booking_id)
+        return await self.update_booking(
+            booking_id,
+            {"status": BookingStatus.CONFIRMED},
+            BookingModel.status == BookingStatus.PENDING,
+        )
+
+    async def expire_pending(self, created_before: datetime, limit: int) -> list[tuple[int, int, int]]:
+        """
+        Отменяет до limit самых старых PENDING-броней, созданных раньше created_before.
+        Подзапрос идет по индексу (status, created_at); возвращает (id, flight_id, seats_count).
+        """
+        stale = (
+            select(BookingModel.id)
+            .where(
+                BookingModel.status == BookingStatus.PENDING,
+                BookingModel.created_at < created_before,
+            )
+            .order_by(BookingModel.created_at)
+            .limit(limit)
+        )
+        result = await self.db_session.execute(
+            update(BookingModel)
+            .where(BookingModel.id.in_(stale), BookingModel.status == BookingStatus.PENDING)
+            .values(status=BookingStatus.CANCELLED)
+            .returning(BookingModel.id, BookingModel.flight_id, BookingModel.seats_count)
+            .execution_options(synchronize_session=False)
+        )
+        return [tuple(row) for row in result.all()]
 
 
 class PaymentRepository:
@@ -118,31 +215,24 @@ class PaymentRepository:
         return result.scalars().first()
 
     async def create_payment(self, payment_data: dict) -> PaymentModel:
-        logger.info(f"[PaymentRepo] Creating payment for booking {payment_data.get('booking_id')}")
-        try:
-            payment = PaymentModel(**payment_data)
-            self.db_session.add(payment)
-            await self.db_session.flush()
-            await self.db_session.commit()
-            await self.db_session.refresh(payment)
-            logger.info(f"[PaymentRepo] Payment created, ID: {payment.id}")
-            return payment
-        except Exception as e:
-            logger.error(f"[PaymentRepo] Error creating payment: {str(e)}", exc_info=True)
-            await self.db_session.rollback()
-            raise
+        logger.debug("[PaymentRepo] Creating payment for booking %s", payment_data.get('booking_id'))
+        result = await self.db_session.execute(
+            insert(PaymentModel).values(**payment_data).returning(PaymentModel)
+        )
+        payment = result.scalar_one()
+        logger.debug("[PaymentRepo] Payment inserted, ID: %s", payment.id)
+        return payment
 
     async def update_payment(
         self, payment_id: int, payment_data: dict
     ) -> PaymentModel | None:
-        logger.info(f"[PaymentRepo] Updating payment {payment_id}")
-        payment = await self.get_payment_by_id(payment_id)
-        if payment:
-            for key, value in payment_data.items():
-                if value is not None:
-                    setattr(payment, key, value)
-            await self.db_session.flush()
-            await self.db_session.commit()
-            await self.db_session.refresh(payment)
-            logger.info(f"[PaymentRepo] Updated payment {payment_id}")
-        return payment
+        logger.debug("[PaymentRepo] Updating payment %s", payment_id)
+        values = {key: value for key, value in payment_data.items() if value is not None}
+        result = await self.db_session.execute(
+            update(PaymentModel)
+            .where(PaymentModel.id == payment_id)
+            .values(**values)
+            .returning(PaymentModel)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
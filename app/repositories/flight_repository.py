@@ -1,47 +1,148 @@
+from collections.abc import AsyncIterator, Iterable
 from datetime import datetime
-from sqlalchemy import select, and_, func
+from sqlalchemy import case, delete, func, select, update, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.flight import FlightModel, AirportModel
+from sqlalchemy.orm import aliased, joinedload
+from app.models.booking import BookingModel, BookingStatus, PaymentModel
+from app.models.flight import FlightModel, FlightSeatModel, AirportModel
+
+
+def _after_cursor(after: tuple[datetime, int] | None):
+    """Keyset-условие: строки строго после (departure_time, id)"""
+    if after is None:
+        return None
+    departure_time, flight_id = after
+    return or_(
+        FlightModel.departure_time > departure_time,
+        and_(FlightModel.departure_time == departure_time, FlightModel.id > flight_id),
+    )
+
+
+def _with_airports(query):
+    """Аэропорты рейса одним JOIN - для ответов, где они нужны (FlightRead/FlightListRead)"""
+    return query.options(
+        joinedload(FlightModel.departure_airport, innerjoin=True),
+        joinedload(FlightModel.arrival_airport, innerjoin=True),
+    )
 
 
 class FlightRepository:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def get_flight_by_id(self, flight_id: int) -> FlightModel | None:
-        result = await self.db_session.execute(
-            select(FlightModel).where(FlightModel.id == flight_id)
-        )
+    async def get_flight_by_id(
+        self, flight_id: int, with_airports: bool = False
+    ) -> FlightModel | None:
+        query = select(FlightModel).where(FlightModel.id == flight_id)
+        if with_airports:
+            query = _with_airports(query)
+        result = await self.db_session.execute(query)
         return result.scalars().first()
 
-    async def get_all_flights(self) -> list[FlightModel]:
-        result = await self.db_session.execute(select(FlightModel))
-        return result.scalars().all()
-
-    async def search_flights(
-        self,
-        departure_airport_id: int | None = None,
-        arrival_airport_id: int | None = None,
-        departure_date: datetime | None = None,
-    ) -> list[FlightModel]:
-        query = select(FlightModel)
-        filters = []
-
-        if departure_airport_id:
-            filters.append(FlightModel.departure_airport_id == departure_airport_id)
-        if arrival_airport_id:
-            filters.append(FlightModel.arrival_airport_id == arrival_airport_id)
-        if departure_date:
-            filters.append(
-                func.date(FlightModel.departure_time)
-                == func.date(departure_date)
+    async def stream_flight_rows(
+        self, after: tuple[datetime, int] | None = None, chunk_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """
+        Потоково отдает рейсы вместе с аэропортами как плоские dict-строки.
+        Строки читаются серверным курсором порциями по chunk_size,
+        поэтому память не растет вместе с таблицей.
+        """
+        departure = aliased(AirportModel)
+        arrival = aliased(AirportModel)
+        query = (
+            select(
+                FlightModel.id,
+                FlightModel.flight_number,
+                FlightModel.airline,
+                FlightModel.departure_time,
+                FlightModel.arrival_time,
+                FlightModel.available_seats,
+                FlightModel.price,
+                departure.id.label("departure_airport_id"),
+                departure.code.label("departure_airport_code"),
+                departure.name.label("departure_airport_name"),
+                departure.city.label("departure_airport_city"),
+                departure.country.label("departure_airport_country"),
+                arrival.id.label("arrival_airport_id"),
+                arrival.code.label("arrival_airport_code"),
+                arrival.name.label("arrival_airport_name"),
+                arrival.city.label("arrival_airport_city"),
+                arrival.country.label("arrival_airport_country"),
             )
+            .join(departure, FlightModel.departure_airport_id == departure.id)
+            .join(arrival, FlightModel.arrival_airport_id == arrival.id)
+            .order_by(FlightModel.departure_time, FlightModel.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        condition = _after_cursor(after)
+        if condition is not None:
+            query = query.where(condition)
 
-        if filters:
-            query = query.where(and_(*filters))
+        result = await self.db_session.stream(query)
+        async for row in result.mappings():
+            yield dict(row)
 
+    async def get_availability_rows(self, flight_ids: Iterable[int] | None = None) -> list[dict]:
+        """
+        Рейсы (все или только flight_ids) с суммой мест в PENDING и в
+        подтвержденных бронях - одним запросом (брони агрегируются
+        подзапросом по flight_id).
+        """
+        def seats_in(*statuses):
+            return func.sum(
+                case((BookingModel.status.in_(statuses), BookingModel.seats_count), else_=0)
+            )
+
+        held = select(
+            BookingModel.flight_id,
+            seats_in(BookingStatus.PENDING).label("pending_seats"),
+            seats_in(BookingStatus.CONFIRMED, BookingStatus.COMPLETED).label("confirmed_seats"),
+        ).group_by(BookingModel.flight_id)
+        if flight_ids is not None:
+            flight_ids = list(flight_ids)
+            held = held.where(BookingModel.flight_id.in_(flight_ids))
+        held = held.subquery()
+        query = (
+            select(
+                FlightModel.id,
+                FlightModel.flight_number,
+                FlightModel.airline,
+                FlightModel.departure_airport_id,
+                FlightModel.arrival_airport_id,
+                FlightModel.departure_time,
+                FlightModel.arrival_time,
+                FlightModel.total_seats,
+                FlightModel.available_seats,
+                FlightModel.price,
+                func.coalesce(held.c.pending_seats, 0).label("pending_seats"),
+                func.coalesce(held.c.confirmed_seats, 0).label("confirmed_seats"),
+            )
+            .outerjoin(held, held.c.flight_id == FlightModel.id)
+        )
+        if flight_ids is not None:
+            query = query.where(FlightModel.id.in_(flight_ids))
         result = await self.db_session.execute(query)
-        return result.scalars().all()
+        return [dict(row) for row in result.mappings()]
+
+    async def get_db_now(self) -> datetime:
+        """Текущее время по часам БД - им же пишется updated_at"""
+        return await self.db_session.scalar(select(func.now()))
+
+    async def get_changed_flight_ids(self, since: datetime) -> set[int]:
+        """Рейсы, измененные с since: сам рейс или любая его бронь (по updated_at)"""
+        result = await self.db_session.execute(
+            select(FlightModel.id)
+            .where(FlightModel.updated_at >= since)
+            .union(select(BookingModel.flight_id).where(BookingModel.updated_at >= since))
+        )
+        return set(result.scalars())
+
+    async def count_flights(self) -> int:
+        return await self.db_session.scalar(select(func.count()).select_from(FlightModel))
+
+    async def get_flight_ids(self) -> set[int]:
+        result = await self.db_session.execute(select(FlightModel.id))
+        return set(result.scalars())
 
     async def create_flight(self, flight_data: dict) -> FlightModel:
         flight = FlightModel(**flight_data)
@@ -50,7 +151,8 @@ class FlightRepository:
         return flight
 
     async def update_flight(self, flight_id: int, flight_data: dict) -> FlightModel | None:
-        flight = await self.get_flight_by_id(flight_id)
+        # session.get берет уже загруженный рейс из identity map без повторного SELECT
+        flight = await self.db_session.get(FlightModel, flight_id)
         if flight:
             for key, value in flight_data.items():
                 if value is not None:
@@ -58,13 +160,53 @@ class FlightRepository:
             await self.db_session.flush()
         return flight
 
+    async def reserve_seats(self, flight_id: int, seats_count: int) -> float | None:
+        """
+        Атомарно списывает места одним условным UPDATE.
+        Возвращает цену билета или None, если рейса нет или мест не хватает.
+        """
+        result = await self.db_session.execute(
+            update(FlightModel)
+            .where(
+                FlightModel.id == flight_id,
+                FlightModel.available_seats >= seats_count,
+            )
+            .values(available_seats=FlightModel.available_seats - seats_count)
+            .returning(FlightModel.price)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_available_seats(self, flight_ids: list[int]) -> dict[int, int]:
+        """Свободные места по id рейсов (отсутствующих рейсов в ответе нет)"""
+        result = await self.db_session.execute(
+            select(FlightModel.id, FlightModel.available_seats).where(
+                FlightModel.id.in_(flight_ids)
+            )
+        )
+        return dict(result.all())
+
+    async def release_seats(self, flight_id: int, seats_count: int) -> bool:
+        """Атомарно возвращает места на рейс"""
+        result = await self.db_session.execute(
+            update(FlightModel)
+            .where(FlightModel.id == flight_id)
+            .values(available_seats=FlightModel.available_seats + seats_count)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
     async def delete_flight(self, flight_id: int) -> bool:
-        flight = await self.get_flight_by_id(flight_id)
-        if flight:
-            await self.db_session.delete(flight)
-            await self.db_session.flush()
-            return True
-        return False
+        """
+        Удаляет рейс вместе с бронями. Места и платежи ссылаются на брони
+        (FK без ON DELETE, foreign_keys=ON) - удаляем снизу вверх.
+        """
+        flight_bookings = select(BookingModel.id).where(BookingModel.flight_id == flight_id)
+        await self.db_session.execute(delete(FlightSeatModel).where(FlightSeatModel.flight_id == flight_id))
+        await self.db_session.execute(delete(PaymentModel).where(PaymentModel.booking_id.in_(flight_bookings)))
+        await self.db_session.execute(delete(BookingModel).where(BookingModel.flight_id == flight_id))
+        result = await self.db_session.execute(delete(FlightModel).where(FlightModel.id == flight_id))
+        return result.rowcount > 0
 
 
 class AirportRepository:
@@ -83,6 +225,12 @@ class AirportRepository:
         )
         return result.scalars().first()
 
+    async def get_airports_by_ids(self, airport_ids: list[int]) -> list[AirportModel]:
+        result = await self.db_session.execute(
+            select(AirportModel).where(AirportModel.id.in_(airport_ids))
+        )
+        return result.scalars().all()
+
     async def get_all_airports(self) -> list[AirportModel]:
         result = await self.db_session.execute(select(AirportModel))
         return result.scalars().all()
@@ -97,7 +245,7 @@ class AirportRepository:
         return airport
 
     async def update_airport(self, airport_id: int, airport_data: dict) -> AirportModel | None:
-        airport = await self.get_airport_by_id(airport_id)
+        airport = await self.db_session.get(AirportModel, airport_id)
         if airport:
             for key, value in airport_data.items():
                 if value is not None:
@@ -0,0 +1,53 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.flight import FlightModel, FlightSeatModel
+
+
+class SeatRepository:
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def get_seat_state(self, flight_id: int) -> tuple[int, list[int], int] | None:
+        """(total_seats, занятые места, available_seats) одним запросом; None - рейса нет"""
+        result = await self.db_session.execute(
+            select(FlightModel.total_seats, FlightSeatModel.seat_number, FlightModel.available_seats)
+            .select_from(FlightModel)
+            .outerjoin(FlightSeatModel, FlightSeatModel.flight_id == FlightModel.id)
+            .where(FlightModel.id == flight_id)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        total_seats, _, available_seats = rows[0]
+        return total_seats or 0, [seat for _, seat, _ in rows if seat is not None], available_seats
+
+    async def insert_seats(self, rows: list[dict]) -> set[tuple[int, int]]:
+        """
+        Закрепляет места многострочным INSERT; уже занятые (другим процессом)
+        места пропускаются. Возвращает реально вставленные (flight_id, seat_number).
+        """
+        if not rows:
+            return set()
+        result = await self.db_session.execute(
+            insert(FlightSeatModel)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["flight_id", "seat_number"])
+            .returning(FlightSeatModel.flight_id, FlightSeatModel.seat_number)
+        )
+        return {tuple(row) for row in result.all()}
+
+    async def release_booking_seats(self, booking_id: int) -> list[tuple[int, int]]:
+        """Освобождает места брони; возвращает (flight_id, seat_number)"""
+        return await self.release_bookings_seats([booking_id])
+
+    async def release_bookings_seats(self, booking_ids: list[int]) -> list[tuple[int, int]]:
+        """Освобождает места нескольких броней одним DELETE"""
+        if not booking_ids:
+            return []
+        result = await self.db_session.execute(
+            delete(FlightSeatModel)
+            .where(FlightSeatModel.booking_id.in_(booking_ids))
+            .returning(FlightSeatModel.flight_id, FlightSeatModel.seat_number)
+        )
+        return [tuple(row) for row in result.all()]
@@ -1,6 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.models.roles import RoleModel
 from app.models.users import UserModel
 from app.repositories.base import BaseRepository
 from app.schemes.users import SUserGet
@@ -26,3 +27,20 @@ class UsersRepository(BaseRepository):
 
         result = SUserGetWithRels.model_validate(model, from_attributes=True)
         return result
+
+    async def get_credentials(self, email: str):
+        """
+        Данные для логина одним JOIN-запросом без Pydantic-моделей:
+        строка (id, hashed_password, role_name) или None
+        """
+        query = (
+            select(
+                self.model.id,
+                self.model.hashed_password,
+                RoleModel.name.label("role_name"),
+            )
+            .join(RoleModel, self.model.role_id == RoleModel.id)
+            .where(self.model.email == email)
+        )
+        result = await self.session.execute(query)
+        return result.one_or_none()
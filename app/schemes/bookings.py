@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, Field
 from app.models.booking import BookingStatus
 from app.schemes.flights import FlightListRead
@@ -31,6 +32,27 @@ class BookingRead(BookingBase):
         from_attributes = True
 
 
+class BookingBatchCreate(BaseModel):
+    items: list[BookingCreate] = Field(..., min_length=1, max_length=1000)
+    # all_or_nothing - либо создаются все брони, либо ни одной;
+    # best_effort - создается все, на что хватает мест
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+
+
+class BookingBatchItemResult(BaseModel):
+    index: int
+    success: bool
+    booking: BookingRead | None = None
+    error: str | None = None
+
+
+class BookingBatchRead(BaseModel):
+    mode: str
+    created: int
+    failed: int
+    results: list[BookingBatchItemResult]
+
+
 class BookingListRead(BaseModel):
     id: int
     booking_number: str
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 
@@ -63,3 +63,48 @@ class FlightListRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SeatMapRead(BaseModel):
+    flight_id: int
+    total_seats: int
+    free_count: int
+    seats_per_row: int
+    free_seats: list[str]
+    adjacent_block: list[str] | None = None
+
+
+class FlightAvailabilityRead(BaseModel):
+    flight_id: int
+    flight_number: str
+    departure_code: str | None
+    arrival_code: str | None
+    departure_date: date
+    total_seats: int
+    available_seats: int
+    pending_seats: int
+    confirmed_seats: int
+    price: float
+
+
+class RouteRead(BaseModel):
+    departure_time: datetime
+    arrival_time: datetime
+    duration_minutes: int
+    stops: int
+    price: float
+    flights: list[FlightListRead]
+
+
+class FareDayRead(BaseModel):
+    date: date
+    min_price: float | None
+    available_seats: int
+    flights: int
+
+
+class FareCalendarRead(BaseModel):
+    departure_airport_id: int
+    arrival_airport_id: int
+    month: str
+    days: list[FareDayRead]
@@ -0,0 +1,102 @@
+from collections.abc import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.flight_repository import AirportRepository
+from app.schemes.flights import AirportRead
+
+
+class AirportCache:
+    """
+    🗺️ Справочник аэропортов в памяти процесса.
+
+    Аэропортов мало и меняются они редко, поэтому весь справочник грузится
+    один раз при старте, а поиск по id/коду идет по словарям. Записи через
+    AirportService обновляют кэш после коммита (write-through), так что
+    откаченная транзакция в кэш не попадает.
+    Кэш у каждого процесса свой.
+    """
+
+    def __init__(self) -> None:
+        self._by_id: dict[int, AirportRead] = {}
+        self._by_code: dict[str, AirportRead] = {}
+        self.loaded = False
+        # Растет при каждом изменении - по нему производные индексы понимают, что пора перестроиться
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def load(self, db_session: AsyncSession) -> None:
+        airports = await AirportRepository(db_session).get_all_airports()
+        self._by_id.clear()
+        self._by_code.clear()
+        for airport in airports:
+            self.put(airport)
+        self.loaded = True
+
+    async def ensure_loaded(self, db_session: AsyncSession) -> None:
+        if not self.loaded:
+            await self.load(db_session)
+
+    async def resolve(self, db_session: AsyncSession, airport_ids: Iterable[int]) -> None:
+        """Дочитывает из БД аэропорты, которых нет в кэше (созданы другими процессами)"""
+        missing = [airport_id for airport_id in set(airport_ids) if airport_id not in self._by_id]
+        if missing:
+            for airport in await AirportRepository(db_session).get_airports_by_ids(missing):
+                self.put(airport)
+
+    def get_by_id(self, airport_id: int) -> AirportRead | None:
+        airport = self._by_id.get(airport_id)
+        if airport is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return airport
+
+    def get_by_code(self, code: str) -> AirportRead | None:
+        airport = self._by_code.get(code.upper())
+        if airport is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return airport
+
+    def all(self) -> list[AirportRead]:
+        self.hits += 1
+        return list(self._by_id.values())
+
+    def put(self, airport) -> AirportRead:
+        """Кладет (или обновляет) аэропорт; принимает ORM-модель или AirportRead"""
+        cached = AirportRead.model_validate(airport, from_attributes=True)
+        previous = self._by_id.get(cached.id)
+        if previous is not None and previous.code != cached.code:
+            self._by_code.pop(previous.code, None)
+        self._by_id[cached.id] = cached
+        self._by_code[cached.code.upper()] = cached
+        self.version += 1
+        return cached
+
+    def remove(self, airport_id: int) -> None:
+        airport = self._by_id.pop(airport_id, None)
+        if airport is not None:
+            self._by_code.pop(airport.code.upper(), None)
+            self.version += 1
+
+    def invalidate(self) -> None:
+        """Полный сброс - следующее обращение через ensure_loaded перечитает БД"""
+        self._by_id.clear()
+        self._by_code.clear()
+        self.loaded = False
+        self.version += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._by_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+airport_cache = AirportCache()
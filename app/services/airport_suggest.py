@@ -0,0 +1,70 @@
+import re
+from bisect import bisect_left
+
+from app.schemes.flights import AirportRead
+from app.services.airport_cache import AirportCache, airport_cache
+
+WORD = re.compile(r"\w+")
+
+# Поля в порядке приоритета: совпадение по коду выше, чем по городу и названию
+FIELDS = ("code", "city", "name")
+
+
+def normalize(text: str) -> str:
+    """Регистр и "ё" не важны: "Шерем", "шЕрем" и "ШЕРЁМ" ищут одно и то же"""
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+class AirportSuggestIndex:
+    """
+    🔎 Автодополнение аэропортов по префиксу кода, города и названия.
+
+    Для каждого поля - отсортированный массив ключей: нормализованная строка
+    с начала и с каждого слова ("международный аэропорт пулково" находится и
+    по "пулк"). Запрос - bisect до первого ключа с префиксом и проход, пока
+    префикс совпадает. Индекс строится по кэшу справочника аэропортов и
+    перестраивается при первом запросе после любой записи в него.
+    """
+
+    def __init__(self, cache: AirportCache) -> None:
+        self.cache = cache
+        self._keys: dict[str, list[str]] = {}
+        self._ids: dict[str, list[int]] = {}
+        self._version = -1
+        self.builds = 0
+
+    def build(self) -> None:
+        airports = self.cache.all()
+        for field in FIELDS:
+            entries = []
+            for airport in airports:
+                value = normalize(getattr(airport, field))
+                entries.extend((value[match.start():], airport.id) for match in WORD.finditer(value))
+            entries.sort()
+            self._keys[field] = [key for key, _ in entries]
+            self._ids[field] = [airport_id for _, airport_id in entries]
+        self._version = self.cache.version
+        self.builds += 1
+
+    def suggest(self, query: str, limit: int = 10) -> list[AirportRead]:
+        if self._version != self.cache.version:
+            self.build()
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        found: dict[int, AirportRead] = {}
+        for field in FIELDS:
+            keys, ids = self._keys[field], self._ids[field]
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and len(found) < limit and keys[index].startswith(prefix):
+                airport_id = ids[index]
+                if airport_id not in found:
+                    found[airport_id] = self.cache.get_by_id(airport_id)
+                index += 1
+        return list(found.values())
+
+    def stats(self) -> dict:
+        return {"keys": sum(len(keys) for keys in self._keys.values()), "builds": self.builds}
+
+
+airport_suggest = AirportSuggestIndex(airport_cache)
@@ -16,6 +16,9 @@ from app.schemes.users import (
 )
 from app.schemes.relations_users_roles import SUserGetWithRels
 from app.services.base import BaseService
+from app.services.password_hasher import password_hasher
+from app.services.role_cache import role_cache
+from app.services.token_cache import token_claims_cache
 import jwt
 from passlib.context import CryptContext
 
@@ -41,6 +44,18 @@ class AuthService(BaseService):
     def hash_password(cls, plain_password) -> str:
         return cls.pwd_context.hash(plain_password)
 
+    @classmethod
+    async def verify_password_async(cls, plain_password, hashed_password) -> bool:
+        """verify_password в пуле bcrypt, не блокируя event loop"""
+        return await password_hasher.run(
+            "verify", cls.verify_password, plain_password, hashed_password
+        )
+
+    @classmethod
+    async def hash_password_async(cls, plain_password) -> str:
+        """hash_password в пуле bcrypt, не блокируя event loop"""
+        return await password_hasher.run("hash", cls.hash_password, plain_password)
+
     @classmethod
     def decode_token(cls, token: str) -> dict:
         try:
@@ -50,9 +65,18 @@ class AuthService(BaseService):
         except jwt.exceptions.ExpiredSignatureError as ex:
             raise JWTTokenExpiredError from ex
 
+    @classmethod
+    def decode_token_cached(cls, token: str) -> dict:
+        """decode_token с кэшем: повторная проверка подписи только после промаха"""
+        claims = token_claims_cache.get(token)
+        if claims is None:
+            claims = cls.decode_token(token)
+            token_claims_cache.put(token, claims)
+        return claims
+
     async def register_user(self, user_data: SUserAddRequest):
         try:
-            hashed_password: str = self.hash_password(user_data.password)
+            hashed_password: str = await self.hash_password_async(user_data.password)
             new_user_data = SUserAdd(
                 email=user_data.email,
                 hashed_password=hashed_password,
@@ -65,23 +89,28 @@ class AuthService(BaseService):
         await self.db.commit()
 
     async def login_user(self, user_data: SUserAuth):
-        user = await self.db.users.get_one_or_none_with_role(email=user_data.email)
-        if not user:
+        # Только id, хеш и имя роли - одним запросом, без Pydantic-моделей
+        credentials = await self.db.users.get_credentials(user_data.email)
+        if not credentials:
             raise UserNotFoundError
-        if not self.verify_password(user_data.password, user.hashed_password):
+        # Отпускаем соединение с БД, пока bcrypt проверяет пароль
+        await self.db.rollback()
+        if not await self.verify_password_async(
+            user_data.password, credentials.hashed_password
+        ):
             raise InvalidPasswordError
         access_token: str = self.create_access_token(
             {
-                "user_id": user.id,
-                "role": user.role.name,
+                "user_id": credentials.id,
+                "role": credentials.role_name,
             }
         )
         return access_token
 
     async def get_me(self, user_id: int):
-        user: SUserGetWithRels | None = await self.db.users.get_one_or_none_with_role(
-            id=user_id
-        )
+        user = await self.db.users.get_one_or_none(id=user_id)
         if not user:
             raise UserNotFoundError
-        return user
+        # Роль берем из справочника в памяти вместо второго запроса
+        role = await role_cache.get(self.db.session, user.role_id)
+        return SUserGetWithRels(**user.model_dump(), role=role)
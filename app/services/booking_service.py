@@ -1,51 +1,70 @@
-import random
-import string
 import logging
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.repositories.booking_repository import BookingRepository, PaymentRepository
-from app.repositories.flight_repository import FlightRepository
+from collections import defaultdict
 from app.schemes.bookings import BookingCreate
+from app.metrics import bookings_total, count_outcome
 from app.models.booking import BookingStatus
+from app.services.base import BaseService
+from app.services.flight_availability import flight_availability
+from app.services.id_generator import id_generator
+from app.services.seat_inventory import seat_inventory
 
 logger = logging.getLogger(__name__)
 
 
-class BookingService:
-    def __init__(self, db_session: AsyncSession):
-        self.booking_repo = BookingRepository(db_session)
-        self.payment_repo = PaymentRepository(db_session)
-        self.flight_repo = FlightRepository(db_session)
-        self.db_session = db_session
+class BookingService(BaseService):
+    """
+    Каждая операция записи - одна транзакция DBManager и один commit:
+    репозитории только выполняют выражения.
+    """
 
     def _generate_booking_number(self) -> str:
-        """Генерирует уникальный номер бронирования"""
-        return "BK" + "".join(random.choices(string.digits, k=8))
+        """Генерирует уникальный номер бронирования (монотонный, см. IdGenerator)"""
+        return id_generator.booking_number()
 
+    @staticmethod
+    def _release_seat_map(released: list[tuple[int, int]]) -> None:
+        """Возвращает на карты рейсов места, освобожденные закоммиченной транзакцией"""
+        by_flight: dict[int, list[int]] = defaultdict(list)
+        for flight_id, seat_number in released:
+            by_flight[flight_id].append(seat_number)
+        for flight_id, seats in by_flight.items():
+            seat_inventory.release(flight_id, seats)
+
+    @staticmethod
+    def _return_to_view(flight_id: int, status: BookingStatus, seats_count: int) -> None:
+        """Read-модель рейсов: места брони в статусе status снова свободны"""
+        if status == BookingStatus.CANCELLED:
+            return
+        held = "pending" if status == BookingStatus.PENDING else "confirmed"
+        flight_availability.apply(flight_id, available=seats_count, **{held: -seats_count})
+
+    @count_outcome("create")
     async def create_booking(self, user_id: int, booking_data: BookingCreate):
         """Создает новое бронирование"""
         try:
-            logger.info(f"[BookingService] Starting to create booking for user {user_id}, flight {booking_data.flight_id}")
-            
-            # Проверяем рейс
-            flight = await self.flight_repo.get_flight_by_id(booking_data.flight_id)
-            if not flight:
-                logger.error(f"[BookingService] Flight with id {booking_data.flight_id} not found")
-                raise ValueError(f"Flight with id {booking_data.flight_id} not found")
-            
-            logger.info(f"[BookingService] Flight found: {flight.flight_number}, available seats: {flight.available_seats}")
-
-            # Проверяем количество свободных мест
-            if flight.available_seats < booking_data.seats_count:
-                logger.error(f"[BookingService] Not enough seats. Available: {flight.available_seats}, Requested: {booking_data.seats_count}")
+            logger.debug("[BookingService] Starting to create booking for user %s, flight %s", user_id, booking_data.flight_id)
+
+            # Списываем места одним условным UPDATE (без гонки чтение-запись)
+            price = await self.db.flights.reserve_seats(
+                booking_data.flight_id, booking_data.seats_count
+            )
+            if price is None:
+                flight = await self.db.flights.get_flight_by_id(booking_data.flight_id)
+                available = flight.available_seats if flight else None
+                await self.db.rollback()
+                if not flight:
+                    logger.error("[BookingService] Flight with id %s not found", booking_data.flight_id)
+                    raise ValueError(f"Flight with id {booking_data.flight_id} not found")
+                logger.error("[BookingService] Not enough seats. Available: %s, Requested: %s", available, booking_data.seats_count)
                 raise ValueError(
-                    f"Not enough available seats. Available: {flight.available_seats}, Requested: {booking_data.seats_count}"
+                    f"Not enough available seats. Available: {available}, Requested: {booking_data.seats_count}"
                 )
 
-            # Создаем бронирование
+            # Создаем бронирование в той же транзакции, что и списание мест
             booking_number = self._generate_booking_number()
-            total_price = flight.price * booking_data.seats_count
-            
-            logger.info(f"[BookingService] Creating booking number {booking_number}, total price: {total_price}")
+            total_price = price * booking_data.seats_count
+
+            logger.debug("[BookingService] Creating booking number %s, total price: %s", booking_number, total_price)
 
             booking_dict = {
                 "user_id": user_id,
@@ -59,95 +78,258 @@ class BookingService:
                 "status": BookingStatus.PENDING,
             }
 
-            booking = await self.booking_repo.create_booking(booking_dict)
-            logger.info(f"[BookingService] Booking created successfully: {booking.booking_number} (id: {booking.id})")
-
-            # Обновляем количество свободных мест в рейсе
-            logger.info(f"[BookingService] Updating available seats for flight {booking_data.flight_id}")
-            await self.flight_repo.update_flight(
-                booking_data.flight_id,
-                {"available_seats": flight.available_seats - booking_data.seats_count},
+            booking = await self.db.bookings.create_booking(booking_dict)
+            # Конкретные места - в той же транзакции (карта мест подсказывает свободные)
+            [seats] = await seat_inventory.assign(
+                self.db.session, [(booking.flight_id, booking.id, booking.seats_count)]
+            )
+            try:
+                await self.db.commit()
+            except Exception:
+                seat_inventory.release(booking.flight_id, seats)
+                raise
+            flight_availability.apply(
+                booking.flight_id, available=-booking.seats_count, pending=booking.seats_count
             )
-            logger.info(f"[BookingService] Flight updated successfully")
+            logger.info("[BookingService] Booking created successfully: %s (id: %s)", booking.booking_number, booking.id)
 
             return booking
-            
+
         except Exception as e:
-            logger.error(f"[BookingService] Error creating booking: {str(e)}", exc_info=True)
+            logger.error("[BookingService] Error creating booking: %s", e, exc_info=True)
             raise
 
+    async def create_bookings_batch(
+        self, user_id: int, items: list[BookingCreate], all_or_nothing: bool = True
+    ) -> list[tuple]:
+        """
+        Групповое бронирование одной транзакцией.
+        Места списываются одним условным UPDATE на рейс (суммой по всем позициям),
+        брони вставляются одним многострочным INSERT ... RETURNING.
+        Возвращает список (booking | None, error | None) в порядке items.
+        """
+        logger.info("[BookingService] Batch of %d bookings for user %s, all_or_nothing=%s", len(items), user_id, all_or_nothing)
+        demand: dict[int, int] = defaultdict(int)
+        for item in items:
+            demand[item.flight_id] += item.seats_count
+
+        # Рейсы обходим в порядке id - одинаковый порядок блокировок у всех пакетов
+        prices: dict[int, float] = {}
+        failed_flights = []
+        for flight_id in sorted(demand):
+            price = await self.db.flights.reserve_seats(flight_id, demand[flight_id])
+            if price is None:
+                failed_flights.append(flight_id)
+            else:
+                prices[flight_id] = price
+
+        errors: dict[int, str] = {}
+        if failed_flights:
+            available = await self.db.flights.get_available_seats(failed_flights)
+            if all_or_nothing:
+                await self.db.rollback()
+                for index, item in enumerate(items):
+                    if item.flight_id not in failed_flights:
+                        errors[index] = "Batch rejected: other items failed"
+                    elif item.flight_id not in available:
+                        errors[index] = f"Flight with id {item.flight_id} not found"
+                    else:
+                        errors[index] = (
+                            f"Not enough available seats. Available: {available[item.flight_id]}, "
+                            f"Requested: {demand[item.flight_id]}"
+                        )
+                logger.warning("[BookingService] Batch rejected, failed flights: %s", failed_flights)
+                bookings_total.inc(("create_batch", "rejected"), len(items))
+                return [(None, errors[index]) for index in range(len(items))]
+
+            # best_effort: на спорных рейсах берем позиции по порядку, пока хватает мест
+            partial: dict[int, list[int]] = defaultdict(list)
+            for index, item in enumerate(items):
+                if item.flight_id not in failed_flights:
+                    continue
+                if item.flight_id not in available:
+                    errors[index] = f"Flight with id {item.flight_id} not found"
+                elif available[item.flight_id] >= item.seats_count:
+                    available[item.flight_id] -= item.seats_count
+                    partial[item.flight_id].append(index)
+                else:
+                    errors[index] = (
+                        f"Not enough available seats. Available: {available[item.flight_id]}, "
+                        f"Requested: {item.seats_count}"
+                    )
+            for flight_id, indexes in sorted(partial.items()):
+                seats = sum(items[index].seats_count for index in indexes)
+                price = await self.db.flights.reserve_seats(flight_id, seats)
+                if price is None:
+                    # Места успели забрать параллельно - позиции рейса не проходят
+                    for index in indexes:
+                        errors[index] = "Not enough available seats"
+                else:
+                    prices[flight_id] = price
+
+        accepted = [index for index in range(len(items)) if index not in errors]
+        rows = [
+            {
+                "user_id": user_id,
+                "flight_id": items[index].flight_id,
+                "booking_number": self._generate_booking_number(),
+                "passenger_name": items[index].passenger_name,
+                "passenger_email": items[index].passenger_email,
+                "passenger_phone": items[index].passenger_phone,
+                "seats_count": items[index].seats_count,
+                "total_price": prices[items[index].flight_id] * items[index].seats_count,
+                "status": BookingStatus.PENDING,
+            }
+            for index in accepted
+        ]
+        bookings = {}
+        if rows:
+            bookings = dict(zip(accepted, await self.db.bookings.create_bookings(rows)))
+            requests = [(b.flight_id, b.id, b.seats_count) for b in bookings.values()]
+            # Места всех броней пакета - одним INSERT в flight_seats
+            assigned = await seat_inventory.assign(self.db.session, requests)
+            try:
+                await self.db.commit()
+            except Exception:
+                for (flight_id, _, _), seats in zip(requests, assigned):
+                    seat_inventory.release(flight_id, seats)
+                raise
+            for flight_id, _, seats_count in requests:
+                flight_availability.apply(flight_id, available=-seats_count, pending=seats_count)
+        logger.info("[BookingService] Batch done: created %d, failed %d", len(bookings), len(errors))
+        bookings_total.inc(("create_batch", "ok"), len(bookings))
+        bookings_total.inc(("create_batch", "rejected"), len(errors))
+        return [(bookings.get(index), errors.get(index)) for index in range(len(items))]
+
     async def get_booking(self, booking_id: int):
-        logger.info(f"[BookingService] Getting booking {booking_id}")
-        booking = await self.booking_repo.get_booking_by_id(booking_id)
+        logger.debug("[BookingService] Getting booking %s", booking_id)
+        booking = await self.db.bookings.get_booking_by_id(booking_id)
         if not booking:
-            logger.error(f"[BookingService] Booking with id {booking_id} not found")
+            logger.error("[BookingService] Booking with id %s not found", booking_id)
             raise ValueError(f"Booking with id {booking_id} not found")
         return booking
 
     async def get_user_bookings(self, user_id: int):
-        logger.info(f"[BookingService] Getting bookings for user {user_id}")
-        return await self.booking_repo.get_user_bookings(user_id)
+        logger.debug("[BookingService] Getting bookings for user %s", user_id)
+        return await self.db.bookings.get_user_bookings(user_id)
 
     async def get_all_bookings(self):
-        logger.info("[BookingService] Getting all bookings")
-        bookings = await self.booking_repo.get_all_bookings()
-        logger.info(f"[BookingService] Found {len(bookings)} bookings")
+        logger.debug("[BookingService] Getting all bookings")
+        bookings = await self.db.bookings.get_all_bookings()
+        logger.debug("[BookingService] Found %d bookings", len(bookings))
         return bookings
 
+    async def list_bookings(self, limit: int, offset: int = 0, **filters):
+        """Страница списка броней и offset следующей страницы (или None)"""
+        rows = await self.db.bookings.list_bookings(limit + 1, offset, **filters)
+        next_offset = offset + limit if len(rows) > limit else None
+        return rows[:limit], next_offset
+
+    @count_outcome("cancel")
     async def cancel_booking(self, booking_id: int):
         """Отменяет бронирование и возвращает места на рейс"""
-        logger.info(f"[BookingService] Cancelling booking {booking_id}")
-        booking = await self.booking_repo.get_booking_by_id(booking_id)
-        if not booking:
-            logger.error(f"[BookingService] Booking with id {booking_id} not found")
+        logger.debug("[BookingService] Cancelling booking %s", booking_id)
+        current = await self.db.bookings.get_booking_by_id(booking_id)
+        if not current:
+            logger.error("[BookingService] Booking with id %s not found", booking_id)
             raise ValueError(f"Booking with id {booking_id} not found")
-
-        if booking.status == BookingStatus.CANCELLED:
-            logger.warning(f"[BookingService] Booking {booking_id} already cancelled")
+        if current.status == BookingStatus.CANCELLED:
+            logger.warning("[BookingService] Booking %s already cancelled", booking_id)
             raise ValueError("Booking is already cancelled")
+        previous_status = current.status
+
+        # Условный UPDATE по прочитанному статусу: повторная/параллельная
+        # отмена не вернет места дважды
+        booking = await self.db.bookings.cancel_booking(booking_id, previous_status)
+        if not booking:
+            await self.db.rollback()
+            logger.warning("[BookingService] Booking %s changed concurrently", booking_id)
+            raise ValueError("Booking was changed concurrently, please retry")
 
         # Возвращаем места на рейс
-        flight = await self.flight_repo.get_flight_by_id(booking.flight_id)
-        await self.flight_repo.update_flight(
-            booking.flight_id,
-            {"available_seats": flight.available_seats + booking.seats_count},
-        )
+        await self.db.flights.release_seats(booking.flight_id, booking.seats_count)
+        released = await self.db.seats.release_booking_seats(booking_id)
+        await self.db.commit()
+        self._release_seat_map(released)
+        self._return_to_view(booking.flight_id, previous_status, booking.seats_count)
+        logger.info("[BookingService] Booking %s cancelled successfully", booking_id)
+        return booking
 
-        # Обновляем статус бронирования
-        cancelled_booking = await self.booking_repo.cancel_booking(booking_id)
-        logger.info(f"[BookingService] Booking {booking_id} cancelled successfully")
-        return cancelled_booking
+    async def expire_holds(self, created_before, limit: int) -> tuple[int, int]:
+        """
+        Одна короткая транзакция снятия просроченных PENDING-броней:
+        места возвращаются одним UPDATE на рейс. Возвращает (броней, мест).
+        """
+        expired = await self.db.bookings.expire_pending(created_before, limit)
+        if not expired:
+            return 0, 0
+        seats_by_flight: dict[int, int] = defaultdict(int)
+        for _, flight_id, seats_count in expired:
+            seats_by_flight[flight_id] += seats_count
+        for flight_id in sorted(seats_by_flight):
+            await self.db.flights.release_seats(flight_id, seats_by_flight[flight_id])
+        released = await self.db.seats.release_bookings_seats([booking_id for booking_id, _, _ in expired])
+        await self.db.commit()
+        self._release_seat_map(released)
+        for flight_id, seats in seats_by_flight.items():
+            flight_availability.apply(flight_id, available=seats, pending=-seats)
+        return len(expired), sum(seats_by_flight.values())
 
     async def confirm_booking(self, booking_id: int):
         """Подтверждает бронирование"""
-        logger.info(f"[BookingService] Confirming booking {booking_id}")
-        booking = await self.booking_repo.get_booking_by_id(booking_id)
+        logger.debug("[BookingService] Confirming booking %s", booking_id)
+        booking = await self.db.bookings.confirm_booking(booking_id)
+        if not booking:
+            exists = await self.db.bookings.get_booking_by_id(booking_id)
+            if exists and exists.status != BookingStatus.CANCELLED:
+                # Уже подтверждена - повторное подтверждение ничего не меняет
+                return exists
+            await self.db.rollback()
+            if not exists:
+                logger.error("[BookingService] Booking with id %s not found", booking_id)
+                raise ValueError(f"Booking with id {booking_id} not found")
+            logger.warning("[BookingService] Booking %s is cancelled or expired", booking_id)
+            raise ValueError("Booking is cancelled or its seat hold has expired")
+        await self.db.commit()
+        flight_availability.apply(
+            booking.flight_id, pending=-booking.seats_count, confirmed=booking.seats_count
+        )
+        logger.info("[BookingService] Booking %s confirmed successfully", booking_id)
+        return booking
+
+    @count_outcome("delete")
+    async def delete_booking(self, booking_id: int):
+        """Удаляет бронирование; места неотмененной брони возвращаются на рейс"""
+        logger.debug("[BookingService] Deleting booking %s", booking_id)
+        # Строки мест ссылаются на бронь - удаляем их первыми
+        released = await self.db.seats.release_booking_seats(booking_id)
+        booking = await self.db.bookings.delete_booking(booking_id)
         if not booking:
-            logger.error(f"[BookingService] Booking with id {booking_id} not found")
+            logger.error("[BookingService] Booking with id %s not found", booking_id)
             raise ValueError(f"Booking with id {booking_id} not found")
 
-        booking = await self.booking_repo.update_booking(
-            booking_id, {"status": BookingStatus.CONFIRMED}
-        )
-        logger.info(f"[BookingService] Booking {booking_id} confirmed successfully")
+        if booking.status != BookingStatus.CANCELLED:
+            logger.debug("[BookingService] Restoring %s seats to flight %s", booking.seats_count, booking.flight_id)
+            await self.db.flights.release_seats(booking.flight_id, booking.seats_count)
+        await self.db.commit()
+        self._release_seat_map(released)
+        self._return_to_view(booking.flight_id, booking.status, booking.seats_count)
+        logger.info("[BookingService] Booking %s deleted successfully", booking_id)
         return booking
 
 
-class PaymentService:
-    def __init__(self, db_session: AsyncSession):
-        self.payment_repo = PaymentRepository(db_session)
-        self.booking_repo = BookingRepository(db_session)
+class PaymentService(BaseService):
 
     async def create_payment(self, booking_id: int, payment_data: dict):
         """Создает платеж для бронирования"""
-        logger.info(f"[PaymentService] Creating payment for booking {booking_id}")
-        booking = await self.booking_repo.get_booking_by_id(booking_id)
+        logger.debug("[PaymentService] Creating payment for booking %s", booking_id)
+        booking = await self.db.bookings.get_booking_by_id(booking_id)
         if not booking:
-            logger.error(f"[PaymentService] Booking with id {booking_id} not found")
+            logger.error("[PaymentService] Booking with id %s not found", booking_id)
             raise ValueError(f"Booking with id {booking_id} not found")
 
         # Генерируем ID транзакции
-        transaction_id = "TRX" + "".join(random.choices(string.digits, k=10))
+        transaction_id = id_generator.transaction_id()
 
         payment_dict = {
             "booking_id": booking_id,
@@ -157,34 +339,42 @@ class PaymentService:
             "status": "pending",
         }
 
-        payment = await self.payment_repo.create_payment(payment_dict)
-        logger.info(f"[PaymentService] Payment created successfully: {transaction_id}")
+        payment = await self.db.payments.create_payment(payment_dict)
+        await self.db.commit()
+        logger.info("[PaymentService] Payment created successfully: %s", transaction_id)
         return payment
 
     async def confirm_payment(self, payment_id: int):
-        """Подтверждает платеж"""
-        logger.info(f"[PaymentService] Confirming payment {payment_id}")
-        payment = await self.payment_repo.get_payment_by_id(payment_id)
-        if not payment:
-            logger.error(f"[PaymentService] Payment with id {payment_id} not found")
-            raise ValueError(f"Payment with id {payment_id} not found")
-
-        payment = await self.payment_repo.update_payment(
+        """Подтверждает платеж и бронирование одной транзакцией"""
+        logger.debug("[PaymentService] Confirming payment %s", payment_id)
+        payment = await self.db.payments.update_payment(
             payment_id, {"status": "completed"}
         )
+        if not payment:
+            logger.error("[PaymentService] Payment with id %s not found", payment_id)
+            raise ValueError(f"Payment with id {payment_id} not found")
 
-        # Обновляем статус бронирования
-        await self.booking_repo.update_booking(
-            payment.booking_id, {"status": BookingStatus.CONFIRMED}
-        )
+        # Обновляем статус бронирования; просроченную бронь оплатить уже нельзя
+        booking = await self.db.bookings.confirm_booking(payment.booking_id)
+        if not booking:
+            current = await self.db.bookings.get_booking_by_id(payment.booking_id)
+            if current.status == BookingStatus.CANCELLED:
+                await self.db.rollback()
+                logger.warning("[PaymentService] Booking %s is cancelled or expired", payment.booking_id)
+                raise ValueError("Booking is cancelled or its seat hold has expired")
+        await self.db.commit()
+        if booking:
+            flight_availability.apply(
+                booking.flight_id, pending=-booking.seats_count, confirmed=booking.seats_count
+            )
 
-        logger.info(f"[PaymentService] Payment {payment_id} confirmed successfully")
+        logger.info("[PaymentService] Payment %s confirmed successfully", payment_id)
         return payment
 
     async def get_payment(self, payment_id: int):
-        logger.info(f"[PaymentService] Getting payment {payment_id}")
-        payment = await self.payment_repo.get_payment_by_id(payment_id)
+        logger.debug("[PaymentService] Getting payment %s", payment_id)
+        payment = await self.db.payments.get_payment_by_id(payment_id)
         if not payment:
-            logger.error(f"[PaymentService] Payment with id {payment_id} not found")
+            logger.error("[PaymentService] Payment with id %s not found", payment_id)
             raise ValueError(f"Payment with id {payment_id} not found")
         return payment
@@ -0,0 +1,91 @@
+import calendar
+from datetime import date
+
+from app.services.flight_availability import FlightAvailability, FlightAvailabilityView, flight_availability
+
+Route = tuple[int, int]
+
+
+class FareDay:
+    """Агрегат ячейки (маршрут, день): минимальная цена среди рейсов с местами"""
+
+    __slots__ = ("min_price", "available_seats", "flights")
+
+    def __init__(self, flights: dict[int, FlightAvailability]) -> None:
+        prices = [flight.price for flight in flights.values() if flight.available_seats > 0]
+        self.min_price = min(prices) if prices else None
+        self.available_seats = sum(flight.available_seats for flight in flights.values())
+        self.flights = len(flights)
+
+
+class FareCalendar:
+    """
+    📅 Календарь низких цен: (откуда, куда) x день -> минимальная цена и места.
+
+    Агрегаты посчитаны заранее, поэтому месяц - это 28-31 обращение к словарю
+    вместо запроса на каждый день. Ячейки пересчитываются точечно по событиям
+    read-модели рейсов (создание/изменение/удаление рейса, изменение мест);
+    при перечитывании модели календарь строится заново при первом запросе.
+    """
+
+    def __init__(self, view: FlightAvailabilityView) -> None:
+        self.view = view
+        self._members: dict[tuple[int, int, date], dict[int, FlightAvailability]] = {}
+        self._days: dict[Route, dict[date, FareDay]] = {}
+        self.built = False
+        self.builds = 0
+        view.add_listener(self.on_flight_change)
+
+    @staticmethod
+    def _cell(flight: FlightAvailability) -> tuple[int, int, date]:
+        return flight.departure_airport_id, flight.arrival_airport_id, flight.departure_date
+
+    def _refresh(self, cell: tuple[int, int, date]) -> None:
+        departure, arrival, day = cell
+        flights = self._members.get(cell)
+        days = self._days.setdefault((departure, arrival), {})
+        if flights:
+            days[day] = FareDay(flights)
+        else:
+            self._members.pop(cell, None)
+            days.pop(day, None)
+
+    def build(self) -> None:
+        self._members = {}
+        for flight in self.view.flights():
+            self._members.setdefault(self._cell(flight), {})[flight.id] = flight
+        self._days = {}
+        for cell in self._members:
+            self._refresh(cell)
+        self.built = True
+        self.builds += 1
+
+    def on_flight_change(self, event: str, flight: FlightAvailability | None) -> None:
+        if event == "reset":
+            self.built = False
+            return
+        if not self.built:
+            return
+        cell = self._cell(flight)
+        if event == "put":
+            self._members.setdefault(cell, {})[flight.id] = flight
+        elif event == "remove":
+            self._members.get(cell, {}).pop(flight.id, None)
+        self._refresh(cell)
+
+    def month(self, departure_airport_id: int, arrival_airport_id: int, year: int, month: int) -> list[tuple[date, FareDay | None]]:
+        """Все дни месяца; None - в этот день рейсов нет"""
+        if not self.built:
+            self.build()
+        days = self._days.get((departure_airport_id, arrival_airport_id), {})
+        result = []
+        for number in range(1, calendar.monthrange(year, month)[1] + 1):
+            day = date(year, month, number)
+            result.append((day, days.get(day)))
+        return result
+
+    def stats(self) -> dict:
+        return {"routes": len(self._days), "cells": len(self._members), "builds": self.builds}
+
+
+fare_calendar = FareCalendar(flight_availability)
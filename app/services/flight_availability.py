@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_right, insort
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.database import async_read_session_maker
+from app.repositories.flight_repository import FlightRepository
+from app.schemes.flights import FlightAvailabilityRead, FlightListRead
+from app.services.airport_cache import airport_cache
+
+FLIGHT_FIELDS = (
+    "id",
+    "flight_number",
+    "airline",
+    "departure_airport_id",
+    "arrival_airport_id",
+    "departure_time",
+    "arrival_time",
+    "total_seats",
+    "available_seats",
+    "price",
+)
+
+# Запас по updated_at: CURRENT_TIMESTAMP SQLite с точностью до секунды, а между
+# UPDATE и COMMIT чужой транзакции проходит время - такие строки перечитываем еще раз
+REFRESH_OVERLAP = timedelta(seconds=5)
+# Измененные рейсы перечитываются пачками; между пачками цикл событий свободен
+REFRESH_CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+# listener(event, flight): "put" / "remove" - один рейс, "seats" - изменилось число свободных мест,
+# "reset" - модель перечитана (flight=None)
+FlightListener = Callable[[str, "FlightAvailability | None"], None]
+
+
+class FlightAvailability:
+    """Строка read-модели: рейс, места и цена; ответ списка собирается один раз"""
+
+    __slots__ = FLIGHT_FIELDS + ("pending_seats", "confirmed_seats", "_row")
+
+    def __init__(self, pending_seats: int = 0, confirmed_seats: int = 0, **fields) -> None:
+        for name in FLIGHT_FIELDS:
+            setattr(self, name, fields[name])
+        # В SQLite время хранится без пояса; у только что созданной ORM-модели
+        # он может остаться от входных данных - приводим к тому, что в БД
+        self.departure_time = self.departure_time.replace(tzinfo=None)
+        self.arrival_time = self.arrival_time.replace(tzinfo=None)
+        self.pending_seats = pending_seats
+        self.confirmed_seats = confirmed_seats
+        self._row: FlightListRead | None = None
+
+    @property
+    def key(self) -> tuple[datetime, int]:
+        return self.departure_time, self.id
+
+    @property
+    def departure_date(self) -> date:
+        return self.departure_time.date()
+
+    def row(self) -> FlightListRead:
+        """Готовый элемент ответа GET /flights/ (пересобирается только после изменений)"""
+        if self._row is None:
+            self._row = FlightListRead(
+                id=self.id,
+                flight_number=self.flight_number,
+                airline=self.airline,
+                departure_airport=airport_cache.get_by_id(self.departure_airport_id),
+                arrival_airport=airport_cache.get_by_id(self.arrival_airport_id),
+                departure_time=self.departure_time,
+                arrival_time=self.arrival_time,
+                available_seats=self.available_seats,
+                price=self.price,
+            )
+        return self._row
+
+    def read(self) -> FlightAvailabilityRead:
+        departure = airport_cache.get_by_id(self.departure_airport_id)
+        arrival = airport_cache.get_by_id(self.arrival_airport_id)
+        return FlightAvailabilityRead(
+            flight_id=self.id,
+            flight_number=self.flight_number,
+            departure_code=departure.code if departure else None,
+            arrival_code=arrival.code if arrival else None,
+            departure_date=self.departure_date,
+            total_seats=self.total_seats,
+            available_seats=self.available_seats,
+            pending_seats=self.pending_seats,
+            confirmed_seats=self.confirmed_seats,
+            price=self.price,
+        )
+
+
+class FlightAvailabilityView:
+    """
+    📋 Денормализованная read-модель рейсов в памяти процесса.
+
+    Список и поиск рейсов читаются отсюда без запросов к БД и без JOIN:
+    страницы - bisect по отсортированным ключам (departure_time, id),
+    поиск - пересечение индексов по аэропортам и дате. Сервисы броней
+    и рейсов обновляют строки инкрементально после своих изменений;
+    при ошибке записи модель сбрасывается и перечитывается целиком.
+    У каждого процесса своя копия: изменения других процессов подтягивает
+    фоновая задача раз в max_age секунд - перечитываются только рейсы,
+    у которых с прошлой сверки менялся updated_at рейса или его броней.
+    """
+
+    def __init__(self, max_age: float = 0, session_factory=async_read_session_maker) -> None:
+        self.max_age = max_age
+        self.session_factory = session_factory
+        self._flights: dict[int, FlightAvailability] = {}
+        self._order: list[tuple[datetime, int]] = []
+        self._by_departure: dict[int, set[int]] = {}
+        self._by_arrival: dict[int, set[int]] = {}
+        self._by_date: dict[date, set[int]] = {}
+        self.loaded = False
+        self.loaded_at = 0.0
+        # Время БД, на которое модель сверена с таблицами
+        self.synced_at: datetime | None = None
+        self.loads = 0
+        self.refreshes = 0
+        self.refreshed_flights = 0
+        self.refresh_errors = 0
+        self.last_refresh_ms = 0.0
+        self._task: asyncio.Task | None = None
+        self._listeners: list[FlightListener] = []
+
+    def add_listener(self, listener: FlightListener) -> None:
+        """Подписка производных индексов (например, поиска маршрутов) на изменения рейсов"""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, flight: FlightAvailability | None = None) -> None:
+        for listener in self._listeners:
+            listener(event, flight)
+
+    async def load(self, db_session: AsyncSession) -> None:
+        repo = FlightRepository(db_session)
+        synced_at = await repo.get_db_now()
+        rows = await repo.get_availability_rows()
+        self._flights.clear()
+        self._by_departure.clear()
+        self._by_arrival.clear()
+        self._by_date.clear()
+        # Рейсы могут ссылаться на аэропорты, созданные другим процессом после
+        # загрузки справочника - без них строка ответа не соберется
+        await airport_cache.resolve(
+            db_session, {row[name] for row in rows for name in ("departure_airport_id", "arrival_airport_id")}
+        )
+        for row in rows:
+            self._index(FlightAvailability(**row))
+        self._order = sorted(flight.key for flight in self._flights.values())
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+        self.synced_at = synced_at
+        self.loads += 1
+        self._notify("reset")
+
+    async def ensure_loaded(self, db_session: AsyncSession) -> None:
+        # Строки ответа берут аэропорты из кэша справочника
+        await airport_cache.ensure_loaded(db_session)
+        if not self.loaded:
+            await self.load(db_session)
+
+    async def refresh(self, db_session: AsyncSession) -> int:
+        """
+        Сверка с БД без полной перезагрузки: перечитывает рейсы, измененные
+        с прошлой сверки (сам рейс или его брони), и убирает удаленные.
+        Возвращает число перечитанных рейсов.
+        """
+        if not self.loaded:
+            await self.load(db_session)
+            return len(self._flights)
+        started = time.perf_counter()
+        repo = FlightRepository(db_session)
+        synced_at = await repo.get_db_now()
+        changed = sorted(await repo.get_changed_flight_ids(self.synced_at - REFRESH_OVERLAP))
+        for start in range(0, len(changed), REFRESH_CHUNK_SIZE):
+            rows = await repo.get_availability_rows(changed[start:start + REFRESH_CHUNK_SIZE])
+            await airport_cache.resolve(
+                db_session, {row[name] for row in rows for name in ("departure_airport_id", "arrival_airport_id")}
+            )
+            for row in rows:
+                self._put(FlightAvailability(**row))
+            await asyncio.sleep(0)
+        # Удаления updated_at не оставляют: сверяем число рейсов,
+        # а список id читаем, только если в модели есть лишние
+        if len(self._flights) > await repo.count_flights():
+            existing = await repo.get_flight_ids()
+            for flight_id in self._flights.keys() - existing:
+                self.remove_flight(flight_id)
+        self.loaded_at = time.monotonic()
+        self.synced_at = synced_at
+        self.refreshes += 1
+        self.refreshed_flights += len(changed)
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        return len(changed)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.max_age)
+            try:
+                async with self.session_factory() as session:
+                    await self.refresh(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.refresh_errors += 1
+                logger.exception("[FlightAvailability] Refresh failed")
+
+    def start(self) -> None:
+        if self.max_age <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="flight-view-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _index(self, flight: FlightAvailability) -> None:
+        self._flights[flight.id] = flight
+        self._by_departure.setdefault(flight.departure_airport_id, set()).add(flight.id)
+        self._by_arrival.setdefault(flight.arrival_airport_id, set()).add(flight.id)
+        self._by_date.setdefault(flight.departure_date, set()).add(flight.id)
+
+    def _unindex(self, flight: FlightAvailability) -> None:
+        del self._flights[flight.id]
+        self._by_departure[flight.departure_airport_id].discard(flight.id)
+        self._by_arrival[flight.arrival_airport_id].discard(flight.id)
+        self._by_date[flight.departure_date].discard(flight.id)
+        index = bisect_right(self._order, flight.key) - 1
+        if index >= 0 and self._order[index] == flight.key:
+            del self._order[index]
+
+    def get(self, flight_id: int) -> FlightAvailability | None:
+        return self._flights.get(flight_id)
+
+    def flights(self) -> list[FlightAvailability]:
+        return list(self._flights.values())
+
+    def page(
+        self, limit: int, after: tuple[datetime, int] | None = None
+    ) -> tuple[list[FlightListRead], tuple[datetime, int] | None]:
+        """Страница в порядке (departure_time, id) и ключ последней строки, если есть еще"""
+        start = bisect_right(self._order, after) if after else 0
+        keys = self._order[start:start + limit]
+        rows = [self._flights[flight_id].row() for _, flight_id in keys]
+        has_more = start + limit < len(self._order)
+        return rows, keys[-1] if has_more and keys else None
+
+    def search(
+        self,
+        departure_airport_id: int | None = None,
+        arrival_airport_id: int | None = None,
+        departure_date: date | None = None,
+    ) -> list[FlightListRead]:
+        candidates = []
+        if departure_airport_id:
+            candidates.append(self._by_departure.get(departure_airport_id, set()))
+        if arrival_airport_id:
+            candidates.append(self._by_arrival.get(arrival_airport_id, set()))
+        if departure_date:
+            candidates.append(self._by_date.get(departure_date, set()))
+        if not candidates:
+            ids = self._flights.keys()
+        else:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+        return [self._flights[flight_id].row() for flight_id in sorted(ids)]
+
+    # ---------- инкрементальные обновления ----------
+
+    def put_flight(self, flight) -> None:
+        """Новый или измененный рейс (ORM-модель); счетчики броней сохраняются"""
+        previous = self._flights.get(flight.id)
+        fields = {name: getattr(flight, name) for name in FLIGHT_FIELDS}
+        self._put(FlightAvailability(
+            pending_seats=previous.pending_seats if previous else 0,
+            confirmed_seats=previous.confirmed_seats if previous else 0,
+            **fields,
+        ))
+
+    def _put(self, entry: FlightAvailability) -> None:
+        """Заменяет строку рейса целиком (индексы, порядок, подписчики)"""
+        previous = self._flights.get(entry.id)
+        if previous is not None:
+            self._unindex(previous)
+            self._notify("remove", previous)
+        self._index(entry)
+        insort(self._order, entry.key)
+        self._notify("put", entry)
+
+    def remove_flight(self, flight_id: int) -> None:
+        flight = self._flights.get(flight_id)
+        if flight is not None:
+            self._unindex(flight)
+            self._notify("remove", flight)
+
+    def apply(self, flight_id: int, available: int = 0, pending: int = 0, confirmed: int = 0) -> None:
+        """Сдвигает счетчики мест рейса (например, бронь: available=-n, pending=+n)"""
+        flight = self._flights.get(flight_id)
+        if flight is None:
+            return
+        flight.available_seats += available
+        flight.pending_seats += pending
+        flight.confirmed_seats += confirmed
+        if available:
+            flight._row = None
+            self._notify("seats", flight)
+
+    def airport_changed(self, airport_id: int) -> None:
+        """Аэропорт переименован/удален - пересобрать ответы его рейсов"""
+        for flight_id in self._by_departure.get(airport_id, set()) | self._by_arrival.get(airport_id, set()):
+            self._flights[flight_id]._row = None
+
+    def invalidate(self) -> None:
+        """Полный сброс - следующее обращение через ensure_loaded перечитает БД"""
+        self.loaded = False
+
+    def stats(self) -> dict:
+        return {
+            "flights": len(self._flights),
+            "loads": self.loads,
+            "loaded": self.loaded,
+            "refreshing": self._task is not None,
+            "refreshes": self.refreshes,
+            "refreshed_flights": self.refreshed_flights,
+            "refresh_errors": self.refresh_errors,
+            "last_refresh_ms": round(self.last_refresh_ms, 2),
+        }
+
+
+flight_availability = FlightAvailabilityView(max_age=settings.FLIGHT_VIEW_MAX_AGE_SECONDS)
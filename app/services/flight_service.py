@@ -1,7 +1,25 @@
-from datetime import datetime
+import base64
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.flight_repository import FlightRepository, AirportRepository
-from app.schemes.flights import FlightCreate, FlightUpdate, AirportCreate
+from app.schemes.flights import (
+    FlightCreate,
+    FlightUpdate,
+    AirportCreate,
+    AirportRead,
+    FareCalendarRead,
+    FareDayRead,
+    RouteRead,
+    SeatMapRead,
+)
+from app.services.airport_cache import airport_cache
+from app.services.airport_suggest import airport_suggest
+from app.services.fare_calendar import fare_calendar
+from app.services.flight_availability import flight_availability
+from app.services.route_search import route_search
+from app.services.seat_inventory import SEATS_PER_ROW, seat_inventory, seat_label
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,13 +32,76 @@ class FlightService:
         self.db_session = db_session
 
     async def get_flight(self, flight_id: int):
-        flight = await self.flight_repo.get_flight_by_id(flight_id)
+        flight = await self.flight_repo.get_flight_by_id(flight_id, with_airports=True)
         if not flight:
             raise ValueError(f"Flight with id {flight_id} not found")
         return flight
 
-    async def get_all_flights(self):
-        return await self.flight_repo.get_all_flights()
+    async def _resolve_airports(self, airport_ids: set[int]) -> dict[int, AirportRead]:
+        """Аэропорты из кэша; промахи дочитываются из БД одним запросом"""
+        airports = {}
+        missing = []
+        for airport_id in airport_ids:
+            airport = airport_cache.get_by_id(airport_id)
+            if airport is None:
+                missing.append(airport_id)
+            else:
+                airports[airport_id] = airport
+        if missing:
+            for model in await self.airport_repo.get_airports_by_ids(missing):
+                airports[model.id] = airport_cache.put(model)
+        return airports
+
+    @staticmethod
+    def encode_cursor(departure_time: datetime, flight_id: int) -> str:
+        """Непрозрачный курсор страницы: (departure_time, id) последнего рейса"""
+        raw = f"{departure_time.isoformat()}|{flight_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            departure_time, flight_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(departure_time), int(flight_id)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+
+    async def get_flights_page(
+        self, limit: int, after: tuple[datetime, int] | None = None
+    ):
+        """Возвращает страницу рейсов и курсор следующей страницы (или None) из read-модели"""
+        await flight_availability.ensure_loaded(self.db_session)
+        flights, last_key = flight_availability.page(limit, after)
+        next_cursor = self.encode_cursor(*last_key) if last_key else None
+        return flights, next_cursor
+
+    async def stream_flights(
+        self, after: tuple[datetime, int] | None = None
+    ) -> AsyncIterator[dict]:
+        """Потоково отдает рейсы в форме FlightListRead"""
+        async for row in self.flight_repo.stream_flight_rows(after):
+            flight = {
+                "id": row["id"],
+                "flight_number": row["flight_number"],
+                "airline": row["airline"],
+                "departure_time": row["departure_time"],
+                "arrival_time": row["arrival_time"],
+                "available_seats": row["available_seats"],
+                "price": row["price"],
+            }
+            for side in ("departure", "arrival"):
+                prefix = f"{side}_airport_"
+                flight[f"{side}_airport"] = {
+                    "id": row[prefix + "id"],
+                    "code": row[prefix + "code"],
+                    "name": row[prefix + "name"],
+                    "city": row[prefix + "city"],
+                    "country": row[prefix + "country"],
+                }
+            yield flight
 
     async def search_flights(
         self,
@@ -35,91 +116,216 @@ class FlightService:
             except ValueError:
                 raise ValueError("Invalid date format. Use ISO format (YYYY-MM-DD)")
 
-        flights = await self.flight_repo.search_flights(
+        await flight_availability.ensure_loaded(self.db_session)
+        return flight_availability.search(
             departure_airport_id=departure_airport_id,
             arrival_airport_id=arrival_airport_id,
-            departure_date=departure_date_obj,
+            departure_date=departure_date_obj.date() if departure_date_obj else None,
         )
-        return flights
 
-    async def create_flight(self, flight_data: FlightCreate):
-        # Проверяем аэропорты
-        departure_airport = await self.airport_repo.get_airport_by_id(
-            flight_data.departure_airport_id
+    async def search_routes(
+        self,
+        departure_airport_id: int,
+        arrival_airport_id: int,
+        departure_date: date,
+        max_stops: int = 1,
+        min_connection_minutes: int = 60,
+        passengers: int = 1,
+        limit: int = 10,
+    ) -> list[RouteRead]:
+        """Маршруты с пересадками по графу рейсов в памяти"""
+        await flight_availability.ensure_loaded(self.db_session)
+        routes = route_search.search(
+            departure_airport_id,
+            arrival_airport_id,
+            departure_date,
+            max_stops=max_stops,
+            min_connection_minutes=min_connection_minutes,
+            passengers=passengers,
+            limit=limit,
         )
-        arrival_airport = await self.airport_repo.get_airport_by_id(
-            flight_data.arrival_airport_id
+        return [
+            RouteRead(
+                departure_time=legs[0].departure_time,
+                arrival_time=legs[-1].arrival_time,
+                duration_minutes=(legs[-1].arrival_time - legs[0].departure_time) // timedelta(minutes=1),
+                stops=len(legs) - 1,
+                price=sum(leg.price for leg in legs),
+                flights=[leg.row() for leg in legs],
+            )
+            for legs in routes
+        ]
+
+    async def get_fare_calendar(
+        self, departure_airport_id: int, arrival_airport_id: int, month: str
+    ) -> FareCalendarRead:
+        """Минимальная цена и места по дням месяца (YYYY-MM) из календаря в памяти"""
+        try:
+            first_day = datetime.strptime(month, "%Y-%m").date()
+        except ValueError:
+            raise ValueError("Invalid month format. Use YYYY-MM")
+
+        await flight_availability.ensure_loaded(self.db_session)
+        airports = await self._resolve_airports({departure_airport_id, arrival_airport_id})
+        for airport_id in (departure_airport_id, arrival_airport_id):
+            if airport_id not in airports:
+                raise ValueError(f"Airport with id {airport_id} not found")
+        days = fare_calendar.month(departure_airport_id, arrival_airport_id, first_day.year, first_day.month)
+        return FareCalendarRead(
+            departure_airport_id=departure_airport_id,
+            arrival_airport_id=arrival_airport_id,
+            month=first_day.strftime("%Y-%m"),
+            days=[
+                FareDayRead(
+                    date=day,
+                    min_price=fare.min_price if fare else None,
+                    available_seats=fare.available_seats if fare else 0,
+                    flights=fare.flights if fare else 0,
+                )
+                for day, fare in days
+            ],
+        )
+
+    async def create_flight(self, flight_data: FlightCreate):
+        # Проверяем аэропорты (по кэшу справочника)
+        airports = await self._resolve_airports(
+            {flight_data.departure_airport_id, flight_data.arrival_airport_id}
         )
 
-        if not departure_airport:
+        if flight_data.departure_airport_id not in airports:
             raise ValueError("Departure airport not found")
-        if not arrival_airport:
+        if flight_data.arrival_airport_id not in airports:
             raise ValueError("Arrival airport not found")
         if flight_data.available_seats > flight_data.total_seats:
             raise ValueError("Available seats cannot exceed total seats")
 
         flight = await self.flight_repo.create_flight(flight_data.dict())
+        # Перечитываем с аэропортами: они нужны ответу FlightRead
+        flight = await self.flight_repo.get_flight_by_id(flight.id, with_airports=True)
+        await self.db_session.commit()
+        # Read-модель общая для запросов процесса - только после коммита
+        flight_availability.put_flight(flight)
         return flight
 
     async def update_flight(self, flight_id: int, flight_data: FlightUpdate):
-        flight = await self.flight_repo.get_flight_by_id(flight_id)
+        flight = await self.flight_repo.get_flight_by_id(flight_id, with_airports=True)
         if not flight:
             raise ValueError(f"Flight with id {flight_id} not found")
 
         update_data = flight_data.dict(exclude_unset=True)
         flight = await self.flight_repo.update_flight(flight_id, update_data)
+        await self.db_session.commit()
+        if "total_seats" in update_data:
+            # Размер карты мест изменился - перечитается при следующем обращении
+            seat_inventory.invalidate(flight_id)
+        flight_availability.put_flight(flight)
         return flight
 
     async def delete_flight(self, flight_id: int):
         success = await self.flight_repo.delete_flight(flight_id)
         if not success:
             raise ValueError(f"Flight with id {flight_id} not found")
+        await self.db_session.commit()
+        seat_inventory.invalidate(flight_id)
+        flight_availability.remove_flight(flight_id)
         return {"message": "Flight deleted successfully"}
 
+    async def get_availability(self, flight_id: int):
+        """Места рейса по статусам броней из read-модели (без пересчета броней)"""
+        await flight_availability.ensure_loaded(self.db_session)
+        flight = flight_availability.get(flight_id)
+        if flight is None:
+            raise ValueError(f"Flight with id {flight_id} not found")
+        return flight.read()
+
+    async def get_seat_map(self, flight_id: int, adjacent: int | None = None) -> SeatMapRead:
+        """Свободные места рейса по карте в памяти (+ блок из adjacent мест в ряду)"""
+        seat_map = await seat_inventory.get_map(self.db_session, flight_id)
+        if seat_map is None:
+            raise ValueError(f"Flight with id {flight_id} not found")
+        block = None
+        if adjacent:
+            start = seat_map.find_adjacent(adjacent)
+            if start is not None:
+                block = [seat_label(seat) for seat in range(start, start + adjacent)]
+        return SeatMapRead(
+            flight_id=flight_id,
+            total_seats=seat_map.total_seats,
+            free_count=seat_map.free_count(),
+            seats_per_row=SEATS_PER_ROW,
+            free_seats=[seat_label(seat) for seat in seat_map.free_seats()],
+            adjacent_block=block,
+        )
+
 
 class AirportService:
     def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
         self.airport_repo = AirportRepository(db_session)
 
     async def get_airport(self, airport_id: int):
-        airport = await self.airport_repo.get_airport_by_id(airport_id)
-        if not airport:
-            raise ValueError(f"Airport with id {airport_id} not found")
+        airport = airport_cache.get_by_id(airport_id)
+        if airport is None:
+            airport = await self.airport_repo.get_airport_by_id(airport_id)
+            if not airport:
+                raise ValueError(f"Airport with id {airport_id} not found")
+            airport = airport_cache.put(airport)
         return airport
 
     async def get_airport_by_code(self, code: str):
-        airport = await self.airport_repo.get_airport_by_code(code)
-        if not airport:
-            raise ValueError(f"Airport with code {code} not found")
+        airport = airport_cache.get_by_code(code)
+        if airport is None:
+            airport = await self.airport_repo.get_airport_by_code(code)
+            if not airport:
+                raise ValueError(f"Airport with code {code} not found")
+            airport = airport_cache.put(airport)
         return airport
 
     async def get_all_airports(self):
-        return await self.airport_repo.get_all_airports()
+        await airport_cache.ensure_loaded(self.airport_repo.db_session)
+        return airport_cache.all()
+
+    async def suggest_airports(self, query: str, limit: int = 10) -> list[AirportRead]:
+        """Автодополнение по префиксу кода, города или названия"""
+        await airport_cache.ensure_loaded(self.airport_repo.db_session)
+        return airport_suggest.suggest(query, limit)
 
     async def create_airport(self, airport_data: AirportCreate):
-        logger.info(f"[AirportService] Attempting to create airport with code: {airport_data.code}")
+        logger.info("[AirportService] Attempting to create airport with code: %s", airport_data.code)
         
-        # Проверяем наличие аэропорта с таким кодом
-        existing = await self.airport_repo.get_airport_by_code(airport_data.code)
+        # Проверяем наличие аэропорта с таким кодом: сначала по кэшу,
+        # а гонку с другим процессом ловит уникальный индекс по code
+        existing = airport_cache.get_by_code(airport_data.code)
         if existing:
-            logger.warning(f"[AirportService] Airport with code {airport_data.code} already exists (id: {existing.id})")
+            logger.warning("[AirportService] Airport with code %s already exists (id: %s)", airport_data.code, existing.id)
             raise ValueError(f"Airport with code {airport_data.code} already exists")
 
-        logger.info(f"[AirportService] Creating new airport: {airport_data.code} - {airport_data.name}")
-        airport = await self.airport_repo.create_airport(airport_data.dict())
-        logger.info(f"[AirportService] Airport created successfully with id: {airport.id}")
+        logger.info("[AirportService] Creating new airport: %s - %s", airport_data.code, airport_data.name)
+        try:
+            airport = await self.airport_repo.create_airport(airport_data.dict())
+        except IntegrityError:
+            logger.warning("[AirportService] Airport with code %s already exists", airport_data.code)
+            raise ValueError(f"Airport with code {airport_data.code} already exists")
+        await self.db_session.commit()
+        # Кэш (и индекс подсказок по нему) общий для процесса - только после коммита
+        airport_cache.put(airport)
+        logger.info("[AirportService] Airport created successfully with id: %s", airport.id)
         return airport
 
     async def update_airport(self, airport_id: int, airport_data: dict):
-        airport = await self.airport_repo.get_airport_by_id(airport_id)
+        airport = await self.airport_repo.update_airport(airport_id, airport_data)
         if not airport:
             raise ValueError(f"Airport with id {airport_id} not found")
-
-        airport = await self.airport_repo.update_airport(airport_id, airport_data)
+        await self.db_session.commit()
+        airport_cache.put(airport)
+        flight_availability.airport_changed(airport_id)
         return airport
 
     async def delete_airport(self, airport_id: int):
         success = await self.airport_repo.delete_airport(airport_id)
         if not success:
             raise ValueError(f"Airport with id {airport_id} not found")
+        await self.db_session.commit()
+        airport_cache.remove(airport_id)
+        flight_availability.airport_changed(airport_id)
         return {"message": "Airport deleted successfully"}
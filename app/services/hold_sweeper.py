@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.database.database import async_session_maker
+from app.database.db_manager import DBManager
+from app.services.booking_service import BookingService
+
+logger = logging.getLogger(__name__)
+
+
+class HoldSweeper:
+    """
+    ⏳ Фоновая задача: снимает просроченные брони мест.
+
+    PENDING-бронь держит места ttl секунд; затем она отменяется, а места
+    возвращаются на рейс. Работа идет пачками по batch_size броней, каждая
+    пачка - отдельная короткая транзакция, между пачками - пауза batch_pause,
+    чтобы блокировку записи SQLite успели взять запросы.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        interval: float,
+        batch_size: int,
+        batch_pause: float = 0.0,
+        session_factory=async_session_maker,
+    ) -> None:
+        self.ttl = ttl
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        # Счетчики для мониторинга
+        self.runs = 0
+        self.batches = 0
+        self.expired_bookings = 0
+        self.released_seats = 0
+        self.errors = 0
+        self.last_run_at: datetime | None = None
+        self.last_run_ms = 0.0
+        self.max_batch_ms = 0.0
+
+    async def sweep_once(self, now: datetime | None = None) -> int:
+        """Снимает все брони, просроченные на момент now; возвращает их число"""
+        if self.ttl <= 0:
+            return 0
+        now = now or datetime.now(timezone.utc)
+        # created_at пишется CURRENT_TIMESTAMP SQLite - это UTC без часового пояса
+        created_before = now.replace(tzinfo=None) - timedelta(seconds=self.ttl)
+        started = time.perf_counter()
+        expired_total = 0
+        while True:
+            batch_started = time.perf_counter()
+            async with DBManager(session_factory=self.session_factory) as db:
+                expired, seats = await BookingService(db).expire_holds(created_before, self.batch_size)
+            self.max_batch_ms = max(self.max_batch_ms, (time.perf_counter() - batch_started) * 1000)
+            if expired:
+                self.batches += 1
+                self.expired_bookings += expired
+                self.released_seats += seats
+                expired_total += expired
+            if expired < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+        self.runs += 1
+        self.last_run_at = now
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        if expired_total:
+            logger.info("[HoldSweeper] Expired %d bookings in %.1f ms", expired_total, self.last_run_ms)
+        return expired_total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("[HoldSweeper] Sweep failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.ttl <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="hold-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "batches": self.batches,
+            "expired_bookings": self.expired_bookings,
+            "released_seats": self.released_seats,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "max_batch_ms": round(self.max_batch_ms, 2),
+        }
+
+
+hold_sweeper = HoldSweeper(
+    ttl=settings.BOOKING_HOLD_TTL_SECONDS,
+    interval=settings.HOLD_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.HOLD_SWEEP_BATCH_SIZE,
+    batch_pause=settings.HOLD_SWEEP_BATCH_PAUSE_SECONDS,
+)
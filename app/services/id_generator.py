@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+
+from app.config import settings
+
+# Crockford base32: без I, L, O, U; символы идут по возрастанию ASCII,
+# поэтому строковый порядок идентификаторов совпадает с числовым
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+TIMESTAMP_BITS = 48  # миллисекунды Unix-времени (хватит до 10889 года)
+NODE_BITS = 8        # номер хоста/инстанса из settings.ID_NODE
+PID_BITS = 22        # pid процесса: pid_max в Linux не больше 2**22
+SEQUENCE_BITS = 12   # до 4096 идентификаторов в миллисекунду на процесс
+
+ENCODED_LENGTH = 18  # 90 бит / 5 бит на символ
+
+# Таблица пар символов: кодируем по 10 бит за раз вместо 5
+_PAIRS = [ALPHABET[i >> 5] + ALPHABET[i & 31] for i in range(1024)]
+
+
+class IdGenerator:
+    """
+    🔢 Генератор монотонных идентификаторов (номера брони, ID транзакций).
+
+    Идентификатор - 90 бит: время в мс | node | pid | счетчик, закодированные
+    в Crockford base32. Внутри процесса значения строго возрастают (при
+    переполнении счетчика или переводе часов назад используется следующая
+    "логическая" миллисекунда), а разные процессы различаются полями
+    node/pid - проверять уникальность в БД не нужно. Благодаря времени
+    в старших битах новые ключи попадают в конец B-tree индекса.
+    """
+
+    def __init__(self, node: int = 0) -> None:
+        if not 0 <= node < 1 << NODE_BITS:
+            raise ValueError(f"ID node must be in [0, {(1 << NODE_BITS) - 1}]")
+        self.node = node
+        self._reset()
+        # После fork у дочернего процесса другой pid и свежий счетчик
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._pid = os.getpid() & ((1 << PID_BITS) - 1)
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_int(self) -> int:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                self._sequence += 1
+                if self._sequence >> SEQUENCE_BITS:
+                    # Счетчик исчерпан: занимаем следующую миллисекунду
+                    self._last_ms += 1
+                    self._sequence = 0
+            value = self._last_ms
+            value = (value << NODE_BITS) | self.node
+            value = (value << PID_BITS) | self._pid
+            return (value << SEQUENCE_BITS) | self._sequence
+
+    @staticmethod
+    def encode(value: int) -> str:
+        return "".join(
+            [_PAIRS[value >> shift & 1023] for shift in range(80, -10, -10)]
+        )
+
+    def next_id(self, prefix: str = "") -> str:
+        return prefix + self.encode(self.next_int())
+
+    def booking_number(self) -> str:
+        """BK + 18 символов = 20, ровно под bookings.booking_number"""
+        return self.next_id("BK")
+
+    def transaction_id(self) -> str:
+        return self.next_id("TRX")
+
+
+id_generator = IdGenerator(settings.ID_NODE)
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
+from app.exceptions.auth import PasswordHasherBusyError
+
+# hook(operation, queue_wait_seconds, hash_seconds)
+MetricsHook = Callable[[str, float, float], None]
+
+
+class PasswordHasher:
+    """
+    🔐 Выделенный пул потоков для bcrypt.
+
+    Хэширование bcrypt занимает 100-300 мс CPU и отпускает GIL, поэтому его
+    выполняют отдельные потоки, а event loop продолжает обслуживать запросы.
+    Если задач больше, чем workers + max_queue, новые сразу отклоняются
+    (PasswordHasherBusyError -> 503), а не копятся без ограничений.
+    workers=0 - выполнение прямо в event loop (старое поведение).
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._hooks: list[MetricsHook] = []
+
+    def add_metrics_hook(self, hook: MetricsHook) -> None:
+        self._hooks.append(hook)
+
+    @property
+    def queue_depth(self) -> int:
+        """Сколько задач ждет свободного потока"""
+        return max(0, self.pending - self.workers)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def run(self, operation: str, func: Callable, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusyError
+
+        submitted = time.perf_counter()
+        timings = {}
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings["wait"] = started - submitted
+                timings["hash"] = time.perf_counter() - started
+
+        self.pending += 1
+        try:
+            if self.workers == 0:
+                result = job()
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._get_executor(), job)
+        finally:
+            self.pending -= 1
+        for hook in self._hooks:
+            hook(operation, timings["wait"], timings["hash"])
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,56 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.roles import RolesRepository
+from app.schemes.roles import SRoleGet
+
+
+class RoleCache:
+    """
+    👑 Справочник ролей в памяти процесса.
+
+    Ролей единицы, поэтому они читаются из БД целиком при первом обращении,
+    а RoleService обновляет кэш при создании, изменении и удалении роли.
+    """
+
+    def __init__(self) -> None:
+        self._by_id: dict[int, SRoleGet] = {}
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    async def load(self, db_session: AsyncSession) -> None:
+        roles = await RolesRepository(db_session).get_all()
+        self._by_id = {role.id: role for role in roles}
+        self.loaded = True
+
+    async def get(self, db_session: AsyncSession, role_id: int) -> SRoleGet | None:
+        role = self._by_id.get(role_id)
+        if role is not None:
+            self.hits += 1
+            return role
+        self.misses += 1
+        # Промах: роль могли создать в другом процессе - перечитываем справочник
+        await self.load(db_session)
+        return self._by_id.get(role_id)
+
+    def put(self, role: SRoleGet) -> None:
+        self._by_id[role.id] = role
+
+    def remove(self, role_id: int) -> None:
+        self._by_id.pop(role_id, None)
+
+    def invalidate(self) -> None:
+        self._by_id.clear()
+        self.loaded = False
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._by_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+role_cache = RoleCache()
@@ -1,18 +1,20 @@
 from app.exceptions.base import ObjectAlreadyExistsError
 from app.exceptions.roles import RoleNotFoundError, RoleAlreadyExistsError
-from app.schemes.roles import SRoleAdd
+from app.schemes.roles import SRoleAdd, SRoleGet
 from app.schemes.relations_users_roles import SRoleGetWithRels
 from app.services.base import BaseService
+from app.services.role_cache import role_cache
 
 
 class RoleService(BaseService):
 
     async def create_role(self, role_data: SRoleAdd):
         try:
-            await self.db.roles.add(role_data)
+            role = await self.db.roles.add(role_data)
         except ObjectAlreadyExistsError:
             raise RoleAlreadyExistsError
         await self.db.commit()
+        role_cache.put(role)
 
     async def get_role(self, role_id: int):
         role: SRoleGetWithRels | None = await self.db.roles.get_one_or_none_with_users(
@@ -26,8 +28,9 @@ class RoleService(BaseService):
         role: SRoleGetWithRels | None = await self.db.roles.get_one_or_none(id=role_id)
         if not role:
             raise RoleNotFoundError
-        await self.db.roles.edit(role_data)
+        await self.db.roles.edit(role_data, id=role_id)
         await self.db.commit()
+        role_cache.put(SRoleGet(id=role_id, **role_data.model_dump()))
         return
 
     async def delete_role(self, role_id: int):
@@ -36,6 +39,7 @@ class RoleService(BaseService):
             raise RoleNotFoundError
         await self.db.roles.delete(id=role_id)
         await self.db.commit()
+        role_cache.remove(role_id)
         return
 
     async def get_roles(self):
@@ -0,0 +1,162 @@
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+
+from app.services.flight_availability import FlightAvailability, FlightAvailabilityView, flight_availability
+
+MINUTE = timedelta(minutes=1)
+EPOCH = datetime(1970, 1, 1)
+NEVER = -(1 << 62)
+
+MAX_TRIP_HOURS = 48       # маршрут должен закончиться не позже чем через 48 ч после начала дня вылета
+MAX_LAYOVER_HOURS = 24    # самая долгая пересадка
+MAX_CANDIDATES = 2000     # сколько маршрутов перебирать до сортировки и среза limit
+
+# Соединение (рейс) графа: (вылет, прилет, откуда, куда, flight_id, строка read-модели);
+# время - в минутах от эпохи, кортежи сортируются по вылету
+Connection = tuple[int, int, int, int, int, FlightAvailability]
+
+
+def to_minutes(value: datetime) -> int:
+    return (value - EPOCH) // MINUTE
+
+
+class RouteSearchEngine:
+    """
+    🧭 Поиск маршрутов с пересадками по графу рейсов в памяти.
+
+    Граф зависит от времени: у каждого аэропорта - отсортированный по вылету
+    список рейсов, плюс общий список всех рейсов по вылету. Запрос
+    "A -> B в день D, до K пересадок, пересадка не короче M минут":
+      1. обратный проход Connection Scan по рейсам окна [D, D + 48 ч]
+         K + 1 раундов: latest[r][X] - самый поздний вылет из X, с которого
+         еще можно долететь до B не более чем r рейсами;
+      2. перебор в глубину от A только по рейсам, которые проходят эти
+         границы, - тупиковые ветки отсекаются сразу.
+    Индексы обновляются по событиям read-модели рейсов (FlightAvailabilityView).
+    """
+
+    def __init__(self, view: FlightAvailabilityView) -> None:
+        self.view = view
+        self._connections: list[Connection] = []
+        self._departures: dict[int, list[Connection]] = {}
+        self.built = False
+        self.builds = 0
+        view.add_listener(self.on_flight_change)
+
+    @staticmethod
+    def _connection(flight: FlightAvailability) -> Connection:
+        return (
+            to_minutes(flight.departure_time),
+            to_minutes(flight.arrival_time),
+            flight.departure_airport_id,
+            flight.arrival_airport_id,
+            flight.id,
+            flight,
+        )
+
+    def build(self) -> None:
+        self._connections = sorted(self._connection(flight) for flight in self.view.flights())
+        self._departures = {}
+        for connection in self._connections:
+            self._departures.setdefault(connection[2], []).append(connection)
+        self.built = True
+        self.builds += 1
+
+    def on_flight_change(self, event: str, flight: FlightAvailability | None) -> None:
+        if event == "reset":
+            self.built = False
+        elif not self.built:
+            return
+        elif event == "put":
+            connection = self._connection(flight)
+            insort(self._connections, connection)
+            insort(self._departures.setdefault(connection[2], []), connection)
+        elif event == "remove":
+            connection = self._connection(flight)
+            for connections in (self._connections, self._departures.get(connection[2], [])):
+                index = bisect_left(connections, connection)
+                if index < len(connections) and connections[index][4] == flight.id:
+                    del connections[index]
+
+    def _latest_departures(
+        self, window: list[Connection], destination: int, legs: int, min_connection: int, passengers: int
+    ) -> list[dict[int, int]]:
+        """latest[r][airport]: самый поздний вылет, с которого B достижим за <= r рейсов"""
+        latest = [{}]
+        for _ in range(legs):
+            previous = latest[-1]
+            current = dict(previous)
+            for departure, arrival, origin, target, _, flight in window:
+                if flight.available_seats < passengers:
+                    continue
+                if target != destination:
+                    deadline = previous.get(target)
+                    if deadline is None or arrival + min_connection > deadline:
+                        continue
+                if departure > current.get(origin, NEVER):
+                    current[origin] = departure
+            latest.append(current)
+        return latest
+
+    def search(
+        self,
+        origin: int,
+        destination: int,
+        day: date,
+        max_stops: int = 1,
+        min_connection_minutes: int = 60,
+        passengers: int = 1,
+        limit: int = 10,
+    ) -> list[list[FlightAvailability]]:
+        """Маршруты (списки рейсов), отсортированные по прилету, длительности и числу пересадок"""
+        if not self.built:
+            self.build()
+        if origin == destination:
+            return []
+        day_start = to_minutes(datetime.combine(day, time.min))
+        day_end = day_start + 24 * 60
+        horizon = day_start + MAX_TRIP_HOURS * 60
+        legs = max_stops + 1
+        low = bisect_left(self._connections, (day_start,))
+        high = bisect_left(self._connections, (horizon + 1,))
+        window = [c for c in self._connections[low:high] if c[1] <= horizon]
+        latest = self._latest_departures(window, destination, legs, min_connection_minutes, passengers)
+        if origin not in latest[legs]:
+            return []
+
+        max_layover = MAX_LAYOVER_HOURS * 60
+        results: list[list[Connection]] = []
+
+        def extend(path: list[Connection], airport: int, ready: int, remaining: int, last_departure: int) -> None:
+            connections = self._departures.get(airport, [])
+            last_departure = min(last_departure, latest[remaining][airport])
+            for connection in connections[bisect_left(connections, (ready,)):]:
+                departure, arrival, _, target, _, flight = connection
+                if departure > last_departure or len(results) >= MAX_CANDIDATES:
+                    break
+                if flight.available_seats < passengers or arrival > horizon:
+                    continue
+                if target == destination:
+                    results.append(path + [connection])
+                    continue
+                if remaining == 1 or any(leg[2] == target for leg in path):
+                    continue
+                deadline = latest[remaining - 1].get(target)
+                if deadline is not None and arrival + min_connection_minutes <= deadline:
+                    extend(
+                        path + [connection],
+                        target,
+                        arrival + min_connection_minutes,
+                        remaining - 1,
+                        arrival + max_layover,
+                    )
+
+        extend([], origin, day_start, legs, day_end - 1)
+        results.sort(key=lambda path: (path[-1][1], path[-1][1] - path[0][0], len(path)))
+        return [[connection[5] for connection in path] for path in results[:limit]]
+
+    def stats(self) -> dict:
+        return {"connections": len(self._connections), "airports": len(self._departures), "builds": self.builds}
+
+
+route_search = RouteSearchEngine(flight_availability)
@@ -0,0 +1,223 @@
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.seat_repository import SeatRepository
+
+SEATS_PER_ROW = 6
+ROW_LETTERS = "ABCDEF"
+
+# Сколько раз перевыбирать места, если часть уже заняли другие процессы
+ASSIGN_ATTEMPTS = 3
+
+
+def seat_label(seat_number: int) -> str:
+    """1 -> '1A', 8 -> '2B'"""
+    row, position = divmod(seat_number - 1, SEATS_PER_ROW)
+    return f"{row + 1}{ROW_LETTERS[position]}"
+
+
+@lru_cache(maxsize=None)
+def _row_starts(total_seats: int, count: int) -> int:
+    """Маска позиций, с которых count мест подряд помещаются в один ряд"""
+    mask = 0
+    for start in range(total_seats - count + 1):
+        if start % SEATS_PER_ROW + count <= SEATS_PER_ROW:
+            mask |= 1 << start
+    return mask
+
+
+class SeatMap:
+    """
+    💺 Карта мест одного рейса: бит i = место i + 1 свободно.
+
+    Поиск N соседних мест - несколько сдвигов и AND над int:
+    после k шагов удвоения бит p остается, только если свободны места p..p+N-1.
+
+    available - счетчик flights.available_seats: если проданных мест больше,
+    чем строк в flight_seats (брони в обход карты), лишние свободные места
+    с конца салона считаются занятыми - карта не предложит больше, чем продается.
+    """
+
+    __slots__ = ("total_seats", "free")
+
+    def __init__(self, total_seats: int, taken: list[int] = (), available: int | None = None) -> None:
+        self.total_seats = total_seats
+        self.free = (1 << total_seats) - 1
+        for seat_number in taken:
+            if 1 <= seat_number <= total_seats:
+                self.free &= ~(1 << (seat_number - 1))
+        if available is not None:
+            for _ in range(self.free_count() - max(available, 0)):
+                self.free ^= 1 << (self.free.bit_length() - 1)
+
+    def free_count(self) -> int:
+        return self.free.bit_count()
+
+    def is_free(self, seat_number: int) -> bool:
+        return bool(self.free >> (seat_number - 1) & 1)
+
+    def free_seats(self) -> list[int]:
+        free, seats = self.free, []
+        while free:
+            low = free & -free
+            seats.append(low.bit_length())
+            free ^= low
+        return seats
+
+    def find_adjacent(self, count: int) -> int | None:
+        """Номер первого места блока из count свободных мест в одном ряду"""
+        if count < 1 or count > SEATS_PER_ROW:
+            return None
+        runs, span = self.free, 1
+        while span < count:
+            step = min(span, count - span)
+            runs &= runs >> step
+            span += step
+        runs &= _row_starts(self.total_seats, count)
+        if not runs:
+            return None
+        return (runs & -runs).bit_length()
+
+    def pick(self, count: int) -> list[int] | None:
+        """Соседние места, если есть; иначе первые свободные; None - мест нет"""
+        start = self.find_adjacent(count)
+        if start is not None:
+            return list(range(start, start + count))
+        if self.free_count() < count:
+            return None
+        return self.free_seats()[:count]
+
+    def reserve(self, seats: list[int]) -> None:
+        for seat_number in seats:
+            self.free &= ~(1 << (seat_number - 1))
+
+    def release(self, seats: list[int]) -> None:
+        for seat_number in seats:
+            if 1 <= seat_number <= self.total_seats:
+                self.free |= 1 << (seat_number - 1)
+
+
+class SeatInventory:
+    """
+    🗺️ Карты мест рейсов в памяти процесса (грузятся лениво, по рейсу).
+
+    Источник истины - таблица flight_seats с уникальным (flight_id, seat_number):
+    карта лишь подсказывает свободные места. Выбранные места сразу снимаются
+    с карты, чтобы параллельные запросы процесса их не взяли; если транзакция
+    не прошла, вызывающий возвращает их через release(). Если место успел
+    занять другой процесс, INSERT его пропускает, карта рейса перечитывается
+    и места выбираются заново.
+    """
+
+    def __init__(self) -> None:
+        self._maps: dict[int, SeatMap] = {}
+
+    async def get_map(self, db_session: AsyncSession, flight_id: int, reserved: int = 0) -> SeatMap | None:
+        """
+        Карта рейса (грузится при первом обращении). reserved - места, уже
+        списанные со счетчика рейса в текущей транзакции, но еще без строк
+        flight_seats: они не должны уменьшать число свободных мест карты.
+        """
+        seat_map = self._maps.get(flight_id)
+        if seat_map is None:
+            state = await SeatRepository(db_session).get_seat_state(flight_id)
+            if state is None:
+                return None
+            total_seats, taken, available = state
+            seat_map = self._maps[flight_id] = SeatMap(total_seats, taken, available + reserved)
+        return seat_map
+
+    async def assign(
+        self, db_session: AsyncSession, requests: list[tuple[int, int, int]]
+    ) -> list[list[int]]:
+        """
+        Закрепляет места за бронями: requests - (flight_id, booking_id, count).
+        Все строки пишутся одним INSERT; возвращает номера мест по каждой заявке.
+        """
+        repo = SeatRepository(db_session)
+        assigned: dict[int, list[int]] = {}
+        # Места, снятые с карты в текущей попытке, но еще не закрепленные
+        picked: dict[int, list[int]] = {}
+        pending = list(range(len(requests)))
+        reloaded: set[int] = set()
+
+        def reserved(flight_id: int) -> int:
+            # Заявки без строк flight_seats: их места счетчик рейса уже списал
+            return sum(requests[index][2] for index in pending if requests[index][0] == flight_id)
+
+        try:
+            for _ in range(ASSIGN_ATTEMPTS):
+                rows, picked = [], {}
+                for index in pending:
+                    flight_id, booking_id, count = requests[index]
+                    seat_map = await self.get_map(db_session, flight_id, reserved(flight_id))
+                    seats = seat_map.pick(count) if seat_map else None
+                    if seats is None and seat_map is not None and flight_id not in reloaded:
+                        # Карта могла устареть (отмены и снятие броней в других
+                        # процессах) - перечитываем рейс один раз, прежде чем отказать
+                        reloaded.add(flight_id)
+                        seat_map = await self._reload(db_session, flight_id, picked, requests, reserved(flight_id))
+                        seats = seat_map.pick(count) if seat_map else None
+                    if seats is None:
+                        raise ValueError(f"Not enough free seats on flight {flight_id}")
+                    seat_map.reserve(seats)
+                    picked[index] = seats
+                    rows += [
+                        {"flight_id": flight_id, "seat_number": seat, "booking_id": booking_id}
+                        for seat in seats
+                    ]
+
+                inserted = await repo.insert_seats(rows)
+                pending = []
+                for index, seats in list(picked.items()):
+                    flight_id, booking_id, _ = requests[index]
+                    del picked[index]
+                    if all((flight_id, seat) in inserted for seat in seats):
+                        assigned[index] = seats
+                        continue
+                    # Часть мест заняли в другом процессе: снимаем свое и перечитываем рейс
+                    await repo.release_booking_seats(booking_id)
+                    self.invalidate(flight_id)
+                    pending.append(index)
+                if not pending:
+                    return [assigned[index] for index in range(len(requests))]
+            raise ValueError("Could not assign seats, please retry")
+        except Exception:
+            for index, seats in (*assigned.items(), *picked.items()):
+                self.release(requests[index][0], seats)
+            raise
+
+    async def _reload(
+        self,
+        db_session: AsyncSession,
+        flight_id: int,
+        picked: dict[int, list[int]],
+        requests: list,
+        reserved: int,
+    ) -> SeatMap | None:
+        """Перечитывает карту рейса; места, уже выбранные в этой попытке, снова снимаются"""
+        self.invalidate(flight_id)
+        seat_map = await self.get_map(db_session, flight_id, reserved)
+        if seat_map is not None:
+            for index, seats in picked.items():
+                if requests[index][0] == flight_id:
+                    seat_map.reserve(seats)
+        return seat_map
+
+    def release(self, flight_id: int, seats: list[int]) -> None:
+        seat_map = self._maps.get(flight_id)
+        if seat_map is not None:
+            seat_map.release(seats)
+
+    def invalidate(self, flight_id: int | None = None) -> None:
+        if flight_id is None:
+            self._maps.clear()
+        else:
+            self._maps.pop(flight_id, None)
+
+    def stats(self) -> dict:
+        return {"flights": len(self._maps)}
+
+
+seat_inventory = SeatInventory()
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import settings
+
+
+class TokenClaimsCache:
+    """
+    🎟️ LRU-кэш декодированных JWT.
+
+    Клиент присылает одну и ту же cookie тысячи раз, поэтому результат
+    проверки подписи и разбора JSON запоминается по самой строке токена.
+    Запись действительна строго до claims["exp"] (как и в PyJWT без leeway:
+    токен валиден, пока now < exp); токены без exp не кэшируются.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            item = self._items.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+            claims, expires_at = item
+            if time.time() >= expires_at:
+                del self._items[token]
+                self.misses += 1
+                return None
+            self._items.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        expires_at = claims.get("exp")
+        if expires_at is None or self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[token] = (claims, float(expires_at))
+            self._items.move_to_end(token)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_claims_cache = TokenClaimsCache(settings.JWT_CACHE_SIZE)
@@ -0,0 +1,27 @@
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def rows_response(rows: Sequence[dict], headers: Mapping[str, str] | None = None) -> Response:
+    """
+    ⚡ Строки запроса (обычные dict) сразу в JSON через orjson.
+
+    Возвращенный Response FastAPI отдает как есть: без повторной валидации
+    по response_model, jsonable_encoder и json.dumps. response_model в
+    декораторе остается для OpenAPI, поэтому колонки запроса должны
+    совпадать с полями схемы.
+    """
+    return Response(orjson.dumps(rows), media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def models_response(
+    adapter: TypeAdapter, items: Sequence[Any], headers: Mapping[str, str] | None = None
+) -> Response:
+    """Готовые pydantic-модели в JSON за один вызов TypeAdapter.dump_json (Rust, без валидации)"""
+    return Response(adapter.dump_json(items), media_type=JSON_MEDIA_TYPE, headers=headers)
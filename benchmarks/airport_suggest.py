@@ -0,0 +1,83 @@
+"""
+🔎 Бенчмарк автодополнения аэропортов (AirportSuggestIndex)
+
+50k аэропортов с русскими и латинскими названиями. Печатает время
+построения индекса, p50/p99 запроса для префиксов длиной 1-6 символов
+и сверку с линейным перебором справочника.
+
+    python -m benchmarks.airport_suggest [airports] [queries]
+"""
+import random
+import sys
+import time
+
+from benchmarks.common import percentile, use_temp_database
+
+use_temp_database("airport_suggest")
+
+from app.schemes.flights import AirportRead  # noqa: E402
+from app.services.airport_cache import airport_cache  # noqa: E402
+from app.services.airport_suggest import FIELDS, WORD, airport_suggest, normalize  # noqa: E402
+
+SYLLABLES = ["мос", "ква", "пул", "ко", "во", "ше", "ре", "меть", "ёл", "ка", "но", "во", "си", "бир",
+             "ска", "ла", "ки", "ев", "ber", "lin", "pa", "ris", "lon", "don", "sa", "mar", "ро", "стов"]
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choices(SYLLABLES, k=rng.randrange(2, 5))).capitalize()
+
+
+def brute_force(prefix: str) -> set[int]:
+    """Все аэропорты, у которых код, город или слово названия начинается с prefix"""
+    prefix = normalize(prefix)
+    found = set()
+    for airport in airport_cache.all():
+        for field in FIELDS:
+            value = normalize(getattr(airport, field))
+            if any(value[match.start():].startswith(prefix) for match in WORD.finditer(value)):
+                found.add(airport.id)
+    return found
+
+
+def main(airports: int, queries: int) -> int:
+    rng = random.Random(20)
+    for i in range(1, airports + 1):
+        airport_cache.put(AirportRead(
+            id=i,
+            code=f"{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i // 676 % 26)}",
+            name=f"{word(rng)} {rng.choice(['', 'Международный ', 'Аэропорт '])}{word(rng)}".strip(),
+            city=word(rng),
+            country="Bench",
+        ))
+    start = time.perf_counter()
+    airport_suggest.build()
+    built = (time.perf_counter() - start) * 1000
+    print(f"▶ {airports:,} аэропортов, {airport_suggest.stats()['keys']:,} ключей: построение индекса {built:.0f} мс")
+
+    names = [a.name for a in airport_cache.all()] + [a.city for a in airport_cache.all()]
+    print("\n▶ запрос (limit=10), мс")
+    slow = False
+    for length in range(1, 7):
+        prefixes = [rng.choice(names)[:length] for _ in range(queries)]
+        prefixes = [p.upper() if rng.random() < 0.3 else p for p in prefixes]
+        latencies = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            airport_suggest.suggest(prefix)
+            latencies.append((time.perf_counter() - start) * 1000)
+        slow = slow or percentile(latencies, 99) >= 1
+        print(f"   префикс {length}: p50 {percentile(latencies, 50):.4f}, p99 {percentile(latencies, 99):.4f}")
+
+    samples = [rng.choice(names)[:rng.randrange(2, 6)] for _ in range(30)] + ["мосК", "ЁЛ", "ел", "пулково ше"]
+    ok = all(
+        {a.id for a in airport_suggest.suggest(prefix, limit=airports)} == brute_force(prefix)
+        for prefix in samples
+    )
+    print(f"\n▶ сверка с перебором ({len(samples)} префиксов): {'✅' if ok else '❌'}")
+    print(f"   p99 < 1 мс: {'✅' if not slow else '❌'}")
+    return 0 if ok and not slow else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(main(*(args + [50_000, 2000][len(args):])))
@@ -0,0 +1,75 @@
+"""
+🎟️ Микробенчмарк накладных расходов авторизации на запрос
+
+1. Чистое декодирование: AuthService.decode_token против decode_token_cached.
+2. Полный путь FastAPI: ручка, зависящая только от текущего пользователя,
+   со старой sync-зависимостью (decode на каждый запрос, threadpool)
+   и с новой get_current_user_id.
+
+    python -m benchmarks.auth_dependency [iterations]
+"""
+import asyncio
+import sys
+import timeit
+
+from benchmarks.common import use_temp_database
+
+use_temp_database("auth_dependency")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+
+from app.api.dependencies import get_current_user_id, get_token  # noqa: E402
+from app.services.auth import AuthService  # noqa: E402
+
+TOKEN = AuthService.create_access_token({"user_id": 1, "role": "user"})
+
+
+def legacy_get_current_user_id(token: str = Depends(get_token)) -> int:
+    return AuthService.decode_token(token)["user_id"]
+
+
+def make_app(dependency) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(user_id: int = Depends(dependency)) -> dict:
+        return {"user_id": user_id}
+
+    return app
+
+
+async def per_request(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", cookies={"access_token": TOKEN}
+    ) as client:
+        for _ in range(50):
+            await client.get("/whoami")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(requests):
+            await client.get("/whoami")
+        return (loop.time() - start) / requests * 1e6
+
+
+def main(iterations: int) -> None:
+    print("▶ декодирование токена (мкс на вызов)")
+    for name, func in (
+        ("decode_token", lambda: AuthService.decode_token(TOKEN)),
+        ("decode_token_cached", lambda: AuthService.decode_token_cached(TOKEN)),
+    ):
+        seconds = min(timeit.repeat(func, number=iterations, repeat=5))
+        print(f"   {name:<22} {seconds / iterations * 1e6:8.2f}")
+
+    requests = max(1000, iterations // 20)
+    print(f"\n▶ полный запрос через FastAPI (мкс на запрос, {requests} запросов)")
+    for name, dependency in (
+        ("старая sync-зависимость", legacy_get_current_user_id),
+        ("get_current_user_id", get_current_user_id),
+    ):
+        print(f"   {name:<22} {asyncio.run(per_request(make_app(dependency), requests)):8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
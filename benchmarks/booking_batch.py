@@ -0,0 +1,121 @@
+"""
+📦 Бенчмарк: 1000 бронирований пакетом против отдельных POST /bookings/
+
+Брони раскладываются по нескольким рейсам. Сравниваются:
+  - 1000 отдельных POST /bookings/;
+  - POST /bookings/batch пачками по 100 и одним запросом на 1000 позиций.
+
+    python -m benchmarks.booking_batch [bookings] [flights]
+"""
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from benchmarks.common import stopwatch, use_temp_database
+
+use_temp_database("booking_batch")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database.database import async_session_maker, engine, read_engine  # noqa: E402
+from app.models.flight import FlightModel  # noqa: E402
+from main import app  # noqa: E402
+
+
+class Counters:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+    def on_statement(self, *args) -> None:
+        self.statements += 1
+
+    def on_commit(self, *args) -> None:
+        self.commits += 1
+
+
+async def seed_flights(count: int) -> list[int]:
+    async with async_session_maker() as session:
+        flights = [
+            FlightModel(
+                flight_number=f"BATCH-{datetime.now().timestamp()}-{i}",
+                airline="Bench",
+                departure_airport_id=1,
+                arrival_airport_id=2,
+                departure_time=datetime(2030, 1, 1, 10),
+                arrival_time=datetime(2030, 1, 1, 12),
+                total_seats=1_000_000,
+                available_seats=1_000_000,
+                price=1000.0,
+            )
+            for i in range(count)
+        ]
+        session.add_all(flights)
+        await session.commit()
+        return [flight.id for flight in flights]
+
+
+def make_items(bookings: int, flight_ids: list[int]) -> list[dict]:
+    return [
+        {
+            "flight_id": flight_ids[i % len(flight_ids)],
+            "passenger_name": f"Passenger {i}",
+            "passenger_email": f"p{i}@example.com",
+            "passenger_phone": "+70000000000",
+            "seats_count": 1 + i % 3,
+        }
+        for i in range(bookings)
+    ]
+
+
+async def individual(client: httpx.AsyncClient, items: list[dict]) -> int:
+    created = 0
+    for item in items:
+        response = await client.post("/bookings/", json=item)
+        created += response.status_code == 201
+    return created
+
+
+async def batched(client: httpx.AsyncClient, items: list[dict], size: int) -> int:
+    created = 0
+    for start in range(0, len(items), size):
+        response = await client.post(
+            "/bookings/batch", json={"items": items[start:start + size]}
+        )
+        created += response.json()["created"]
+    return created
+
+
+async def main(bookings: int, flights: int) -> None:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await app.router.startup()
+    counters = Counters()
+    for bench_engine in (engine, read_engine):
+        event.listen(bench_engine.sync_engine, "before_cursor_execute", counters.on_statement)
+        event.listen(bench_engine.sync_engine, "commit", counters.on_commit)
+
+    scenarios = [
+        (f"{bookings} отдельных POST /bookings/", lambda c, items: individual(c, items)),
+        ("POST /bookings/batch по 100", lambda c, items: batched(c, items, 100)),
+        (f"POST /bookings/batch, {bookings} за раз", lambda c, items: batched(c, items, bookings)),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, scenario in scenarios:
+            items = make_items(bookings, await seed_flights(flights))
+            counters.statements = counters.commits = 0
+            with stopwatch() as elapsed:
+                created = await scenario(client, items)
+            print(f"▶ {name}")
+            print(f"   создано: {created}, время: {elapsed():.3f} c ({created / elapsed():.0f} брон./c), "
+                  f"SQL: {counters.statements}, COMMIT: {counters.commits}")
+    await app.router.shutdown()
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [1000, 5][len(args):])))
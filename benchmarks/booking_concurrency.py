@@ -0,0 +1,146 @@
+"""
+🏁 Бенчмарк конкурентного бронирования одного рейса
+
+Запускает сотни параллельных бронирований на один рейс и сравнивает
+старый путь (чтение мест -> вставка -> commit -> UPDATE посчитанного значения)
+с атомарным условным UPDATE. Проверяет, что мест не продано больше, чем есть.
+
+    python -m benchmarks.booking_concurrency [requests] [seats]
+"""
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from benchmarks.common import create_schema, stopwatch, use_temp_database
+
+use_temp_database("booking_concurrency")
+
+from sqlalchemy import func, select, update  # noqa: E402
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.booking import BookingModel, BookingStatus  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.repositories.booking_repository import BookingRepository  # noqa: E402
+from app.repositories.flight_repository import FlightRepository  # noqa: E402
+from app.schemes.bookings import BookingCreate  # noqa: E402
+from app.services.booking_service import BookingService  # noqa: E402
+from app.services.id_generator import id_generator  # noqa: E402
+
+
+async def seed_flight(seats: int) -> int:
+    async with async_session_maker() as session:
+        if not (await session.execute(select(AirportModel.id))).first():
+            session.add_all([
+                AirportModel(code="MOW", name="Шереметьево", city="Москва", country="Россия"),
+                AirportModel(code="SPB", name="Пулково", city="Санкт-Петербург", country="Россия"),
+            ])
+            # Бронирования создаются от user_id=1, внешние ключи включены
+            role = RoleModel(name="user")
+            session.add(role)
+            await session.flush()
+            session.add(UserModel(name="bench", email="bench@example.com",
+                                  hashed_password="-", role_id=role.id))
+            await session.flush()
+        flight = FlightModel(
+            flight_number=f"BN-{datetime.now().timestamp()}",
+            airline="Bench",
+            departure_airport_id=1,
+            arrival_airport_id=2,
+            departure_time=datetime(2030, 1, 1, 10, 0),
+            arrival_time=datetime(2030, 1, 1, 12, 0),
+            total_seats=seats,
+            available_seats=seats,
+            price=1000.0,
+        )
+        session.add(flight)
+        await session.commit()
+        return flight.id
+
+
+def booking_request(flight_id: int) -> BookingCreate:
+    return BookingCreate(
+        flight_id=flight_id,
+        passenger_name="Bench Passenger",
+        passenger_email="bench@example.com",
+        passenger_phone="+70000000000",
+        seats_count=1,
+    )
+
+
+async def legacy_create_booking(flight_id: int) -> None:
+    """Прежний алгоритм: значение мест считается в Python после чтения"""
+    async with async_session_maker() as session:
+        booking_data = booking_request(flight_id)
+        flight_repo = FlightRepository(session)
+        flight = await flight_repo.get_flight_by_id(flight_id)
+        if flight.available_seats < booking_data.seats_count:
+            raise ValueError("Not enough available seats")
+        await BookingRepository(session).create_booking({
+            "user_id": 1,
+            "flight_id": flight_id,
+            "booking_number": id_generator.booking_number(),
+            "passenger_name": booking_data.passenger_name,
+            "passenger_email": booking_data.passenger_email,
+            "passenger_phone": booking_data.passenger_phone,
+            "seats_count": booking_data.seats_count,
+            "total_price": flight.price * booking_data.seats_count,
+            "status": BookingStatus.PENDING,
+        })
+        # Раньше репозиторий коммитил вставку сам, до обновления мест
+        await session.commit()
+        await session.execute(
+            update(FlightModel)
+            .where(FlightModel.id == flight_id)
+            .values(available_seats=flight.available_seats - booking_data.seats_count)
+        )
+        await session.commit()
+
+
+async def atomic_create_booking(flight_id: int) -> None:
+    async with DBManager(session_factory=async_session_maker) as db:
+        await BookingService(db).create_booking(1, booking_request(flight_id))
+
+
+async def run(name: str, create, requests: int, seats: int) -> None:
+    flight_id = await seed_flight(seats)
+
+    with stopwatch() as elapsed:
+        results = await asyncio.gather(
+            *(create(flight_id) for _ in range(requests)), return_exceptions=True
+        )
+    errors = [r for r in results if isinstance(r, Exception)]
+
+    async with async_session_maker() as session:
+        booked = (await session.execute(
+            select(func.coalesce(func.sum(BookingModel.seats_count), 0))
+            .where(BookingModel.flight_id == flight_id)
+        )).scalar_one()
+        available = (await session.execute(
+            select(FlightModel.available_seats).where(FlightModel.id == flight_id)
+        )).scalar_one()
+
+    ok = requests - len(errors)
+    print(f"\n▶ {name}")
+    print(f"   запросов: {requests}, мест: {seats}, успешно: {ok}, ошибок: {len(errors)}")
+    print(f"   продано мест: {booked}, осталось по счетчику: {available}")
+    print(f"   перепродажа: {'ДА ❌' if booked > seats or booked + available != seats else 'нет ✅'}")
+    print(f"   время: {elapsed():.3f} c, обработано: {requests / elapsed():.1f} запр./c, "
+          f"успешных: {ok / elapsed():.1f} брон./c")
+
+
+async def main(requests: int, seats: int) -> None:
+    # Ожидаемые отказы "нет мест" не должны засорять вывод
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    await run("read-then-write (старый путь)", legacy_create_booking, requests, seats)
+    await run("условный UPDATE (новый путь)", atomic_create_booking, requests, seats)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [400, 150][len(args):])))
@@ -0,0 +1,52 @@
+"""
+📊 Общие помощники для бенчмарков
+
+Каждый бенчмарк работает на временной SQLite-базе: use_temp_database()
+нужно вызвать ДО импорта модулей app, потому что settings читаются при импорте.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def use_temp_database(prefix: str = "bench") -> str:
+    """Направляет приложение на свежий файл БД во временной папке"""
+    directory = tempfile.mkdtemp(prefix=f"{prefix}_")
+    path = os.path.join(directory, "bench.db")
+    os.environ["DB_NAME"] = path
+    return path
+
+
+async def create_schema(engine) -> None:
+    """Создает все таблицы по метаданным моделей"""
+    from app.database.base import Base
+    from app.database.database import register_models
+
+    register_models()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу (values не обязаны быть отсортированы)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def stopwatch():
+    """with stopwatch() as t: ...; t() — прошедшее время в секундах"""
+    start = time.perf_counter()
+    end = None
+
+    def elapsed() -> float:
+        return (end if end is not None else time.perf_counter()) - start
+
+    try:
+        yield elapsed
+    finally:
+        end = time.perf_counter()
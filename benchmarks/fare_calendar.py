@@ -0,0 +1,155 @@
+"""
+📅 Бенчмарк календаря низких цен (FareCalendar)
+
+1000 маршрутов x 365 дней (по рейсу на маршрут в день, у части маршрутов -
+по два). Печатает:
+  - время построения агрегатов;
+  - месяц по маршруту: "до" - запрос search_flights на каждый день,
+    "после" - месяц из готового календаря;
+  - сверку с GROUP BY по БД на случайных маршрутах;
+  - время точечного пересчета после изменения рейса.
+
+    python -m benchmarks.fare_calendar [routes] [days]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+use_temp_database("fare_calendar")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.services.fare_calendar import fare_calendar  # noqa: E402
+from app.services.flight_availability import FLIGHT_FIELDS, flight_availability  # noqa: E402
+
+AIRPORTS = 50
+START = datetime(2030, 1, 1)
+
+
+async def seed(routes: list[tuple[int, int]], days: int) -> int:
+    rng = random.Random(19)
+    async with async_session_maker() as session:
+        await session.execute(insert(AirportModel), [
+            {"code": f"{i:03d}", "name": f"Airport {i}", "city": f"City {i}", "country": "Bench"}
+            for i in range(AIRPORTS)
+        ])
+        rows = []
+        for departure, arrival in routes:
+            for day in range(days):
+                for _ in range(1 + (rng.random() < 0.3)):
+                    departure_time = START + timedelta(days=day, minutes=rng.randrange(24 * 60))
+                    rows.append({
+                        "flight_number": f"BN-{len(rows)}", "airline": "Bench",
+                        "departure_airport_id": departure, "arrival_airport_id": arrival,
+                        "departure_time": departure_time, "arrival_time": departure_time + timedelta(hours=2),
+                        "total_seats": 180, "available_seats": rng.choice([0, 12, 180]),
+                        "price": float(rng.randrange(3000, 30000)),
+                    })
+        await session.execute(insert(FlightModel), rows)
+        await session.commit()
+        return len(rows)
+
+
+async def month_from_db(session, departure: int, arrival: int, first: datetime) -> dict:
+    """Как раньше: по запросу поиска рейсов на каждый день месяца"""
+    result = {}
+    day = first
+    while day.month == first.month:
+        flights = (await session.execute(
+            select(FlightModel).where(
+                FlightModel.departure_airport_id == departure,
+                FlightModel.arrival_airport_id == arrival,
+                FlightModel.departure_time >= day,
+                FlightModel.departure_time < day + timedelta(days=1),
+            )
+        )).scalars().all()
+        prices = [f.price for f in flights if f.available_seats > 0]
+        result[day.date()] = (min(prices) if prices else None, sum(f.available_seats for f in flights), len(flights))
+        day += timedelta(days=1)
+    return result
+
+
+async def check_consistency(routes: list[tuple[int, int]]) -> bool:
+    day = func.date(FlightModel.departure_time)
+    ok = True
+    async with async_session_maker() as session:
+        for departure, arrival in routes:
+            rows = await session.execute(
+                select(
+                    day,
+                    func.min(FlightModel.price).filter(FlightModel.available_seats > 0),
+                    func.sum(FlightModel.available_seats),
+                    func.count(),
+                )
+                .where(FlightModel.departure_airport_id == departure, FlightModel.arrival_airport_id == arrival)
+                .group_by(day)
+            )
+            expected = {datetime.fromisoformat(d).date(): (p, s, n) for d, p, s, n in rows}
+            cells = fare_calendar._days.get((departure, arrival), {})
+            actual = {d: (f.min_price, f.available_seats, f.flights) for d, f in cells.items()}
+            ok = ok and actual == expected
+    return ok
+
+
+async def main(route_count: int, days: int) -> int:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    pairs = [(a, b) for a in range(1, AIRPORTS + 1) for b in range(1, AIRPORTS + 1) if a != b]
+    routes = random.Random(1).sample(pairs, route_count)
+    flights = await seed(routes, days)
+
+    async with async_session_maker() as session:
+        await flight_availability.load(session)
+    start = time.perf_counter()
+    fare_calendar.build()
+    built = (time.perf_counter() - start) * 1000
+    print(f"▶ {route_count} маршрутов x {days} дней = {flights:,} рейсов; построение календаря {built:.0f} мс")
+
+    rng = random.Random(2)
+    samples = [(rng.choice(routes), START + timedelta(days=31 * rng.randrange(days // 31))) for _ in range(20)]
+    db_ms, calendar_ms = [], []
+    async with async_session_maker() as session:
+        for (departure, arrival), first in samples:
+            first = first.replace(day=1)
+            start = time.perf_counter()
+            await month_from_db(session, departure, arrival, first)
+            db_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            fare_calendar.month(departure, arrival, first.year, first.month)
+            calendar_ms.append((time.perf_counter() - start) * 1000)
+    print("\n▶ месяц по маршруту, мс")
+    print(f"   запрос на каждый день:  p50 {percentile(db_ms, 50):8.2f}, p99 {percentile(db_ms, 99):8.2f}")
+    print(f"   календарь в памяти:     p50 {percentile(calendar_ms, 50):8.3f}, p99 {percentile(calendar_ms, 99):8.3f}")
+
+    ok = await check_consistency(routes[:50])
+    print(f"\n▶ календарь = GROUP BY по БД (50 маршрутов): {'✅' if ok else '❌'}")
+
+    # Точечный пересчет: рейс подешевел, затем на нем проданы все места
+    flight = next(f for f in flight_availability.flights() if f.available_seats > 0)
+    cell = flight.departure_airport_id, flight.arrival_airport_id, flight.departure_time.year, flight.departure_time.month
+    start = time.perf_counter()
+    flight_availability.put_flight(SimpleNamespace(**{name: getattr(flight, name) for name in FLIGHT_FIELDS} | {"price": 1.0}))
+    put_ms = (time.perf_counter() - start) * 1000
+    cheaper = dict(fare_calendar.month(*cell))[flight.departure_date].min_price == 1.0
+    start = time.perf_counter()
+    flight_availability.apply(flight.id, available=-flight.available_seats)
+    seats_ms = (time.perf_counter() - start) * 1000
+    sold_out = dict(fare_calendar.month(*cell))[flight.departure_date].min_price != 1.0
+    updated = cheaper and sold_out
+    print(f"\n▶ изменение рейса: {put_ms:.3f} мс, продажа мест: {seats_ms:.3f} мс, "
+          f"календарь обновился: {'✅' if updated else '❌'}, перестроений: {fare_calendar.builds}")
+    await engine.dispose()
+    return 0 if ok and updated else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(asyncio.run(main(*(args + [1000, 365][len(args):]))))
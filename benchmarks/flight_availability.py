@@ -0,0 +1,254 @@
+"""
+📋 Бенчмарк read-модели рейсов (FlightAvailabilityView)
+
+1. Время ответа списка и поиска (мс на вызов, без HTTP):
+   - до:    запрос в БД + сборка FlightListRead по кэшу аэропортов
+   - после: страница/поиск из read-модели в памяти
+2. Согласованность: после случайной смеси броней, подтверждений, отмен,
+   удалений и снятия просроченных броней счетчики модели совпадают
+   с пересчетом по БД.
+3. Сверка с изменениями другого процесса: полная перезагрузка load()
+   против refresh() - перечитываются только рейсы с новым updated_at.
+
+    python -m benchmarks.flight_availability [flights] [operations]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import create_schema, use_temp_database
+
+use_temp_database("flight_availability")
+
+from sqlalchemy import delete, insert, select, tuple_, update  # noqa: E402
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.booking import BookingModel  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.repositories.flight_repository import FlightRepository  # noqa: E402
+from app.schemes.bookings import BookingCreate  # noqa: E402
+from app.schemes.flights import FlightListRead  # noqa: E402
+from app.services.airport_cache import airport_cache  # noqa: E402
+from app.services.booking_service import BookingService  # noqa: E402
+from app.services.flight_availability import flight_availability  # noqa: E402
+
+AIRPORTS = 20
+START = datetime(2030, 1, 1)
+
+
+async def seed(flights: int) -> None:
+    rng = random.Random(7)
+    async with async_session_maker() as session:
+        session.add_all(
+            AirportModel(code=f"A{i:02d}", name=f"Airport {i}", city=f"City {i}", country="Bench")
+            for i in range(AIRPORTS)
+        )
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        session.add(UserModel(name="bench", email="bench@example.com", hashed_password="-", role_id=role.id))
+        rows = []
+        # Рейсы "давно не менялись" - иначе первая сверка перечитает их все
+        updated_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)
+        for i in range(flights):
+            departure, arrival = rng.sample(range(1, AIRPORTS + 1), 2)
+            departure_time = START + timedelta(minutes=rng.randrange(365 * 24 * 60))
+            rows.append({
+                "flight_number": f"BN-{i}", "airline": "Bench",
+                "departure_airport_id": departure, "arrival_airport_id": arrival,
+                "departure_time": departure_time, "arrival_time": departure_time + timedelta(hours=2),
+                "total_seats": 180, "available_seats": 180, "price": float(rng.randrange(3000, 30000)),
+                "updated_at": updated_at,
+            })
+        await session.execute(insert(FlightModel), rows)
+        await session.commit()
+
+
+async def page_in_db(session, limit, after=None):
+    """Страница, как раньше в FlightRepository: keyset-запрос по (departure_time, id)"""
+    query = select(FlightModel).order_by(FlightModel.departure_time, FlightModel.id)
+    if after is not None:
+        query = query.where(tuple_(FlightModel.departure_time, FlightModel.id) > tuple_(*after))
+    return (await session.execute(query.limit(limit))).scalars().all()
+
+
+async def search_in_db(session, departure_airport_id=None, arrival_airport_id=None, departure_date=None):
+    """Поиск, как раньше в FlightRepository: запрос в БД с полуинтервалом по дню вылета"""
+    query = select(FlightModel)
+    if departure_airport_id:
+        query = query.where(FlightModel.departure_airport_id == departure_airport_id)
+    if arrival_airport_id:
+        query = query.where(FlightModel.arrival_airport_id == arrival_airport_id)
+    if departure_date:
+        day_start = datetime.combine(departure_date, datetime.min.time())
+        query = query.where(
+            FlightModel.departure_time >= day_start,
+            FlightModel.departure_time < day_start + timedelta(days=1),
+        )
+    return (await session.execute(query)).scalars().all()
+
+
+def to_list_read(flights) -> list[FlightListRead]:
+    """Сборка ответа как раньше в FlightService: по строке из БД и кэшу аэропортов"""
+    return [
+        FlightListRead(
+            id=f.id, flight_number=f.flight_number, airline=f.airline,
+            departure_airport=airport_cache.get_by_id(f.departure_airport_id),
+            arrival_airport=airport_cache.get_by_id(f.arrival_airport_id),
+            departure_time=f.departure_time, arrival_time=f.arrival_time,
+            available_seats=f.available_seats, price=f.price,
+        )
+        for f in flights
+    ]
+
+
+async def timed(func, repeat: int = 50) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def compare_reads() -> None:
+    async with async_session_maker() as session:
+        await airport_cache.load(session)
+        start = time.perf_counter()
+        await flight_availability.load(session)
+        print(f"   загрузка модели: {(time.perf_counter() - start) * 1000:.0f} мс")
+        deep = flight_availability._order[len(flight_availability._order) // 2]
+        day = (START + timedelta(days=100)).date()
+
+        cases = [
+            ("страница 100, начало",
+             lambda: page_in_db(session, 100),
+             lambda: flight_availability.page(100)),
+            ("страница 100, середина",
+             lambda: page_in_db(session, 100, deep),
+             lambda: flight_availability.page(100, deep)),
+            ("поиск: аэропорт + дата",
+             lambda: search_in_db(session, departure_airport_id=1, departure_date=day),
+             lambda: flight_availability.search(departure_airport_id=1, departure_date=day)),
+            ("поиск: маршрут",
+             lambda: search_in_db(session, departure_airport_id=1, arrival_airport_id=2),
+             lambda: flight_availability.search(departure_airport_id=1, arrival_airport_id=2)),
+        ]
+        print(f"\n   {'':<26} {'БД, мс':>9} {'модель, мс':>11}")
+        for name, db_query, view_query in cases:
+            async def before():
+                return to_list_read(await db_query())
+
+            async def after():
+                return view_query()
+
+            db_ms = await timed(before)
+            view_ms = await timed(after)
+            print(f"   {name:<26} {db_ms:9.3f} {view_ms:11.3f}")
+
+
+async def random_operations(count: int) -> None:
+    rng = random.Random(11)
+    booking_ids: list[int] = []
+    for _ in range(count):
+        action = rng.random()
+        async with DBManager(session_factory=async_session_maker) as db:
+            service = BookingService(db)
+            try:
+                if action < 0.5 or not booking_ids:
+                    booking = await service.create_booking(1, BookingCreate(
+                        flight_id=rng.randrange(1, 50), passenger_name="Bench",
+                        passenger_email="bench@example.com", passenger_phone="+70000000000",
+                        seats_count=rng.randrange(1, 4),
+                    ))
+                    booking_ids.append(booking.id)
+                elif action < 0.7:
+                    await service.confirm_booking(rng.choice(booking_ids))
+                elif action < 0.85:
+                    await service.cancel_booking(rng.choice(booking_ids))
+                elif action < 0.95:
+                    booking_id = rng.choice(booking_ids)
+                    await service.delete_booking(booking_id)
+                    booking_ids.remove(booking_id)
+                else:
+                    # Все PENDING созданы раньше "завтра" - снимаются
+                    await service.expire_holds(datetime.now() + timedelta(days=1), 50)
+            except ValueError:
+                pass
+
+
+async def check_consistency() -> bool:
+    async with async_session_maker() as session:
+        rows = await FlightRepository(session).get_availability_rows()
+    mismatched = 0
+    for row in rows:
+        flight = flight_availability.get(row["id"])
+        actual = (flight.available_seats, flight.pending_seats, flight.confirmed_seats)
+        if actual != (row["available_seats"], row["pending_seats"], row["confirmed_seats"]):
+            mismatched += 1
+    return mismatched == 0
+
+
+async def compare_refresh(flights: int, changes: int) -> bool:
+    """Другой процесс меняет цены части рейсов и удаляет рейс без броней"""
+    rng = random.Random(11)
+    changed = rng.sample(range(1, flights + 1), changes)
+    async with async_session_maker() as session:
+        for flight_id in changed:
+            await session.execute(
+                update(FlightModel).where(FlightModel.id == flight_id).values(price=FlightModel.price + 1)
+            )
+        removed = await session.scalar(
+            select(FlightModel.id)
+            .where(~select(BookingModel.id).where(BookingModel.flight_id == FlightModel.id).exists())
+            .limit(1)
+        )
+        await session.execute(delete(FlightModel).where(FlightModel.id == removed))
+        await session.commit()
+        prices = dict((await session.execute(
+            select(FlightModel.id, FlightModel.price).where(FlightModel.id.in_(changed))
+        )).all())
+
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        reread = await flight_availability.refresh(session)
+        refresh_ms = (time.perf_counter() - started) * 1000
+    ok = (
+        flight_availability.get(removed) is None
+        and all(flight_availability.get(flight_id).price == price for flight_id, price in prices.items())
+        and await check_consistency()
+    )
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        await flight_availability.load(session)
+        load_ms = (time.perf_counter() - started) * 1000
+    print(f"\n▶ сверка после {changes} чужих изменений и удаления рейса")
+    print(f"   load():    {load_ms:9.1f} мс (все рейсы)")
+    print(f"   refresh(): {refresh_ms:9.1f} мс ({reread} рейсов перечитано)")
+    print(f"   модель = пересчет по БД: {'✅' if ok else '❌'}")
+    return ok
+
+
+async def main(flights: int, operations: int) -> int:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    await seed(flights)
+    print(f"▶ {flights:,} рейсов, {AIRPORTS} аэропортов")
+    await compare_reads()
+
+    print(f"\n▶ согласованность после {operations} операций с бронями")
+    await random_operations(operations)
+    ok = await check_consistency()
+    print(f"   модель = пересчет по БД: {'✅' if ok else '❌'}")
+    ok = await compare_refresh(flights, min(500, flights // 10)) and ok
+    await engine.dispose()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(asyncio.run(main(*(args + [50_000, 2000][len(args):]))))
@@ -0,0 +1,102 @@
+"""
+🧠 Бенчмарк памяти для GET /flights/
+
+Сравнивает пиковое потребление памяти (tracemalloc) при:
+  - загрузке всех рейсов одним запросом + валидации в FlightListRead (старый путь)
+  - одной keyset-странице FlightService.get_flights_page()
+  - полном проходе потоком stream_flights() (NDJSON-режим)
+
+    python -m benchmarks.flights_listing_memory [flights ...]
+"""
+import asyncio
+import sqlite3
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_schema, stopwatch, use_temp_database
+
+DB_PATH = use_temp_database("flights_listing_memory")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.models.flight import FlightModel  # noqa: E402
+from app.schemes.flights import FlightListRead  # noqa: E402
+from app.services.flight_service import FlightService  # noqa: E402
+
+
+def seed(total: int) -> None:
+    conn = sqlite3.connect(DB_PATH)
+    if not conn.execute("SELECT COUNT(*) FROM airports").fetchone()[0]:
+        conn.executemany(
+            "INSERT INTO airports (id, code, name, city, country) VALUES (?, ?, ?, ?, ?)",
+            [(i, f"A{i:02d}", f"Airport {i}", f"City {i}", "Россия") for i in range(1, 21)],
+        )
+    have = conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+    start = datetime(2030, 1, 1)
+    conn.executemany(
+        "INSERT INTO flights (flight_number, airline, departure_airport_id, arrival_airport_id,"
+        " departure_time, arrival_time, total_seats, available_seats, price)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (f"BN-{i}", "Bench", i % 20 + 1, (i + 1) % 20 + 1,
+             str(start + timedelta(minutes=i)), str(start + timedelta(minutes=i + 120)),
+             180, 180, 1000.0)
+            for i in range(have, total)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def load_all() -> int:
+    """Старый путь: select(FlightModel) без LIMIT вместе с аэропортами"""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(FlightModel).options(
+                joinedload(FlightModel.departure_airport), joinedload(FlightModel.arrival_airport)
+            )
+        )
+        flights = result.scalars().all()
+        return len([FlightListRead.model_validate(f) for f in flights])
+
+
+async def load_page() -> int:
+    async with async_session_maker() as session:
+        flights, _ = await FlightService(session).get_flights_page(100)
+        return len([FlightListRead.model_validate(f) for f in flights])
+
+
+async def stream_all() -> int:
+    count = 0
+    async with async_session_maker() as session:
+        async for flight in FlightService(session).stream_flights():
+            FlightListRead.model_validate(flight).model_dump_json()
+            count += 1
+    return count
+
+
+async def measure(name: str, func) -> None:
+    tracemalloc.start()
+    with stopwatch() as elapsed:
+        rows = await func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {name:<28} строк: {rows:>7}  пик памяти: {peak / 2**20:8.1f} МБ  время: {elapsed():.2f} c")
+
+
+async def main(sizes: list[int]) -> None:
+    await create_schema(engine)
+    for total in sizes:
+        seed(total)
+        print(f"\n▶ рейсов в таблице: {total}")
+        await measure("все рейсы (старый)", load_all)
+        await measure("keyset-страница, limit=100", load_page)
+        await measure("поток NDJSON", stream_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(a) for a in sys.argv[1:]] or [10_000, 50_000]))
@@ -0,0 +1,163 @@
+"""
+⏳ Бенчмарк снятия просроченных броней мест
+
+В БД N просроченных PENDING-броней (со строками flight_seats) на 100 рейсах.
+HoldSweeper снимает их, а параллельно идет поток новых броней
+(BookingService.create_booking). Сравнение:
+  - одна транзакция на все брони (batch_size = N)
+  - пачки по HOLD_SWEEP_BATCH_SIZE без паузы и с HOLD_SWEEP_BATCH_PAUSE_SECONDS
+Печатает время снятия, самую долгую транзакцию и p50/p99/max задержки новых броней.
+
+    python -m benchmarks.hold_sweeper [bookings]
+"""
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+use_temp_database("hold_sweeper")
+
+from sqlalchemy import delete, func, insert, select, update  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.booking import BookingModel, BookingStatus  # noqa: E402
+from app.models.flight import AirportModel, FlightModel, FlightSeatModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.schemes.bookings import BookingCreate  # noqa: E402
+from app.services.booking_service import BookingService  # noqa: E402
+from app.services.hold_sweeper import HoldSweeper  # noqa: E402
+from app.services.id_generator import id_generator  # noqa: E402
+from app.services.seat_inventory import seat_inventory  # noqa: E402
+
+FLIGHTS = 100
+SEATS = 300
+TTL = 15 * 60
+
+
+async def seed() -> None:
+    async with async_session_maker() as session:
+        session.add_all([
+            AirportModel(code="MOW", name="Шереметьево", city="Москва", country="Россия"),
+            AirportModel(code="SPB", name="Пулково", city="Санкт-Петербург", country="Россия"),
+        ])
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        session.add(UserModel(name="bench", email="bench@example.com",
+                              hashed_password="-", role_id=role.id))
+        await session.execute(insert(FlightModel), [
+            {
+                "flight_number": f"BN-{i}", "airline": "Bench",
+                "departure_airport_id": 1, "arrival_airport_id": 2,
+                "departure_time": datetime(2030, 1, 1, 10), "arrival_time": datetime(2030, 1, 1, 12),
+                "total_seats": SEATS, "available_seats": SEATS, "price": 1000.0,
+            }
+            for i in range(FLIGHTS)
+        ])
+        await session.commit()
+
+
+async def add_stale_bookings(count: int) -> None:
+    """count броней по 2 места, созданных 2*TTL назад (места заняты)"""
+    stale_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=2 * TTL)
+    async with async_session_maker() as session:
+        await session.execute(delete(FlightSeatModel))
+        await session.execute(delete(BookingModel))
+        rows = [
+            {
+                "user_id": 1, "flight_id": i % FLIGHTS + 1,
+                "booking_number": id_generator.booking_number(),
+                "passenger_name": "Stale", "passenger_email": "stale@example.com",
+                "passenger_phone": "+70000000000", "seats_count": 2, "total_price": 2000.0,
+                "status": BookingStatus.PENDING, "created_at": stale_at,
+            }
+            for i in range(count)
+        ]
+        await session.execute(insert(BookingModel), rows)
+        ids = (await session.scalars(select(BookingModel.id).order_by(BookingModel.id))).all()
+        await session.execute(insert(FlightSeatModel), [
+            {"flight_id": i % FLIGHTS + 1, "seat_number": i // FLIGHTS * 2 + k + 1, "booking_id": booking_id}
+            for i, booking_id in enumerate(ids)
+            for k in range(2)
+        ])
+        per_flight = func.coalesce(
+            select(func.sum(BookingModel.seats_count))
+            .where(BookingModel.flight_id == FlightModel.id)
+            .scalar_subquery(),
+            0,
+        )
+        await session.execute(update(FlightModel).values(available_seats=SEATS - per_flight))
+        await session.commit()
+    seat_inventory.invalidate()
+
+
+async def book_loop(done: asyncio.Event, latencies: list[float]) -> None:
+    i = 0
+    while not done.is_set():
+        booking = BookingCreate(
+            flight_id=i % FLIGHTS + 1, passenger_name="New", passenger_email="new@example.com",
+            passenger_phone="+70000000000", seats_count=1,
+        )
+        start = time.perf_counter()
+        async with DBManager(session_factory=async_session_maker) as db:
+            try:
+                await BookingService(db).create_booking(1, booking)
+            except ValueError:
+                pass
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+
+
+async def run(name: str, count: int, batch_size: int, batch_pause: float = 0.0) -> None:
+    await add_stale_bookings(count)
+    sweeper = HoldSweeper(ttl=TTL, interval=3600, batch_size=batch_size, batch_pause=batch_pause)
+    latencies: list[float] = []
+    done = asyncio.Event()
+    writer = asyncio.create_task(book_loop(done, latencies))
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    expired = await sweeper.sweep_once()
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.2)
+    done.set()
+    await writer
+
+    async with async_session_maker() as session:
+        pending = await session.scalar(
+            select(func.count()).where(BookingModel.status == BookingStatus.PENDING,
+                                       BookingModel.passenger_name == "Stale")
+        )
+        free = await session.scalar(select(func.sum(FlightModel.available_seats)))
+        rows = await session.scalar(select(func.count()).select_from(FlightSeatModel))
+    print(f"\n▶ {name}")
+    print(f"   снято: {expired:,} броней за {elapsed * 1000:.0f} мс, "
+          f"самая долгая транзакция: {sweeper.max_batch_ms:.0f} мс, осталось PENDING: {pending}")
+    print(f"   новые брони: {len(latencies)}, p50: {percentile(latencies, 50):.1f} мс, "
+          f"p99: {percentile(latencies, 99):.1f} мс, max: {max(latencies):.1f} мс")
+    ok = free + rows == FLIGHTS * SEATS
+    print(f"   свободные места + занятые строки = вместимость: {'✅' if ok else '❌'}")
+
+
+async def main(count: int) -> None:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    await seed()
+    await run("одна транзакция", count, count)
+    await run(f"пачки по {settings.HOLD_SWEEP_BATCH_SIZE} без паузы", count, settings.HOLD_SWEEP_BATCH_SIZE)
+    await run(
+        f"пачки по {settings.HOLD_SWEEP_BATCH_SIZE}, пауза {settings.HOLD_SWEEP_BATCH_PAUSE_SECONDS * 1000:.0f} мс",
+        count,
+        settings.HOLD_SWEEP_BATCH_SIZE,
+        settings.HOLD_SWEEP_BATCH_PAUSE_SECONDS,
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
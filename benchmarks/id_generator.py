@@ -0,0 +1,97 @@
+"""
+🔢 Бенчмарк генератора номеров брони и ID транзакций
+
+1. Скорость: старый random.choices(digits, k=8) против IdGenerator.
+2. Коллизии на 10M идентификаторов:
+   - старый способ: считаем повторы битовой картой на 10**8 номеров;
+   - IdGenerator: значения внутри процесса должны строго возрастать
+     (значит, повторов нет), а у параллельных процессов различаться pid-полем.
+   Строковая кодировка проверяется на сохранение порядка.
+
+    python -m benchmarks.id_generator [count] [processes]
+"""
+import multiprocessing
+import random
+import string
+import sys
+import timeit
+
+from benchmarks.common import stopwatch
+
+from app.services.id_generator import (
+    PID_BITS,
+    SEQUENCE_BITS,
+    IdGenerator,
+    id_generator,
+)
+
+
+def legacy_booking_number() -> str:
+    return "BK" + "".join(random.choices(string.digits, k=8))
+
+
+def legacy_collisions(count: int) -> int:
+    seen = bytearray(10**8 // 8)
+    collisions = 0
+    for _ in range(count):
+        number = int(legacy_booking_number()[2:])
+        byte, bit = divmod(number, 8)
+        if seen[byte] >> bit & 1:
+            collisions += 1
+        else:
+            seen[byte] |= 1 << bit
+    return collisions
+
+
+def generate_checked(count: int) -> tuple[int, int, bool, bool]:
+    """(pid-поле, сколько сгенерировано, строго ли возрастали, сохранен ли порядок строк)"""
+    next_int = id_generator.next_int
+    previous = next_int()
+    previous_text = IdGenerator.encode(previous)
+    increasing = ordered = True
+    for i in range(1, count):
+        value = next_int()
+        if value <= previous:
+            increasing = False
+        if i % 1000 == 0:
+            text = IdGenerator.encode(value)
+            ordered = ordered and text > previous_text
+            previous_text = text
+        previous = value
+    pid_field = previous >> SEQUENCE_BITS & ((1 << PID_BITS) - 1)
+    return pid_field, count, increasing, ordered
+
+
+def main(count: int, processes: int) -> int:
+    print("▶ скорость генерации (мкс на номер)")
+    for name, func in (
+        ("random.choices (старый)", legacy_booking_number),
+        ("IdGenerator.booking_number", id_generator.booking_number),
+    ):
+        seconds = min(timeit.repeat(func, number=200_000, repeat=3))
+        print(f"   {name:<28} {seconds / 200_000 * 1e6:6.2f}  ({200_000 / seconds:,.0f}/c)")
+    print(f"   пример: {id_generator.booking_number()}, {id_generator.transaction_id()}")
+
+    print(f"\n▶ старый способ: {count:,} номеров")
+    with stopwatch() as elapsed:
+        collisions = legacy_collisions(count)
+    print(f"   повторов: {collisions:,} ({collisions / count:.2%}), {elapsed():.1f} c")
+
+    print(f"\n▶ IdGenerator: {count:,} номеров в {processes} процессах")
+    with stopwatch() as elapsed:
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            results = pool.map(generate_checked, [count // processes] * processes)
+    pids = {pid for pid, _, _, _ in results}
+    ok = all(increasing and ordered for _, _, increasing, ordered in results)
+    ok = ok and len(pids) == processes
+    generated = sum(n for _, n, _, _ in results)
+    print(f"   сгенерировано: {generated:,} за {elapsed():.1f} c, "
+          f"строго возрастают: {all(r[2] for r in results)}, "
+          f"порядок строк: {all(r[3] for r in results)}, разных pid-полей: {len(pids)}")
+    print(f"   повторов: {'0 ✅' if ok else 'возможны ❌'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(main(*(args + [10_000_000, 4][len(args):])))
@@ -0,0 +1,432 @@
+"""
+🏋️ Нагрузочный тест API бронирования (in-process, httpx + ASGITransport)
+
+Засевает временную БД синтетическими аэропортами, рейсами, пользователями
+и бронями заданного масштаба, стартует приложение и прогоняет смесь
+запросов (MIX) параллельными клиентами. Последовательность операций
+каждого клиента задается seed - прогоны воспроизводимы.
+
+Смесь: поиск (рейсы, маршруты, подсказки аэропортов, календарь цен),
+списки, карточка рейса, бронь, оплата, отмена, логин. Оплаты в HTTP API
+нет - она выполняется через PaymentService в том же процессе (платеж +
+подтверждение брони), как это сделал бы обработчик.
+
+Запись, не дождавшаяся блокировки SQLite, - это 503 от обработчика и
+ошибка прогона: ожидаемые статусы у записей ее не включают.
+
+По каждой операции: запросов, ошибок (неожиданный HTTP-статус), запр/с в
+общей смеси, p50/p95/p99 и среднее число SQL на запрос (из Server-Timing).
+Результат пишется в JSON (по умолчанию benchmarks/results/load_test_<commit>.json);
+--compare old.json печатает разницу с прошлым прогоном.
+
+    python -m benchmarks.load_test [--flights 30000] [--requests 5000] [--clients 20]
+                                   [--output path.json] [--compare old.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+use_temp_database("load_test")
+os.environ["SERVER_TIMING"] = "true"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.database.database import async_session_maker, engine, is_database_busy, read_engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.database.query_stats import RequestStats, current_request_stats  # noqa: E402
+from app.models.booking import BookingModel, BookingStatus  # noqa: E402
+from app.models.flight import AirportModel, FlightModel, FlightSeatModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.services.auth import AuthService  # noqa: E402
+from app.services.booking_service import PaymentService  # noqa: E402
+from app.services.hold_sweeper import hold_sweeper  # noqa: E402
+from main import app  # noqa: E402
+
+START = datetime(2030, 1, 1)
+DAYS = 30
+PASSWORD = "load-test-password"
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SERVER_TIMING_SQL = re.compile(r'desc="(\d+) queries')
+
+# операция: (вес в смеси, эндпоинт для отчета, ожидаемые HTTP-статусы)
+MIX = {
+    "search": (20, "GET /flights/?departure_airport_id&departure_date", {200}),
+    "routes": (5, "GET /flights/routes", {200}),
+    "suggest": (6, "GET /flights/airports/suggest", {200}),
+    "calendar": (4, "GET /flights/calendar", {200}),
+    "flight": (15, "GET /flights/{flight_id}", {200}),
+    "list_flights": (8, "GET /flights/", {200}),
+    "list_bookings": (8, "GET /bookings/", {200}),
+    "book": (16, "POST /bookings/", {201, 400}),  # 400 - места на рейсе кончились
+    "pay": (7, "PaymentService.create_payment + confirm_payment", {200}),
+    "cancel": (8, "DELETE /bookings/{booking_id}", {200}),
+    "login": (3, "POST /auth/login", {200}),
+}
+
+
+class Scale:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.airports = args.airports
+        self.flights = args.flights
+        self.users = args.users
+        self.bookings = args.bookings
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def airport_code(index: int) -> str:
+    """AAA, AAB, ... - трехбуквенные коды, как у IATA"""
+    letters = ""
+    for _ in range(3):
+        index, rest = divmod(index, 26)
+        letters = chr(ord("A") + rest) + letters
+    return letters
+
+
+async def seed(scale: Scale, rng: random.Random) -> None:
+    """Синтетические данные одним INSERT на таблицу; места рейсов и flight_seats согласованы с бронями"""
+    airports = [
+        {"code": airport_code(i), "name": f"Airport {i}", "city": f"City {i % (scale.airports // 2 + 1)}", "country": "Load"}
+        for i in range(scale.airports)
+    ]
+    # Хабы получают больше рейсов, как в реальной сети
+    weights = [1 / (i + 1) ** 0.8 for i in range(scale.airports)]
+    flights = []
+    for i in range(scale.flights):
+        departure, arrival = rng.choices(range(1, scale.airports + 1), weights, k=2)
+        if departure == arrival:
+            arrival = departure % scale.airports + 1
+        departure_time = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+        flights.append({
+            "flight_number": f"LT-{i}", "airline": "Load",
+            "departure_airport_id": departure, "arrival_airport_id": arrival,
+            "departure_time": departure_time,
+            "arrival_time": departure_time + timedelta(minutes=rng.randrange(60, 6 * 60)),
+            "total_seats": 180, "available_seats": 180,
+            "price": float(rng.randrange(3000, 30000)),
+        })
+    bookings, seats_rows = [], []
+    statuses = [BookingStatus.PENDING, BookingStatus.CONFIRMED, BookingStatus.CONFIRMED, BookingStatus.CANCELLED]
+    for i in range(scale.bookings):
+        flight_id = rng.randrange(1, scale.flights + 1)
+        flight = flights[flight_id - 1]
+        seats = rng.randint(1, 3)
+        status = rng.choice(statuses)
+        booking_id = len(bookings) + 1
+        if status != BookingStatus.CANCELLED:
+            if flight["available_seats"] < seats:
+                continue
+            # Места салона занимаются подряд - как у карты мест, с первого свободного
+            first = flight["total_seats"] - flight["available_seats"] + 1
+            seats_rows += [
+                {"flight_id": flight_id, "seat_number": seat, "booking_id": booking_id}
+                for seat in range(first, first + seats)
+            ]
+            flight["available_seats"] -= seats
+        bookings.append({
+            "id": booking_id, "booking_number": f"LT{i:018d}", "user_id": rng.randrange(1, scale.users + 1),
+            "flight_id": flight_id, "passenger_name": f"Passenger {i}",
+            "passenger_email": f"passenger{i}@example.com", "passenger_phone": "+70000000000",
+            "seats_count": seats, "total_price": flight["price"] * seats, "status": status,
+        })
+
+    hashed = AuthService.hash_password(PASSWORD)
+    async with async_session_maker() as session:
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        await session.execute(insert(UserModel), [
+            {"name": f"user{i}", "email": f"user{i}@example.com", "hashed_password": hashed, "role_id": role.id}
+            for i in range(scale.users)
+        ])
+        await session.execute(insert(AirportModel), airports)
+        await session.execute(insert(FlightModel), flights)
+        if bookings:
+            await session.execute(insert(BookingModel), bookings)
+        if seats_rows:
+            await session.execute(insert(FlightSeatModel), seats_rows)
+        await session.commit()
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.sql: dict[str, int] = defaultdict(int)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, op: str, elapsed_ms: float, status: int, sql_count: int) -> None:
+        self.latencies[op].append(elapsed_ms)
+        self.sql[op] += sql_count
+        self.statuses[op][status] += 1
+        if status not in MIX[op][2]:
+            self.errors[op] += 1
+
+
+class Client:
+    """Один виртуальный пользователь: своя последовательность операций и свои брони"""
+
+    def __init__(self, http: httpx.AsyncClient, scale: Scale, rng: random.Random, recorder: Recorder) -> None:
+        self.http = http
+        self.scale = scale
+        self.rng = rng
+        self.recorder = recorder
+        self.pending: list[int] = []
+        self.paid: list[int] = []
+
+    async def request(self, op: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.http.request(method, url, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        match = SERVER_TIMING_SQL.search(response.headers.get("server-timing", ""))
+        self.recorder.add(op, elapsed_ms, response.status_code, int(match.group(1)) if match else 0)
+        return response
+
+    def airport(self) -> int:
+        return self.rng.randrange(1, self.scale.airports + 1)
+
+    def day(self) -> str:
+        return (START + timedelta(days=self.rng.randrange(DAYS))).date().isoformat()
+
+    async def run(self, count: int) -> None:
+        ops = list(MIX)
+        weights = [MIX[op][0] for op in ops]
+        for op in self.rng.choices(ops, weights, k=count):
+            # Отменять и оплачивать нечего - сначала бронируем
+            if op == "cancel" and not (self.pending or self.paid):
+                op = "book"
+            if op == "pay" and not self.pending:
+                op = "book"
+            await getattr(self, op)()
+
+    async def search(self) -> None:
+        await self.request("search", "GET", "/flights/", params={
+            "departure_airport_id": self.airport(), "departure_date": self.day(),
+        })
+
+    async def routes(self) -> None:
+        await self.request("routes", "GET", "/flights/routes", params={
+            "departure_airport_id": self.airport(), "arrival_airport_id": self.airport(),
+            "departure_date": self.day(), "max_stops": self.rng.randint(0, 2),
+        })
+
+    async def suggest(self) -> None:
+        query = self.rng.choice(["City 1", "Airport 2", "AAB", "city", "airport 1"])
+        await self.request("suggest", "GET", "/flights/airports/suggest", params={"q": query[: self.rng.randint(2, len(query))]})
+
+    async def calendar(self) -> None:
+        await self.request("calendar", "GET", "/flights/calendar", params={
+            "from": self.airport(), "to": self.airport(), "month": START.strftime("%Y-%m"),
+        })
+
+    async def flight(self) -> None:
+        await self.request("flight", "GET", f"/flights/{self.rng.randrange(1, self.scale.flights + 1)}")
+
+    async def list_flights(self) -> None:
+        await self.request("list_flights", "GET", "/flights/", params={"limit": 50})
+
+    async def list_bookings(self) -> None:
+        await self.request("list_bookings", "GET", "/bookings/", params={"limit": 20, "offset": self.rng.randrange(0, 200)})
+
+    async def book(self) -> None:
+        response = await self.request("book", "POST", "/bookings/", json={
+            "flight_id": self.rng.randrange(1, self.scale.flights + 1),
+            "passenger_name": "Load Passenger",
+            "passenger_email": "load@example.com",
+            "passenger_phone": "+70000000000",
+            "seats_count": self.rng.randint(1, 3),
+        })
+        if response.status_code == 201:
+            self.pending.append(response.json()["id"])
+
+    async def pay(self) -> None:
+        booking_id = self.pending.pop(self.rng.randrange(len(self.pending)))
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 200
+        try:
+            async with DBManager(session_factory=async_session_maker) as db:
+                service = PaymentService(db)
+                payment = await service.create_payment(booking_id, {"payment_method": "card"})
+                await service.confirm_payment(payment.id)
+        except ValueError:
+            status = 400
+        except Exception as e:
+            # Как у HTTP-обработчика: занятая БД - 503, прочие ошибки - 500
+            status = 503 if is_database_busy(e) else 500
+        finally:
+            current_request_stats.reset(token)
+        self.recorder.add("pay", stats.elapsed_ms(), status, stats.sql_count)
+        if status == 200:
+            self.paid.append(booking_id)
+
+    async def cancel(self) -> None:
+        source = self.pending if self.pending and (not self.paid or self.rng.random() < 0.5) else self.paid
+        booking_id = source.pop(self.rng.randrange(len(source)))
+        await self.request("cancel", "DELETE", f"/bookings/{booking_id}", params={"is_admin": "true"})
+
+    async def login(self) -> None:
+        await self.request("login", "POST", "/auth/login", json={
+            "email": f"user{self.rng.randrange(self.scale.users)}@example.com", "password": PASSWORD,
+        })
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for op, (_, endpoint, _) in MIX.items():
+        latencies = recorder.latencies.get(op, [])
+        if not latencies:
+            continue
+        endpoints[op] = {
+            "endpoint": endpoint,
+            "requests": len(latencies),
+            "errors": recorder.errors.get(op, 0),
+            "statuses": {str(status): count for status, count in sorted(recorder.statuses[op].items())},
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "sql_per_request": round(recorder.sql[op] / len(latencies), 2),
+        }
+    total = sum(item["requests"] for item in endpoints.values())
+    return {
+        "total": {
+            "requests": total,
+            "errors": sum(item["errors"] for item in endpoints.values()),
+            "seconds": round(elapsed, 3),
+            "rps": round(total / elapsed, 1),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(result: dict) -> None:
+    total = result["total"]
+    print(f"\n▶ {total['requests']} запросов за {total['seconds']:.1f} с: {total['rps']:.0f} запр/с, ошибок {total['errors']}")
+    print(f"   {'операция':<14} {'запросов':>8} {'ошибок':>7} {'запр/с':>8} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8} {'SQL':>6}")
+    for op, item in result["endpoints"].items():
+        print(
+            f"   {op:<14} {item['requests']:8d} {item['errors']:7d} {item['rps']:8.1f} "
+            f"{item['p50_ms']:8.2f} {item['p95_ms']:8.2f} {item['p99_ms']:8.2f} {item['sql_per_request']:6.2f}"
+        )
+
+
+def print_comparison(result: dict, previous: dict) -> None:
+    """Разница с прошлым прогоном; ⚠️ - p99 хуже на 20%+ или SQL на запрос больше на 5%+"""
+    print(f"\n▶ сравнение с {previous['meta'].get('commit', '?')} ({previous['meta'].get('started_at', '?')})")
+    if previous["meta"].get("scale") != result["meta"]["scale"]:
+        print("   ⚠️ другой масштаб данных - сравнение ориентировочное")
+    print(f"   {'операция':<14} {'запр/с':>16} {'p50 мс':>18} {'p99 мс':>18} {'SQL':>12}")
+    for op, item in result["endpoints"].items():
+        old = previous["endpoints"].get(op)
+        if old is None:
+            print(f"   {op:<14} (новая операция)")
+            continue
+        # SQL на бронь немного плавает (первая бронь рейса загружает карту мест)
+        regressed = item["p99_ms"] > old["p99_ms"] * 1.2 or item["sql_per_request"] > old["sql_per_request"] * 1.05
+        print(
+            f"   {op:<14} {old['rps']:7.1f} -> {item['rps']:6.1f} "
+            f"{old['p50_ms']:8.2f} -> {item['p50_ms']:6.2f} "
+            f"{old['p99_ms']:8.2f} -> {item['p99_ms']:6.2f} "
+            f"{old['sql_per_request']:4.1f} -> {item['sql_per_request']:4.1f}"
+            f"{'  ⚠️' if regressed else ''}"
+        )
+
+
+async def main(args: argparse.Namespace) -> int:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    scale = Scale(args)
+    print(f"🌱 Засев: {scale.as_dict()}")
+    await create_schema(engine)
+    await seed(scale, random.Random(args.seed))
+
+    await app.router.startup()
+    # Фоновые задачи не должны менять данные во время замера
+    await hold_sweeper.stop()
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as http:
+        # Прогрев: ленивые структуры (граф маршрутов, календарь, карты мест)
+        warmup = Recorder()
+        await Client(http, scale, random.Random(-1), warmup).run(args.clients * 10)
+
+        clients = [Client(http, scale, random.Random(args.seed * 1000 + n), recorder) for n in range(args.clients)]
+        per_client = args.requests // args.clients
+        started = time.perf_counter()
+        await asyncio.gather(*(client.run(per_client) for client in clients))
+        elapsed = time.perf_counter() - started
+
+    await app.router.shutdown()
+    await engine.dispose()
+    await read_engine.dispose()
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "scale": scale.as_dict(),
+            "requests": args.requests,
+            "clients": args.clients,
+            "seed": args.seed,
+            "mix": {op: weight for op, (weight, _, _) in MIX.items()},
+        },
+        **summarize(recorder, elapsed),
+    }
+    print_report(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_test_{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(result, file, ensure_ascii=False, indent=2)
+    print(f"\n💾 {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            print_comparison(result, json.load(file))
+    return 1 if result["total"]["errors"] else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API бронирования")
+    parser.add_argument("--airports", type=int, default=300)
+    parser.add_argument("--flights", type=int, default=30_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--bookings", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="куда записать JSON (по умолчанию benchmarks/results/load_test_<commit>.json)")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,133 @@
+"""
+📝 Бенчмарк накладных расходов логирования (запросов в секунду)
+
+Один и тот же набор запросов через ASGI (10 параллельных клиентов), логи
+пишутся в файл во временной папке:
+  - логи выключены          - логгер "app" на CRITICAL, нижняя граница;
+  - до: синхронно, DEBUG    - как было: обработчик пишет в файл прямо в
+                              event loop, все строки "Getting/Found/Creating"
+                              на каждый запрос (раньше это был INFO);
+  - после: очередь, INFO    - QueueHandler + поток записи, одна строка
+                              access-лога на запрос;
+  - после: очередь, JSON    - то же в формате JSON.
+Плюс цена вызова logger.debug(f"...") и logger.debug("...%s", ...) при
+выключенном уровне.
+
+    python -m benchmarks.logging_overhead [requests] [clients]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+from benchmarks.common import use_temp_database
+
+use_temp_database("logging_overhead")
+
+import httpx  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database.database import engine, read_engine  # noqa: E402
+from app.logging_config import TEXT_FORMAT, log_subsystem  # noqa: E402
+from app.services.hold_sweeper import hold_sweeper  # noqa: E402
+from main import app  # noqa: E402
+
+BOOKING = {
+    "flight_id": 2,
+    "passenger_name": "Bench Passenger",
+    "passenger_email": "bench@example.com",
+    "passenger_phone": "+70000000000",
+    "seats_count": 1,
+}
+READS = ["/flights/", "/flights/1", "/flights/airports/", "/bookings/?limit=20", "/flights/1/availability"]
+
+
+async def scenario(client: httpx.AsyncClient, worker: int, count: int) -> None:
+    for i in range(count):
+        if i % 10 == 9:
+            response = await client.post("/bookings/", json=BOOKING)
+            await client.delete(f"/bookings/{response.json()['id']}?is_admin=true")
+        else:
+            await client.get(READS[(worker + i) % len(READS)])
+
+
+async def run(client: httpx.AsyncClient, requests: int, clients: int) -> float:
+    per_client = requests // clients
+    started = time.perf_counter()
+    await asyncio.gather(*(scenario(client, worker, per_client) for worker in range(clients)))
+    elapsed = time.perf_counter() - started
+    # POST + DELETE считаются как два запроса
+    return per_client * clients * 1.1 / elapsed
+
+
+def log_lines(path: str) -> int:
+    with open(path, encoding="utf-8") as file:
+        return sum(1 for _ in file)
+
+
+async def main(requests: int, clients: int) -> int:
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(logging.CRITICAL)
+    await app.router.startup()
+    await hold_sweeper.stop()
+    directory = tempfile.mkdtemp(prefix="logs_")
+    results = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await run(client, 200, clients)  # прогрев
+
+        results.append(("логи выключены", await run(client, requests, clients), None))
+
+        # До: синхронный обработчик прямо на логгере, уровень DEBUG
+        path = os.path.join(directory, "sync.log")
+        app_logger.removeHandler(log_subsystem.handler)
+        sync_handler = logging.FileHandler(path, encoding="utf-8")
+        sync_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        app_logger.addHandler(sync_handler)
+        app_logger.setLevel(logging.DEBUG)
+        results.append(("до: синхронно, DEBUG", await run(client, requests, clients), path))
+        app_logger.removeHandler(sync_handler)
+        sync_handler.close()
+
+        # После: очередь и поток записи, INFO (text и json)
+        for log_format in ("text", "json"):
+            settings.LOG_FORMAT = log_format
+            path = os.path.join(directory, f"queue_{log_format}.log")
+            with open(path, "w", encoding="utf-8") as stream:
+                log_subsystem.configure(stream=stream)
+                rps = await run(client, requests, clients)
+                log_subsystem.stop()
+            results.append((f"после: очередь, {log_format}", rps, path))
+
+        app_logger.setLevel(logging.CRITICAL)
+        results.append(("логи выключены (повтор)", await run(client, requests, clients), None))
+
+    await app.router.shutdown()
+    await engine.dispose()
+    await read_engine.dispose()
+
+    print(f"▶ {requests} запросов, {clients} клиентов")
+    print(f"   {'':<24} {'запр/с':>8} {'строк лога':>11}")
+    for name, rps, path in results:
+        lines = log_lines(path) if path else 0
+        print(f"   {name:<24} {rps:8.0f} {lines:11d}")
+    print(f"   отброшено из очереди: {log_subsystem.stats()['dropped']}")
+
+    logger = logging.getLogger("app.bench")
+    logger.setLevel(logging.INFO)
+    data = {"passenger_name": "Иван Петров", "passenger_email": "ivan@example.com", "seats_count": 2}
+    number = 200_000
+    eager = timeit.timeit(lambda: logger.debug(f"[Bench] Data received: {data}"), number=number)
+    lazy = timeit.timeit(lambda: logger.debug("[Bench] Data received: %s", data), number=number)
+    print("\n▶ logger.debug при уровне INFO, мкс на вызов")
+    print(f"   f-строка: {eager / number * 1e6:.3f}   ленивый %s: {lazy / number * 1e6:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(asyncio.run(main(*(args + [3000, 10][len(args):]))))
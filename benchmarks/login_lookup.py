@@ -0,0 +1,91 @@
+"""
+🔑 Бенчмарк: задержка логина без учета bcrypt
+
+Сравнивает поиск учетных данных и выпуск токена:
+  - до:    get_one_or_none_with_role (selectin за ролью) + SUserGetWithRels
+  - после: get_credentials (один JOIN, три колонки, без Pydantic)
+и то же для /auth/me: старый запрос с ролью против пользователя + RoleCache.
+
+    python -m benchmarks.login_lookup [iterations]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+use_temp_database("login_lookup")
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.services.auth import AuthService  # noqa: E402
+
+USERS = 1000
+
+
+async def seed() -> None:
+    async with async_session_maker() as session:
+        roles = [RoleModel(name=name) for name in ("user", "manager", "admin")]
+        session.add_all(roles)
+        await session.flush()
+        session.add_all(
+            UserModel(name=f"user{i}", email=f"user{i}@example.com",
+                      hashed_password="not-a-real-hash", role_id=roles[i % 3].id)
+            for i in range(USERS)
+        )
+        await session.commit()
+
+
+async def legacy_login(db: DBManager, i: int) -> str:
+    user = await db.users.get_one_or_none_with_role(email=f"user{i % USERS}@example.com")
+    await db.rollback()
+    return AuthService.create_access_token({"user_id": user.id, "role": user.role.name})
+
+
+async def lean_login(db: DBManager, i: int) -> str:
+    credentials = await db.users.get_credentials(f"user{i % USERS}@example.com")
+    await db.rollback()
+    return AuthService.create_access_token(
+        {"user_id": credentials.id, "role": credentials.role_name}
+    )
+
+
+async def legacy_me(db: DBManager, i: int):
+    return await db.users.get_one_or_none_with_role(id=i % USERS + 1)
+
+
+async def lean_me(db: DBManager, i: int):
+    return await AuthService(db).get_me(i % USERS + 1)
+
+
+async def measure(name: str, func, iterations: int) -> None:
+    latencies = []
+    async with DBManager(session_factory=async_session_maker) as db:
+        for i in range(50):
+            await func(db, i)
+        for i in range(iterations):
+            start = time.perf_counter()
+            await func(db, i)
+            latencies.append((time.perf_counter() - start) * 1e6)
+    print(f"   {name:<40} p50: {percentile(latencies, 50):8.1f} мкс  "
+          f"p99: {percentile(latencies, 99):8.1f} мкс")
+
+
+async def main(iterations: int) -> None:
+    await create_schema(engine)
+    await seed()
+
+    print("▶ логин без bcrypt: поиск учетных данных + выпуск токена")
+    await measure("до: get_one_or_none_with_role", legacy_login, iterations)
+    await measure("после: get_credentials", lean_login, iterations)
+
+    print("\n▶ /auth/me: пользователь с ролью")
+    await measure("до: get_one_or_none_with_role", legacy_me, iterations)
+    await measure("после: get_one_or_none + RoleCache", lean_me, iterations)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,112 @@
+"""
+🌪️ Бенчмарк: задержка GET /flights/ во время "шторма" логинов
+
+Параллельно с потоком логинов (каждый - проверка bcrypt) опрашивает
+GET /flights/ и сравнивает p50/p99 его задержки:
+  - до:    bcrypt выполняется прямо в event loop (PASSWORD_HASH_WORKERS=0)
+  - после: bcrypt в выделенном пуле потоков
+
+    python -m benchmarks.login_storm [logins] [login_concurrency]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from benchmarks.common import percentile, use_temp_database
+
+use_temp_database("login_storm")
+
+import httpx  # noqa: E402
+
+import app.services.auth as auth_module  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.services.auth import AuthService  # noqa: E402
+from app.services.password_hasher import PasswordHasher  # noqa: E402
+from main import app  # noqa: E402
+
+USERS = 20
+PASSWORD = "bench-password"
+POLLERS = 4
+
+
+async def seed_users() -> None:
+    hashed = AuthService.hash_password(PASSWORD)
+    async with async_session_maker() as session:
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        session.add_all(
+            UserModel(name=f"user{i}", email=f"user{i}@example.com",
+                      hashed_password=hashed, role_id=role.id)
+            for i in range(USERS)
+        )
+        await session.commit()
+
+
+async def login_storm(client: httpx.AsyncClient, logins: int, concurrency: int, stats: dict):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(i: int):
+        async with semaphore:
+            response = await client.post(
+                "/auth/login",
+                json={"email": f"user{i % USERS}@example.com", "password": PASSWORD},
+            )
+            stats[response.status_code] = stats.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(login(i) for i in range(logins)))
+
+
+async def poll_flights(client: httpx.AsyncClient, done: asyncio.Event, latencies: list):
+    while not done.is_set():
+        start = time.perf_counter()
+        await client.get("/flights/")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(name: str, hasher: PasswordHasher, logins: int, concurrency: int) -> None:
+    auth_module.password_hasher = hasher
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    done = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        pollers = [asyncio.create_task(poll_flights(client, done, latencies)) for _ in range(POLLERS)]
+        await login_storm(client, logins, concurrency, statuses)
+        elapsed = time.perf_counter() - start
+        done.set()
+        await asyncio.gather(*pollers)
+    hasher.shutdown()
+
+    print(f"\n▶ {name}")
+    print(f"   логинов: {logins} за {elapsed:.2f} c ({logins / elapsed:.1f}/c), статусы: {statuses}")
+    print(f"   GET /flights/: {len(latencies)} запросов, "
+          f"p50: {percentile(latencies, 50):.1f} мс, p99: {percentile(latencies, 99):.1f} мс, "
+          f"max: {max(latencies):.1f} мс")
+
+
+async def main(logins: int, concurrency: int) -> None:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await app.router.startup()
+    await seed_users()
+
+    await run("до: bcrypt в event loop", PasswordHasher(0, logins), logins, concurrency)
+    await run(
+        f"после: пул bcrypt ({settings.PASSWORD_HASH_WORKERS} потоков)",
+        PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE),
+        logins,
+        concurrency,
+    )
+    await app.router.shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [100, 20][len(args):])))
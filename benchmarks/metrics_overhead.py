@@ -0,0 +1,160 @@
+"""
+📈 Бенчмарк метрик: цена записи, scrape и сложение снимков воркеров
+
+1. Counter.inc / Histogram.observe: потоковые шарды без блокировок против
+   общего словаря под threading.Lock - нс на вызов в 1 и 8 потоках, плюс
+   проверка, что при scrape сумма по потокам сходится.
+2. MetricsMiddleware на пустом ASGI-приложении: мкс на запрос.
+3. render() на N сериях гистограммы (мс на scrape).
+4. Несколько процессов: каждый пишет снимок в общую папку, render()
+   родителя складывает их - итог должен совпасть с суммой по процессам.
+
+    python -m benchmarks.metrics_overhead [calls] [series]
+"""
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+
+from app.metrics import MetricsRegistry
+from app.middleware import MetricsMiddleware
+
+THREADS = 8
+WORKERS = 4
+
+
+class LockedCounter:
+    """Для сравнения: один словарь на все потоки под блокировкой"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def inc(self, labels=(), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+def per_call_ns(func, calls: int, threads: int) -> float:
+    def work() -> None:
+        for _ in range(calls):
+            func()
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return (time.perf_counter() - started) / (calls * threads) * 1e9
+
+
+def build_registry(directory: str = "") -> MetricsRegistry:
+    registry = MetricsRegistry(directory)
+    registry.counter("bench_total", "bench", ("route",))
+    registry.histogram("bench_seconds", "bench", ("route",))
+    registry.gauge("bench_in_flight", "bench")
+    return registry
+
+
+def recording_cost(calls: int) -> None:
+    registry = build_registry()
+    counter, histogram = registry._metrics["bench_total"], registry._metrics["bench_seconds"]
+    locked = LockedCounter()
+    labels = ("/flights/{flight_id}",)
+    print(f"▶ нс на вызов ({calls} вызовов на поток)")
+    print(f"   {'':<28} {'1 поток':>8} {f'{THREADS} потоков':>11}")
+    for name, func in (
+        ("Counter.inc (шарды)", lambda: counter.inc(labels)),
+        ("Counter.inc (Lock)", lambda: locked.inc(labels)),
+        ("Histogram.observe (шарды)", lambda: histogram.observe(0.0042, labels)),
+    ):
+        single = per_call_ns(func, calls, 1)
+        many = per_call_ns(func, calls, THREADS)
+        print(f"   {name:<28} {single:8.0f} {many:11.0f}")
+    expected = calls * (1 + THREADS)
+    total = registry.snapshot()["bench_total"][labels]
+    status = "✅" if total == expected else "❌"
+    print(f"   {status} сумма Counter по потокам: {total:.0f} (ожидается {expected})")
+
+
+def middleware_cost(requests: int) -> None:
+    async def empty_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run(asgi) -> float:
+        scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+        started = time.perf_counter()
+        for _ in range(requests):
+            await asgi(scope, receive, send)
+        return (time.perf_counter() - started) / requests * 1e6
+
+    print(f"\n▶ middleware на пустом приложении, мкс на запрос ({requests} шт.)")
+    for name, asgi in (("без метрик", empty_app), ("MetricsMiddleware", MetricsMiddleware(empty_app))):
+        print(f"   {name:<20} {asyncio.run(run(asgi)):8.2f}")
+
+
+def scrape_cost(series: int) -> None:
+    registry = build_registry()
+    histogram = registry._metrics["bench_seconds"]
+    for i in range(series):
+        histogram.observe(i / series, (f"/route/{i}",))
+    started = time.perf_counter()
+    text = registry.render()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"\n▶ render(): {series} серий гистограммы -> {len(text) // 1024} КиБ за {elapsed:.1f} мс")
+
+
+def worker(directory: str, calls: int) -> None:
+    registry = build_registry(directory)
+    registry._metrics["bench_in_flight"].inc()
+    for i in range(calls):
+        registry._metrics["bench_total"].inc(("/flights/",))
+        registry._metrics["bench_seconds"].observe(i / calls, ("/flights/",))
+    registry.flush()
+
+
+def multiprocess(calls: int) -> bool:
+    directory = tempfile.mkdtemp(prefix="metrics_")
+    processes = [multiprocessing.Process(target=worker, args=(directory, calls)) for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    registry = build_registry(directory)
+    registry._metrics["bench_total"].inc(("/flights/",))
+    started = time.perf_counter()
+    total = registry.collect_all()
+    elapsed = (time.perf_counter() - started) * 1000
+    expected = calls * WORKERS + 1
+    counter = total["bench_total"][("/flights/",)]
+    observations = sum(total["bench_seconds"][("/flights/",)][:-1])
+    # Процессы уже завершились: их gauge в сумму не попадают
+    in_flight = total["bench_in_flight"].get((), 0.0)
+    ok = counter == expected and observations == calls * WORKERS and in_flight == 0
+    print(f"\n▶ {WORKERS} процесса + текущий, сложение снимков за {elapsed:.2f} мс")
+    print(f"   {'✅' if ok else '❌'} counter {counter:.0f} (ожидается {expected}), "
+          f"наблюдений {observations} (ожидается {calls * WORKERS}), gauge завершившихся {in_flight:.0f}")
+    return ok
+
+
+def main(calls: int, series: int) -> int:
+    recording_cost(calls)
+    middleware_cost(calls // 10)
+    scrape_cost(series)
+    return 0 if multiprocess(calls // 10) else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(main(*(args + [200_000, 1000][len(args):])))
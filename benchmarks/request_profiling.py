@@ -0,0 +1,134 @@
+"""
+⏱️ Бенчмарк стоимости профилирования запросов (Server-Timing, учет SQL)
+
+1. Слушатели SQLAlchemy: мкс на SELECT по первичному ключу на движке
+   без слушателей и с install_query_stats (с RequestStats в contextvar).
+2. Middleware на пустом ASGI-приложении: мкс на запрос без него, только
+   Server-Timing и Server-Timing + строка access-лога (в очередь логов).
+3. Запросов в секунду на смеси эндпоинтов: профилирование выключено / включено.
+
+    python -m benchmarks.request_profiling [statements] [requests]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from benchmarks.common import use_temp_database
+
+use_temp_database("request_profiling")
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database.database import engine, read_engine  # noqa: E402
+from app.database.query_stats import RequestStats, current_request_stats, install_query_stats  # noqa: E402
+from app.logging_config import log_subsystem  # noqa: E402
+from app.middleware import RequestStatsMiddleware  # noqa: E402
+from app.services.hold_sweeper import hold_sweeper  # noqa: E402
+from main import app  # noqa: E402
+
+READS = ["/flights/", "/flights/1", "/flights/airports/", "/bookings/?limit=20", "/flights/1/availability"]
+
+
+async def statement_cost(statements: int) -> None:
+    print(f"▶ SELECT по ключу, мкс на выражение ({statements} шт.)")
+    current_request_stats.set(RequestStats())
+    for name, install in (("без слушателей", False), ("с учетом SQL", True)):
+        bench_engine = create_async_engine(settings.get_db_url)
+        if install:
+            install_query_stats(bench_engine)
+        async with bench_engine.connect() as conn:
+            query = text("SELECT id, flight_number FROM flights WHERE id = :id")
+            for i in range(200):
+                await conn.execute(query, {"id": 1})
+            started = time.perf_counter()
+            for i in range(statements):
+                await conn.execute(query, {"id": i % 6 + 1})
+            elapsed = time.perf_counter() - started
+        await bench_engine.dispose()
+        print(f"   {name:<16} {elapsed / statements * 1e6:8.1f}")
+    current_request_stats.set(None)
+
+
+async def middleware_cost(requests: int) -> None:
+    async def empty_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+    variants = [
+        ("без middleware", empty_app),
+        ("Server-Timing", RequestStatsMiddleware(empty_app, server_timing=True, log_requests=False)),
+        ("+ access-лог", RequestStatsMiddleware(empty_app, server_timing=True, log_requests=True)),
+    ]
+    print(f"\n▶ middleware на пустом приложении, мкс на запрос ({requests} шт.)")
+    for name, asgi in variants:
+        started = time.perf_counter()
+        for _ in range(requests):
+            await asgi(scope, receive, send)
+        print(f"   {name:<16} {(time.perf_counter() - started) / requests * 1e6:8.1f}")
+
+
+async def endpoint_mix(client: httpx.AsyncClient, requests: int) -> float:
+    started = time.perf_counter()
+
+    async def worker(offset: int) -> None:
+        for i in range(requests // 10):
+            await client.get(READS[(offset + i) % len(READS)])
+
+    await asyncio.gather(*(worker(n) for n in range(10)))
+    return requests // 10 * 10 / (time.perf_counter() - started)
+
+
+def find_middleware(asgi) -> RequestStatsMiddleware:
+    while not isinstance(asgi, RequestStatsMiddleware):
+        asgi = asgi.app
+    return asgi
+
+
+async def main(statements: int, requests: int) -> int:
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(logging.CRITICAL)
+    await app.router.startup()
+    await hold_sweeper.stop()
+    with open(os.devnull, "w") as devnull:
+        log_subsystem.configure(stream=devnull)
+        await statement_cost(statements)
+        await middleware_cost(requests * 10)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await endpoint_mix(client, 500)  # прогрев и сборка middleware-стека
+            middleware = find_middleware(app.middleware_stack)
+            print(f"\n▶ смесь GET-эндпоинтов, запросов/с ({requests} шт., 10 клиентов)")
+            for name, server_timing, log_requests in (
+                ("выключено", False, False),
+                ("Server-Timing", True, False),
+                ("+ access-лог", True, True),
+                ("выключено (повтор)", False, False),
+            ):
+                middleware.server_timing = server_timing
+                middleware.log_requests = log_requests
+                app_logger.setLevel(logging.INFO if log_requests else logging.CRITICAL)
+                print(f"   {name:<20} {await endpoint_mix(client, requests):8.0f}")
+        log_subsystem.stop()
+
+    await app.router.shutdown()
+    await engine.dispose()
+    await read_engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(asyncio.run(main(*(args + [5000, 3000][len(args):]))))
@@ -0,0 +1,127 @@
+"""
+⚡ Бенчмарк сериализации списков (CPU на ответ)
+
+Для GET /flights/, GET /flights/airports/ и GET /bookings/ на 10k строк:
+  - до:    как FastAPI для response_model - валидация списка, dump в
+           JSON-совместимые объекты, JSONResponse (json.dumps);
+  - после: app.utils.responses - TypeAdapter.dump_json / orjson сразу в Response.
+Время - process_time (CPU), плюс проверка, что JSON совпадает.
+
+    python -m benchmarks.response_serialization [rows] [repeat]
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_schema, use_temp_database
+
+use_temp_database("response_serialization")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.flights import AIRPORT_LIST, FLIGHT_LIST  # noqa: E402
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.booking import BookingModel, BookingStatus  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.schemes.flights import AirportRead, FlightListRead  # noqa: E402
+from app.utils.responses import models_response, rows_response  # noqa: E402
+from main import app  # noqa: E402
+
+START = datetime(2030, 1, 1)
+
+
+def response_field(path: str):
+    route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods)
+    return route.response_field
+
+
+async def booking_rows(count: int):
+    async with async_session_maker() as session:
+        session.add(AirportModel(code="AAA", name="Шереметьево", city="Москва", country="Россия"))
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        session.add(UserModel(name="bench", email="bench@example.com", hashed_password="-", role_id=role.id))
+        session.add(FlightModel(
+            flight_number="BN-1", airline="Bench", departure_airport_id=1, arrival_airport_id=1,
+            departure_time=START, arrival_time=START + timedelta(hours=2),
+            total_seats=count, available_seats=count, price=5500.0,
+        ))
+        await session.flush()
+        await session.execute(insert(BookingModel), [
+            {
+                "booking_number": f"BK{i:018d}", "user_id": 1, "flight_id": 1,
+                "passenger_name": "Иван Петров", "passenger_email": "ivan@example.com",
+                "passenger_phone": "+70000000000", "seats_count": 1, "total_price": 5500.0,
+                "status": BookingStatus.PENDING,
+            }
+            for i in range(count)
+        ])
+        await session.commit()
+    async with DBManager(session_factory=async_session_maker) as db:
+        return await db.bookings.list_bookings(count)
+
+
+async def measure(name: str, path: str, content, fast, repeat: int) -> bool:
+    field = response_field(path)
+
+    async def before() -> bytes:
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+    async def after() -> bytes:
+        return fast().body
+
+    timings = []
+    for func in (before, after):
+        start = time.process_time()
+        for _ in range(repeat):
+            body = await func()
+        timings.append((time.process_time() - start) / repeat * 1000)
+    same = json.loads(await before()) == json.loads(await after())
+    print(f"   {name:<22} {timings[0]:9.2f} {timings[1]:9.2f} {timings[0] / timings[1]:6.1f}x  "
+          f"{len(body) / 1024:7.0f} КБ  {'✅' if same else '❌'}")
+    return same
+
+
+async def main(rows: int, repeat: int) -> int:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    airports = [
+        AirportRead(id=i, code=f"A{i % 100:02d}", name=f"Аэропорт {i}", city=f"Город {i}", country="Россия")
+        for i in range(rows)
+    ]
+    flights = [
+        FlightListRead(
+            id=i, flight_number=f"SU-{i}", airline="Аэрофлот",
+            departure_airport=airports[i % len(airports)], arrival_airport=airports[(i + 1) % len(airports)],
+            departure_time=START + timedelta(minutes=i), arrival_time=START + timedelta(minutes=i + 120),
+            available_seats=180, price=5500.0,
+        )
+        for i in range(rows)
+    ]
+    bookings = await booking_rows(rows)
+
+    print(f"▶ {rows:,} строк, CPU мс на ответ (среднее из {repeat})")
+    print(f"   {'':<22} {'до':>9} {'после':>9} {'':>7}  {'размер':>10}")
+    ok = True
+    ok &= await measure("GET /flights/", "/flights/", flights,
+                        lambda: models_response(FLIGHT_LIST, flights), repeat)
+    ok &= await measure("GET /flights/airports/", "/flights/airports/", airports,
+                        lambda: models_response(AIRPORT_LIST, airports), repeat)
+    ok &= await measure("GET /bookings/", "/bookings/", bookings,
+                        lambda: rows_response(bookings), repeat)
+    await engine.dispose()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(asyncio.run(main(*(args + [10_000, 20][len(args):]))))
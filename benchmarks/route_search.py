@@ -0,0 +1,162 @@
+"""
+🧭 Бенчмарк поиска маршрутов с пересадками (RouteSearchEngine)
+
+100k рейсов между 500 аэропортами за 30 дней; у аэропортов разный "вес"
+(хабы получают больше рейсов). Печатает:
+  - время загрузки read-модели и построения графа;
+  - p50/p99 времени запроса "A -> B в день D" для 0, 1 и 2 пересадок;
+  - сверку с полным перебором без отсечений на случайных запросах;
+  - время инкрементального добавления/удаления рейса.
+
+    python -m benchmarks.route_search [flights] [airports] [queries]
+"""
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+use_temp_database("route_search")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.services.flight_availability import flight_availability  # noqa: E402
+from app.services.route_search import (  # noqa: E402
+    MAX_CANDIDATES,
+    MAX_LAYOVER_HOURS,
+    MAX_TRIP_HOURS,
+    route_search,
+    to_minutes,
+)
+
+DAYS = 30
+START = datetime(2030, 1, 1)
+MIN_CONNECTION = 60
+
+
+async def seed(flights: int, airports: int) -> None:
+    rng = random.Random(3)
+    weights = [1 / (i + 1) ** 0.8 for i in range(airports)]
+    async with async_session_maker() as session:
+        await session.execute(insert(AirportModel), [
+            {"code": f"{i:03d}", "name": f"Airport {i}", "city": f"City {i}", "country": "Bench"}
+            for i in range(airports)
+        ])
+        rows = []
+        for i in range(flights):
+            departure, arrival = rng.choices(range(1, airports + 1), weights, k=2)
+            if departure == arrival:
+                arrival = departure % airports + 1
+            departure_time = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+            rows.append({
+                "flight_number": f"BN-{i}", "airline": "Bench",
+                "departure_airport_id": departure, "arrival_airport_id": arrival,
+                "departure_time": departure_time,
+                "arrival_time": departure_time + timedelta(minutes=rng.randrange(60, 6 * 60)),
+                "total_seats": 180, "available_seats": rng.choice([0, 180, 180, 180]),
+                "price": float(rng.randrange(3000, 30000)),
+            })
+        await session.execute(insert(FlightModel), rows)
+        await session.commit()
+
+
+def brute_force(origin: int, destination: int, day: date, max_stops: int) -> set[tuple[int, ...]]:
+    """Полный перебор без отсечений по latest - эталон для сверки"""
+    day_start = to_minutes(datetime.combine(day, datetime.min.time()))
+    horizon = day_start + MAX_TRIP_HOURS * 60
+    by_airport: dict[int, list] = {}
+    for flight in flight_availability.flights():
+        by_airport.setdefault(flight.departure_airport_id, []).append(
+            (to_minutes(flight.departure_time), to_minutes(flight.arrival_time), flight)
+        )
+    found = set()
+
+    def walk(path, airport, earliest, latest):
+        for departure, arrival, flight in by_airport.get(airport, []):
+            if not earliest <= departure <= latest or arrival > horizon or flight.available_seats < 1:
+                continue
+            target = flight.arrival_airport_id
+            legs = path + [flight]
+            if target == destination:
+                found.add(tuple(leg.id for leg in legs))
+            elif len(legs) <= max_stops and all(leg.departure_airport_id != target for leg in legs):
+                walk(legs, target, arrival + MIN_CONNECTION, arrival + MAX_LAYOVER_HOURS * 60)
+
+    walk([], origin, day_start, day_start + 24 * 60 - 1)
+    return found
+
+
+async def main(flights: int, airports: int, queries: int) -> int:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    await seed(flights, airports)
+    async with async_session_maker() as session:
+        start = time.perf_counter()
+        await flight_availability.load(session)
+        loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    route_search.build()
+    built = time.perf_counter() - start
+    print(f"▶ {flights:,} рейсов, {airports} аэропортов: read-модель {loaded:.2f} c, граф {built * 1000:.0f} мс")
+
+    rng = random.Random(5)
+    requests = [
+        (rng.randrange(1, 50), rng.randrange(1, airports + 1), (START + timedelta(days=rng.randrange(DAYS - 2))).date())
+        for _ in range(queries)
+    ]
+    print("\n▶ время запроса, мс")
+    for max_stops in (0, 1, 2):
+        latencies, found = [], 0
+        for origin, destination, day in requests:
+            start = time.perf_counter()
+            routes = route_search.search(origin, destination, day, max_stops, MIN_CONNECTION, limit=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found += bool(routes)
+        print(f"   пересадок <= {max_stops}: p50 {percentile(latencies, 50):6.2f}, "
+              f"p99 {percentile(latencies, 99):6.2f}, max {max(latencies):6.2f}; "
+              f"маршрут нашелся в {found}/{queries}")
+
+    checked, ok = 0, True
+    for origin, destination, day in requests[:30]:
+        for max_stops in (1, 2):
+            expected = brute_force(origin, destination, day, max_stops)
+            if len(expected) >= MAX_CANDIDATES:
+                continue
+            routes = route_search.search(origin, destination, day, max_stops, MIN_CONNECTION, limit=MAX_CANDIDATES)
+            ok = ok and {tuple(leg.id for leg in route) for route in routes} == expected
+            checked += 1
+    print(f"\n▶ сверка с полным перебором ({checked} запросов): {'✅' if ok else '❌'}")
+
+    # Новый прямой рейс между аэропортами без сообщения - сразу виден в поиске
+    origin, destination = airports, airports - 1
+    day = (START + timedelta(days=DAYS // 2)).date()
+    departure_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=10)
+    flight = SimpleNamespace(
+        id=10**9, flight_number="NEW-1", airline="Bench",
+        departure_airport_id=origin, arrival_airport_id=destination,
+        departure_time=departure_time, arrival_time=departure_time + timedelta(hours=2),
+        total_seats=180, available_seats=180, price=1000.0,
+    )
+    start = time.perf_counter()
+    flight_availability.put_flight(flight)
+    added = (time.perf_counter() - start) * 1000
+    visible = any(route[0].id == flight.id for route in route_search.search(origin, destination, day, 0))
+    start = time.perf_counter()
+    flight_availability.remove_flight(flight.id)
+    removed = (time.perf_counter() - start) * 1000
+    gone = not any(route[0].id == flight.id for route in route_search.search(origin, destination, day, 0))
+    print(f"\n▶ инкрементальное обновление: добавление {added:.2f} мс, удаление {removed:.2f} мс, "
+          f"рейс виден/исчез: {'✅' if visible and gone else '❌'}, перестроений графа: {route_search.builds}")
+    await engine.dispose()
+    return 0 if ok and visible and gone else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    sys.exit(asyncio.run(main(*(args + [100_000, 500, 200][len(args):]))))
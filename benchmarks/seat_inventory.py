@@ -0,0 +1,90 @@
+"""
+💺 Бенчмарк карты мест: поиск N соседних свободных мест
+
+10k рейсов × 300 мест, заполненность ~70% (случайная, с фиксированным seed).
+1. find_adjacent(n) для n = 1..6 на битовой карте против наивного обхода
+   списка мест по рядам (как было бы без карты) - мкс на запрос.
+2. Обход всех рейсов: "на каких рейсах есть n мест рядом".
+3. reserve/release выбранного блока.
+Результаты битовой карты сверяются с наивным поиском.
+
+    python -m benchmarks.seat_inventory [flights] [seats] [occupancy]
+"""
+import random
+import sys
+import timeit
+
+from benchmarks.common import stopwatch
+
+from app.services.seat_inventory import SEATS_PER_ROW, SeatMap
+
+
+def make_flights(flights: int, seats: int, occupancy: float) -> list[tuple[SeatMap, list[bool]]]:
+    rng = random.Random(42)
+    result = []
+    for _ in range(flights):
+        taken = [n for n in range(1, seats + 1) if rng.random() < occupancy]
+        is_free = [True] * (seats + 1)
+        for n in taken:
+            is_free[n] = False
+        result.append((SeatMap(seats, taken), is_free))
+    return result
+
+
+def naive_find_adjacent(is_free: list[bool], seats: int, count: int) -> int | None:
+    """Старый способ: список занятости и проход по рядам"""
+    for row_start in range(1, seats + 1, SEATS_PER_ROW):
+        run = 0
+        for n in range(row_start, min(row_start + SEATS_PER_ROW, seats + 1)):
+            run = run + 1 if is_free[n] else 0
+            if run == count:
+                return n - count + 1
+    return None
+
+
+def main(flights: int, seats: int, occupancy: float) -> int:
+    with stopwatch() as elapsed:
+        data = make_flights(flights, seats, occupancy)
+    free = sum(seat_map.free_count() for seat_map, _ in data)
+    print(f"▶ {flights:,} рейсов × {seats} мест, свободно {free / (flights * seats):.1%} "
+          f"(построение карт: {elapsed():.2f} c)")
+
+    ok = all(
+        seat_map.find_adjacent(n) == naive_find_adjacent(is_free, seats, n)
+        for seat_map, is_free in data[:1000]
+        for n in range(1, SEATS_PER_ROW + 1)
+    )
+    print(f"   совпадение с наивным поиском: {'✅' if ok else '❌'}")
+
+    print("\n▶ find_adjacent(n) на одном рейсе (мкс на запрос)")
+    print(f"   {'n':>3} {'битовая карта':>14} {'список':>10}")
+    sample = data[: min(1000, flights)]
+    for n in range(1, SEATS_PER_ROW + 1):
+        bitmap = min(timeit.repeat(
+            lambda: [seat_map.find_adjacent(n) for seat_map, _ in sample], number=5, repeat=3
+        )) / (5 * len(sample))
+        naive = min(timeit.repeat(
+            lambda: [naive_find_adjacent(is_free, seats, n) for _, is_free in sample], number=1, repeat=3
+        )) / len(sample)
+        print(f"   {n:>3} {bitmap * 1e6:14.2f} {naive * 1e6:10.2f}")
+
+    print("\n▶ все рейсы с n местами рядом")
+    for n in (2, 4, 6):
+        with stopwatch() as elapsed:
+            found = sum(1 for seat_map, _ in data if seat_map.find_adjacent(n) is not None)
+        print(f"   n={n}: {found:,} рейсов за {elapsed() * 1000:.1f} мс")
+
+    seat_map = SeatMap(seats)
+    block = seat_map.pick(4)
+    iterations = 200_000
+    seconds = min(timeit.repeat(
+        lambda: (seat_map.reserve(block), seat_map.release(block)), number=iterations, repeat=3
+    ))
+    print(f"\n▶ reserve + release блока из 4 мест: {seconds / iterations * 1e6:.2f} мкс")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    defaults = [10_000, 300, 0.7]
+    sys.exit(main(*(type(d)(a) for d, a in zip(defaults, args)), *defaults[len(args):]))
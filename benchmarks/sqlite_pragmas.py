@@ -0,0 +1,151 @@
+"""
+⚙️ Бенчмарк: смешанная нагрузка чтение/запись до и после тюнинга SQLite
+
+Одна и та же нагрузка (читатели листают GET /flights/ через FlightService,
+писатели бронируют места через BookingService) прогоняется на двух базах:
+  - до:    настройки SQLite по умолчанию (rollback-журнал, synchronous=FULL)
+  - после: PRAGMA из settings.sqlite_pragmas (WAL, synchronous=NORMAL, ...)
+
+    python -m benchmarks.sqlite_pragmas [seconds] [readers] [writers]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+DB_PATH = use_temp_database("sqlite_pragmas")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database.database import install_sqlite_pragmas  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.repositories.flight_repository import FlightRepository  # noqa: E402
+from app.schemes.bookings import BookingCreate  # noqa: E402
+from app.services.booking_service import BookingService  # noqa: E402
+from app.services.flight_service import FlightService  # noqa: E402
+
+FLIGHTS = 200
+
+BOOKING = dict(
+    passenger_name="Bench Passenger",
+    passenger_email="bench@example.com",
+    passenger_phone="+70000000000",
+    seats_count=1,
+)
+
+
+async def seed(session_maker) -> None:
+    async with session_maker() as session:
+        session.add_all([
+            AirportModel(code="MOW", name="Шереметьево", city="Москва", country="Россия"),
+            AirportModel(code="SPB", name="Пулково", city="Санкт-Петербург", country="Россия"),
+        ])
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        session.add(UserModel(name="bench", email="bench@example.com",
+                              hashed_password="-", role_id=role.id))
+        session.add_all(
+            FlightModel(
+                flight_number=f"BN-{i}",
+                airline="Bench",
+                departure_airport_id=1,
+                arrival_airport_id=2,
+                departure_time=datetime(2030, 1, 1 + i % 28, i % 24),
+                arrival_time=datetime(2030, 1, 1 + i % 28, i % 24, 59),
+                total_seats=1_000_000,
+                available_seats=1_000_000,
+                price=1000.0,
+            )
+            for i in range(FLIGHTS)
+        )
+        await session.commit()
+
+
+async def reader(session_maker, deadline: float, stats: dict) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with session_maker() as session:
+                await FlightService(session).get_flights_page(100)
+            stats["read_latency"].append((time.perf_counter() - start) * 1000)
+        except Exception as exc:
+            stats["errors"] += 1
+            stats.setdefault("last_error", repr(exc)[:200])
+
+
+async def writer(session_maker, deadline: float, stats: dict, number: int) -> None:
+    i = number
+    while time.perf_counter() < deadline:
+        i += 1
+        start = time.perf_counter()
+        try:
+            async with DBManager(session_factory=session_maker) as db:
+                await BookingService(db).create_booking(
+                    user_id=1,
+                    booking_data=BookingCreate(flight_id=i % FLIGHTS + 1, **BOOKING),
+                )
+            stats["write_latency"].append((time.perf_counter() - start) * 1000)
+        except Exception as exc:
+            stats["errors"] += 1
+            stats.setdefault("last_error", repr(exc)[:200])
+
+
+async def run(name: str, path: str, tuned: bool, seconds: float, readers: int, writers: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    if tuned:
+        install_sqlite_pragmas(engine)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    await create_schema(engine)
+    await seed(session_maker)
+
+    # Последовательные короткие транзакции: здесь виден чистый выигрыш на fsync
+    commits = 500
+    async with session_maker() as session:
+        repo = FlightRepository(session)
+        start = time.perf_counter()
+        for i in range(commits):
+            await repo.reserve_seats(i % FLIGHTS + 1, 1)
+            await session.commit()
+        commit_ms = (time.perf_counter() - start) / commits * 1000
+
+    stats = {"read_latency": [], "write_latency": [], "errors": 0}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(
+        *(reader(session_maker, deadline, stats) for _ in range(readers)),
+        *(writer(session_maker, deadline, stats, n * 1000) for n in range(writers)),
+    )
+    await engine.dispose()
+
+    reads, writes = stats["read_latency"], stats["write_latency"]
+    print(f"\n▶ {name}")
+    print(f"   короткая транзакция (UPDATE + COMMIT): {commit_ms:.3f} мс")
+    print(f"   чтений: {len(reads) / seconds:7.1f}/c  p50 {percentile(reads, 50):6.1f} мс  "
+          f"p99 {percentile(reads, 99):6.1f} мс")
+    print(f"   записей: {len(writes) / seconds:6.1f}/c  p50 {percentile(writes, 50):6.1f} мс  "
+          f"p99 {percentile(writes, 99):6.1f} мс")
+    print(f"   ошибок: {stats['errors']} {stats.get('last_error', '')}")
+
+
+async def main(seconds: float, readers: int, writers: int) -> None:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    directory = os.path.dirname(DB_PATH)
+    print(f"читателей: {readers}, писателей: {writers}, {seconds:.0f} c на прогон")
+    await run("до: настройки SQLite по умолчанию", os.path.join(directory, "default.db"),
+              False, seconds, readers, writers)
+    await run(f"после: {settings.sqlite_pragmas}", os.path.join(directory, "tuned.db"),
+              True, seconds, readers, writers)
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:4]]
+    seconds, readers, writers = args + [10, 4, 4][len(args):]
+    asyncio.run(main(seconds, int(readers), int(writers)))
@@ -0,0 +1,201 @@
+"""
+🧾 Бенчмарк: одна транзакция на операцию брони/платежа
+
+Для каждой операции считает SQL-выражения, COMMIT-ы и задержку:
+  - до:    репозитории сами делают flush + commit + refresh (алгоритм
+           воспроизведен здесь же, поверх той же схемы)
+  - после: сервисы поверх DBManager, один commit и RETURNING вместо refresh
+
+Бенчмарк включает synchronous=FULL: тогда каждый COMMIT в WAL - это fsync,
+и число COMMIT-ов равно числу fsync на операцию.
+
+    python -m benchmarks.unit_of_work [iterations]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import create_schema, percentile, use_temp_database
+
+use_temp_database("unit_of_work")
+os.environ["SQLITE_SYNCHRONOUS"] = "FULL"
+
+from sqlalchemy import event, select  # noqa: E402
+
+from app.database.database import async_session_maker, engine  # noqa: E402
+from app.database.db_manager import DBManager  # noqa: E402
+from app.models.booking import BookingModel, BookingStatus, PaymentModel  # noqa: E402
+from app.models.flight import AirportModel, FlightModel  # noqa: E402
+from app.models.roles import RoleModel  # noqa: E402
+from app.models.users import UserModel  # noqa: E402
+from app.repositories.flight_repository import FlightRepository  # noqa: E402
+from app.schemes.bookings import BookingCreate  # noqa: E402
+from app.services.booking_service import BookingService, PaymentService  # noqa: E402
+from app.services.id_generator import id_generator  # noqa: E402
+
+BOOKING = BookingCreate(
+    flight_id=1,
+    passenger_name="Bench Passenger",
+    passenger_email="bench@example.com",
+    passenger_phone="+70000000000",
+    seats_count=1,
+)
+
+
+class Counters:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+    def on_statement(self, *args) -> None:
+        self.statements += 1
+
+    def on_commit(self, *args) -> None:
+        self.commits += 1
+
+
+async def seed() -> None:
+    async with async_session_maker() as session:
+        session.add_all([
+            AirportModel(code="MOW", name="Шереметьево", city="Москва", country="Россия"),
+            AirportModel(code="SPB", name="Пулково", city="Санкт-Петербург", country="Россия"),
+        ])
+        role = RoleModel(name="user")
+        session.add(role)
+        await session.flush()
+        session.add(UserModel(name="bench", email="bench@example.com",
+                              hashed_password="-", role_id=role.id))
+        session.add(FlightModel(
+            flight_number="BN-1", airline="Bench",
+            departure_airport_id=1, arrival_airport_id=2,
+            departure_time=datetime(2030, 1, 1, 10), arrival_time=datetime(2030, 1, 1, 12),
+            total_seats=10_000_000, available_seats=10_000_000, price=1000.0,
+        ))
+        await session.commit()
+
+
+# ---------- до: репозитории коммитят после каждой записи ----------
+
+async def _legacy_save(session, model):
+    await session.flush()
+    await session.commit()
+    await session.refresh(model)
+    return model
+
+
+async def _legacy_get(session, model, object_id):
+    result = await session.execute(select(model).where(model.id == object_id))
+    return result.scalars().first()
+
+
+async def legacy_create_booking(session) -> int:
+    flight_repo = FlightRepository(session)
+    price = await flight_repo.reserve_seats(1, BOOKING.seats_count)
+    booking = BookingModel(
+        user_id=1, flight_id=1, booking_number=id_generator.booking_number(),
+        passenger_name=BOOKING.passenger_name, passenger_email=BOOKING.passenger_email,
+        passenger_phone=BOOKING.passenger_phone, seats_count=BOOKING.seats_count,
+        total_price=price * BOOKING.seats_count, status=BookingStatus.PENDING,
+    )
+    session.add(booking)
+    return (await _legacy_save(session, booking)).id
+
+
+async def legacy_create_payment(session, booking_id: int) -> int:
+    booking = await _legacy_get(session, BookingModel, booking_id)
+    payment = PaymentModel(
+        booking_id=booking_id, amount=booking.total_price, payment_method="card",
+        transaction_id=id_generator.transaction_id(), status="pending",
+    )
+    session.add(payment)
+    return (await _legacy_save(session, payment)).id
+
+
+async def legacy_confirm_payment(session, payment_id: int) -> None:
+    payment = await _legacy_get(session, PaymentModel, payment_id)
+    payment.status = "completed"
+    await _legacy_save(session, payment)
+    booking = await _legacy_get(session, BookingModel, payment.booking_id)
+    booking.status = BookingStatus.CONFIRMED
+    await _legacy_save(session, booking)
+
+
+async def legacy_cancel_booking(session, booking_id: int) -> None:
+    booking = await _legacy_get(session, BookingModel, booking_id)
+    await FlightRepository(session).release_seats(booking.flight_id, booking.seats_count)
+    await session.commit()
+    booking = await _legacy_get(session, BookingModel, booking_id)
+    booking.status = BookingStatus.CANCELLED
+    await _legacy_save(session, booking)
+
+
+async def legacy_flow(session, stage: str, state: dict) -> None:
+    if stage == "create_booking":
+        state["booking_id"] = await legacy_create_booking(session)
+    elif stage == "create_payment":
+        state["payment_id"] = await legacy_create_payment(session, state["booking_id"])
+    elif stage == "confirm_payment":
+        await legacy_confirm_payment(session, state["payment_id"])
+    else:
+        await legacy_cancel_booking(session, state["booking_id"])
+
+
+# ---------- после: одна транзакция DBManager на операцию ----------
+
+async def uow_flow(db: DBManager, stage: str, state: dict) -> None:
+    if stage == "create_booking":
+        state["booking_id"] = (await BookingService(db).create_booking(1, BOOKING)).id
+    elif stage == "create_payment":
+        payment = await PaymentService(db).create_payment(state["booking_id"], {})
+        state["payment_id"] = payment.id
+    elif stage == "confirm_payment":
+        await PaymentService(db).confirm_payment(state["payment_id"])
+    else:
+        await BookingService(db).cancel_booking(state["booking_id"])
+
+
+STAGES = ("create_booking", "create_payment", "confirm_payment", "cancel_booking")
+
+
+async def measure(name: str, flow, open_scope, counters: Counters, iterations: int) -> None:
+    totals = {stage: [0, 0, []] for stage in STAGES}
+    for _ in range(iterations):
+        state: dict = {}
+        for stage in STAGES:
+            async with open_scope() as scope:
+                counters.statements = counters.commits = 0
+                start = time.perf_counter()
+                await flow(scope, stage, state)
+                elapsed = (time.perf_counter() - start) * 1000
+            totals[stage][0] += counters.statements
+            totals[stage][1] += counters.commits
+            totals[stage][2].append(elapsed)
+
+    print(f"\n▶ {name}")
+    for stage, (statements, commits, latencies) in totals.items():
+        print(f"   {stage:<16} SQL: {statements / iterations:4.1f}  "
+              f"COMMIT/fsync: {commits / iterations:3.1f}  "
+              f"p50: {percentile(latencies, 50):6.2f} мс  p99: {percentile(latencies, 99):6.2f} мс")
+
+
+async def main(iterations: int) -> None:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    await create_schema(engine)
+    await seed()
+
+    counters = Counters()
+    event.listen(engine.sync_engine, "before_cursor_execute", counters.on_statement)
+    event.listen(engine.sync_engine, "commit", counters.on_commit)
+
+    await measure("до: commit + refresh в каждом репозитории", legacy_flow,
+                  async_session_maker, counters, iterations)
+    await measure("после: unit of work (DBManager), RETURNING", uow_flow,
+                  lambda: DBManager(session_factory=async_session_maker), counters, iterations)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -11,14 +11,30 @@ from app.api.auth import router as auth_router
 from app.api.roles import router as role_router
 from app.api.flights import router as flights_router
 from app.api.bookings import router as bookings_router
+from app.api.metrics import router as metrics_router
 from app.admin import setup_admin
+from app.config import settings
 from app.database.base import Base
-from app.database.database import register_models
+from app.database.database import register_models, async_read_session_maker
 from app.database.init_db import init_database_sync
+from app.logging_config import log_subsystem
+from app.metrics import metrics, register_collectors
+from app.middleware import MetricsMiddleware, RequestStatsMiddleware
+from app.services.airport_cache import airport_cache
+from app.services.flight_availability import flight_availability
+from app.services.hold_sweeper import hold_sweeper
+from app.services.password_hasher import password_hasher
 
 # 🔥 Обязательно регистрируем модели сразу после импорта
 register_models()
 
+# Логи: уровни из настроек, запись в отдельном потоке через очередь
+log_subsystem.configure()
+
+# Метрики, которые на /metrics читают счетчики кэшей, пулов и очередей
+if settings.METRICS_ENABLED:
+    register_collectors()
+
 app = FastAPI(
     title="Крылья онлайн - Система бронирования авиа билетов",
     description="API для системы бронирования авиа билетов",
@@ -29,6 +45,7 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     """🚀 Обработчик стартупа приложения"""
+    log_subsystem.start()
     print("""
 ╯───────────────────────────────────────╮
 ╰───────── 💣 Крылья онлайн стартует... 💣 ─────────╯
@@ -40,10 +57,36 @@ async def startup_event():
     
     # Инициализируем БД (SYNC - для SQLite)
     init_database_sync()
+
+    # Загружаем справочник аэропортов в память
+    async with async_read_session_maker() as session:
+        await airport_cache.load(session)
+        # Read-модель рейсов (места, цены) для списка и поиска
+        await flight_availability.load(session)
+
+    # Фоновое снятие просроченных броней мест
+    hold_sweeper.start()
+    # Фоновая сверка read-модели рейсов с БД (изменения других воркеров)
+    flight_availability.start()
+
+    # Несколько воркеров: периодический снимок метрик в METRICS_DIR
+    if settings.METRICS_ENABLED:
+        metrics.start()
     
     print("✅ Приложение готово!\n")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """🛑 Обработчик остановки приложения"""
+    await hold_sweeper.stop()
+    await flight_availability.stop()
+    await metrics.stop()
+    password_hasher.shutdown()
+    # Дописываем то, что осталось в очереди логов
+    log_subsystem.stop()
+
+
 # ============== CORS CONFIGURATION ==============
 app.add_middleware(
     CORSMiddleware,
@@ -51,14 +94,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Разрешить все HTTP методы
     allow_headers=["*"],  # Разрешить все заголовки
+    # Курсор следующей страницы рейсов и offset следующей страницы броней
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "Server-Timing"],
 )
 
+# Профиль каждого запроса: Server-Timing и итоговая строка лога (время, SQL, строки)
+if settings.LOG_REQUESTS or settings.SERVER_TIMING:
+    app.add_middleware(
+        RequestStatsMiddleware,
+        server_timing=settings.SERVER_TIMING,
+        log_requests=settings.LOG_REQUESTS,
+    )
+
+# Метрики HTTP: внешний слой, время запроса включает профилирование выше
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Подключаем все роутеры
 app.include_router(sample_router)
 app.include_router(auth_router)
 app.include_router(role_router)
 app.include_router(flights_router)
 app.include_router(bookings_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 # ============== SQLADMIN SETUP ==============
 try:
@@ -0,0 +1,34 @@
+"""add flights route/departure composite index
+
+Revision ID: 3b7e1c9a4d2f
+Revises: 8019d75e3d9f
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1c9a4d2f'
+down_revision: Union[str, Sequence[str], None] = '8019d75e3d9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_flights_route_departure',
+        'flights',
+        ['departure_airport_id', 'arrival_airport_id', 'departure_time'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_flights_route_departure', table_name='flights', if_exists=True)
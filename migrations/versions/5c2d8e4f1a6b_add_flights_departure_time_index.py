@@ -0,0 +1,36 @@
+"""add flights departure_time index for keyset pagination
+
+Revision ID: 5c2d8e4f1a6b
+Revises: 3b7e1c9a4d2f
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e4f1a6b'
+down_revision: Union[str, Sequence[str], None] = '3b7e1c9a4d2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # В SQLite вторичный индекс неявно заканчивается rowid (= flights.id),
+    # поэтому он покрывает сортировку ORDER BY departure_time, id
+    op.create_index(
+        op.f('ix_flights_departure_time'),
+        'flights',
+        ['departure_time'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_flights_departure_time'), table_name='flights', if_exists=True)
@@ -0,0 +1,42 @@
+"""add bookings indexes for filtered listing
+
+Revision ID: 7a4f2b9c6e1d
+Revises: 5c2d8e4f1a6b
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f2b9c6e1d'
+down_revision: Union[str, Sequence[str], None] = '5c2d8e4f1a6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f('ix_bookings_flight_id'), 'bookings', ['flight_id'], unique=False, if_not_exists=True
+    )
+    op.create_index(
+        op.f('ix_bookings_user_id'), 'bookings', ['user_id'], unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_bookings_status_created_at',
+        'bookings',
+        ['status', 'created_at'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_status_created_at', table_name='bookings', if_exists=True)
+    op.drop_index(op.f('ix_bookings_user_id'), table_name='bookings', if_exists=True)
+    op.drop_index(op.f('ix_bookings_flight_id'), table_name='bookings', if_exists=True)
@@ -0,0 +1,45 @@
+"""add flight_seats table for seat-level inventory
+
+Revision ID: 9d3e5a7b2c4f
+Revises: 7a4f2b9c6e1d
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3e5a7b2c4f'
+down_revision: Union[str, Sequence[str], None] = '7a4f2b9c6e1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'flight_seats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('flight_id', sa.Integer(), nullable=False),
+        sa.Column('seat_number', sa.Integer(), nullable=False),
+        sa.Column('booking_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ),
+        sa.ForeignKeyConstraint(['flight_id'], ['flights.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('flight_id', 'seat_number', name='uq_flight_seats_flight_seat'),
+        if_not_exists=True,
+    )
+    op.create_index(
+        op.f('ix_flight_seats_booking_id'), 'flight_seats', ['booking_id'], unique=False, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_flight_seats_booking_id'), table_name='flight_seats', if_exists=True)
+    op.drop_table('flight_seats', if_exists=True)
@@ -0,0 +1,31 @@
+"""backfill flight_seats for existing bookings
+
+Revision ID: b6f1c3d8e2a7
+Revises: 9d3e5a7b2c4f
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.database.seat_backfill import backfill_flight_seats
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f1c3d8e2a7'
+down_revision: Union[str, Sequence[str], None] = '9d3e5a7b2c4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Брони, созданные до таблицы flight_seats, получают первые свободные места рейса
+    backfill_flight_seats(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Данные: места остаются за бронями, таблицу удаляет предыдущая ревизия
+    pass
@@ -0,0 +1,35 @@
+"""drop flights route/departure composite index
+
+Revision ID: c4a9e7f2d1b3
+Revises: b6f1c3d8e2a7
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a9e7f2d1b3'
+down_revision: Union[str, Sequence[str], None] = 'b6f1c3d8e2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Поиск рейсов идет по read-модели в памяти - индекс только замедлял запись
+    op.drop_index('ix_flights_route_departure', table_name='flights', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_flights_route_departure',
+        'flights',
+        ['departure_airport_id', 'arrival_airport_id', 'departure_time'],
+        unique=False,
+        if_not_exists=True,
+    )
@@ -0,0 +1,54 @@
+"""
+🧪 Общая настройка тестов
+
+Приложение читает settings при импорте, поэтому временная SQLite-база
+назначается здесь - до того, как тестовые модули импортируют app и main.
+"""
+import itertools
+import os
+import sqlite3
+import tempfile
+
+os.environ["DB_NAME"] = os.path.join(tempfile.mkdtemp(prefix="tests_"), "test.db")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+_flight_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Приложение целиком (startup: init_db, кэши); фоновые задачи остановлены"""
+    from app.services.flight_availability import flight_availability
+    from app.services.hold_sweeper import hold_sweeper
+    from main import app
+
+    with TestClient(app) as client:
+        client.portal.call(hold_sweeper.stop)
+        client.portal.call(flight_availability.stop)
+        yield client
+
+
+@pytest.fixture
+def db():
+    """Прямое соединение с тестовой БД - как у другого процесса или старых данных"""
+    connection = sqlite3.connect(os.environ["DB_NAME"])
+    yield connection
+    connection.close()
+
+
+def insert_flight(db: sqlite3.Connection, total_seats: int = 12, available_seats: int | None = None, **fields) -> int:
+    """Рейс в обход API (FK: аэропорты 1 и 2 создает init_db)"""
+    row = {
+        "flight_number": f"DB-{next(_flight_numbers)}", "airline": "Test", "departure_airport_id": 1, "arrival_airport_id": 2,
+        "departure_time": "2030-01-01 10:00:00", "arrival_time": "2030-01-01 12:00:00",
+        "total_seats": total_seats,
+        "available_seats": total_seats if available_seats is None else available_seats,
+        "price": 1000.0,
+    } | fields
+    cursor = db.execute(
+        f"INSERT INTO flights ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", tuple(row.values())
+    )
+    db.commit()
+    return cursor.lastrowid
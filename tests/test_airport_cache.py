@@ -0,0 +1,33 @@
+"""🗺️ Справочник аэропортов: кэш и подсказки меняются только после коммита"""
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.airport_cache import airport_cache
+from app.services.airport_suggest import airport_suggest
+
+
+def failing_commit():
+    return mock.patch.object(AsyncSession, "commit", side_effect=RuntimeError("commit failed"))
+
+
+def test_failed_create_leaves_no_phantom_airport(client):
+    client.get("/flights/airports/")
+    with failing_commit():
+        response = client.post("/flights/airports", json={"code": "PHN", "name": "Phantom", "city": "Nowhere", "country": "X"})
+        assert response.status_code == 500
+    assert airport_cache.get_by_code("PHN") is None
+    assert client.get("/flights/airports/suggest", params={"q": "phan"}).json() == []
+    # Повторная попытка не упирается в несуществующий дубликат
+    response = client.post("/flights/airports", json={"code": "PHN", "name": "Phantom", "city": "Nowhere", "country": "X"})
+    assert response.status_code == 201
+
+
+def test_failed_delete_keeps_airport(client):
+    airport_id = client.post("/flights/airports", json={"code": "KPA", "name": "Kept", "city": "Here", "country": "X"}).json()["id"]
+    with failing_commit():
+        assert client.delete(f"/flights/airports/{airport_id}").status_code == 500
+    assert airport_cache.get_by_id(airport_id) is not None
+    assert [airport.code for airport in airport_suggest.suggest("kept")] == ["KPA"]
+    assert client.delete(f"/flights/airports/{airport_id}").status_code == 204
+    assert airport_cache.get_by_id(airport_id) is None
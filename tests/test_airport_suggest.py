@@ -0,0 +1,57 @@
+"""🔎 Автодополнение аэропортов по префиксу"""
+import pytest
+
+from app.schemes.flights import AirportRead
+from app.services.airport_cache import AirportCache
+from app.services.airport_suggest import AirportSuggestIndex
+
+AIRPORTS = [
+    AirportRead(id=1, code="SVO", name="Шереметьево", city="Москва", country="Россия"),
+    AirportRead(id=2, code="LED", name="Международный аэропорт Пулково", city="Санкт-Петербург", country="Россия"),
+    AirportRead(id=3, code="MRV", name="Минеральные Воды", city="Минеральные Воды", country="Россия"),
+    AirportRead(id=4, code="MOW", name="Все аэропорты", city="Москва", country="Россия"),
+]
+
+
+@pytest.fixture
+def index() -> AirportSuggestIndex:
+    cache = AirportCache()
+    for airport in AIRPORTS:
+        cache.put(airport)
+    return AirportSuggestIndex(cache)
+
+
+def codes(airports) -> list[str]:
+    return [airport.code for airport in airports]
+
+
+def test_prefix_by_code_city_and_name(index):
+    assert codes(index.suggest("svo")) == ["SVO"]
+    assert codes(index.suggest("m")) == ["MOW", "MRV"]
+    # Совпадение по городу выше совпадения по названию
+    assert codes(index.suggest("м")) == ["MRV", "SVO", "MOW", "LED"]
+    assert codes(index.suggest("москва")) == ["SVO", "MOW"]
+
+
+def test_any_word_case_and_yo(index):
+    assert codes(index.suggest("пулк")) == ["LED"]
+    assert codes(index.suggest("петерб")) == ["LED"]
+    assert codes(index.suggest("ШЕРЁМ")) == ["SVO"]
+    assert codes(index.suggest("  воды ")) == ["MRV"]
+
+
+def test_limit_and_empty(index):
+    assert len(index.suggest("м", limit=1)) == 1
+    assert index.suggest("   ") == []
+    assert index.suggest("xyz") == []
+
+
+def test_rebuilds_after_cache_change(index):
+    index.suggest("п")
+    index.cache.put(AirportRead(id=5, code="KZN", name="Казань", city="Казань", country="Россия"))
+    assert codes(index.suggest("каз")) == ["KZN"]
+    index.cache.remove(2)
+    assert index.suggest("пулк") == []
+    assert index.builds == 3
+    index.suggest("каз")
+    assert index.builds == 3
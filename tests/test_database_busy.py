@@ -0,0 +1,65 @@
+"""🔒 Транзакции записи и ответ на занятую БД"""
+import os
+import sqlite3
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+
+from app.database.database import async_session_maker, is_database_busy
+from app.services.booking_service import BookingService
+
+BOOKING = {
+    "flight_id": 1,
+    "passenger_name": "Test Passenger",
+    "passenger_email": "test@example.com",
+    "passenger_phone": "+70000000000",
+    "seats_count": 1,
+}
+
+
+def test_write_transaction_takes_lock_at_begin(client):
+    """Даже первый SELECT транзакции записи уже держит блокировку записи"""
+    other = sqlite3.connect(os.environ["DB_NAME"], timeout=0, isolation_level=None, check_same_thread=False)
+
+    async def scenario():
+        async with async_session_maker() as session:
+            await session.execute(text("SELECT 1"))
+            with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+                other.execute("BEGIN IMMEDIATE")
+            await session.rollback()
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("ROLLBACK")
+
+    try:
+        client.portal.call(scenario)
+    finally:
+        other.close()
+
+
+def test_is_database_busy():
+    assert is_database_busy(OperationalError("UPDATE", {}, sqlite3.OperationalError("database is locked")))
+    assert is_database_busy(PoolTimeoutError("QueuePool limit reached"))
+    assert not is_database_busy(OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: x")))
+    assert not is_database_busy(ValueError("database is locked"))
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        OperationalError("UPDATE", {}, sqlite3.OperationalError("database is locked")),
+        PoolTimeoutError("QueuePool limit reached"),
+    ],
+)
+def test_busy_database_returns_503(client, error):
+    with mock.patch.object(BookingService, "create_booking", side_effect=error):
+        response = client.post("/bookings/", json=BOOKING)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_other_errors_stay_500(client):
+    error = OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: x"))
+    with mock.patch.object(BookingService, "create_booking", side_effect=error):
+        assert client.post("/bookings/", json=BOOKING).status_code == 500
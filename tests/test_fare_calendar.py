@@ -0,0 +1,56 @@
+"""📅 Календарь низких цен по маршрутам и дням"""
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.fare_calendar import FareCalendar
+from app.services.flight_availability import FlightAvailabilityView
+
+DAY = date(2030, 2, 10)
+
+
+def flight(flight_id, price, seats=10, day=DAY, route=(1, 2)):
+    departure_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=9)
+    return SimpleNamespace(
+        id=flight_id, flight_number=f"FC-{flight_id}", airline="Test",
+        departure_airport_id=route[0], arrival_airport_id=route[1],
+        departure_time=departure_time, arrival_time=departure_time + timedelta(hours=2),
+        total_seats=10, available_seats=seats, price=price,
+    )
+
+
+def calendar_with(*flights) -> tuple[FlightAvailabilityView, FareCalendar]:
+    view = FlightAvailabilityView()
+    for item in flights:
+        view.put_flight(item)
+    return view, FareCalendar(view)
+
+
+def day_of(calendar: FareCalendar, day: date = DAY, route=(1, 2)):
+    return dict(calendar.month(*route, day.year, day.month))[day]
+
+
+def test_month_min_price_skips_sold_out():
+    _, calendar = calendar_with(flight(1, 300.0), flight(2, 200.0), flight(3, 50.0, seats=0))
+    days = calendar.month(1, 2, 2030, 2)
+    assert [day for day, _ in days] == [date(2030, 2, number) for number in range(1, 29)]
+    fare = day_of(calendar)
+    assert (fare.min_price, fare.available_seats, fare.flights) == (200.0, 20, 3)
+    assert sum(fare is not None for _, fare in days) == 1
+    assert calendar.month(2, 1, 2030, 2)[9][1] is None
+
+
+def test_cell_updates_in_place():
+    view, calendar = calendar_with(flight(1, 300.0), flight(2, 200.0))
+    calendar.month(1, 2, 2030, 2)
+
+    view.apply(2, available=-10)
+    assert day_of(calendar).min_price == 300.0
+    view.put_flight(flight(1, 150.0))
+    assert day_of(calendar).min_price == 150.0
+    # Перенос рейса на другой день пересчитывает обе ячейки
+    view.put_flight(flight(1, 150.0, day=DAY + timedelta(days=1)))
+    assert day_of(calendar).min_price is None
+    assert day_of(calendar, DAY + timedelta(days=1)).min_price == 150.0
+    view.remove_flight(2)
+    assert day_of(calendar) is None
+    assert calendar.builds == 1
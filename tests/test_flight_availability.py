@@ -0,0 +1,49 @@
+"""📋 Read-модель рейсов: изменения видны только после коммита"""
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.flight_availability import flight_availability
+
+FLIGHT = {
+    "flight_number": "FA-1",
+    "airline": "Test",
+    "departure_airport_id": 1,
+    "arrival_airport_id": 2,
+    "departure_time": "2030-02-01T10:00:00",
+    "arrival_time": "2030-02-01T12:00:00",
+    "total_seats": 100,
+    "available_seats": 100,
+    "price": 1000.0,
+}
+
+
+def failing_commit():
+    return mock.patch.object(AsyncSession, "commit", side_effect=RuntimeError("commit failed"))
+
+
+def test_failed_create_does_not_touch_view(client):
+    client.get("/flights/")
+    loads = flight_availability.loads
+    with failing_commit():
+        assert client.post("/flights/", json=FLIGHT).status_code == 500
+    assert all(flight.flight_number != FLIGHT["flight_number"] for flight in flight_availability.flights())
+    # Модель не сбрасывается целиком
+    assert flight_availability.loaded and flight_availability.loads == loads
+
+
+def test_failed_update_and_delete_keep_flight(client):
+    flight_id = client.post("/flights/", json=FLIGHT | {"flight_number": "FA-2"}).json()["id"]
+    with failing_commit():
+        assert client.put(f"/flights/{flight_id}", json={"price": 1.0}).status_code == 500
+        assert client.delete(f"/flights/{flight_id}").status_code == 500
+    assert flight_availability.get(flight_id).price == FLIGHT["price"]
+
+
+def test_committed_changes_reach_view(client):
+    flight_id = client.post("/flights/", json=FLIGHT | {"flight_number": "FA-3"}).json()["id"]
+    assert flight_availability.get(flight_id) is not None
+    assert client.put(f"/flights/{flight_id}", json={"price": 2000.0}).status_code == 200
+    assert flight_availability.get(flight_id).price == 2000.0
+    assert client.delete(f"/flights/{flight_id}").status_code == 204
+    assert flight_availability.get(flight_id) is None
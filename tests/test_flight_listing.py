@@ -0,0 +1,40 @@
+"""📄 GET /flights/: страницы по курсору и поток NDJSON отдают одни и те же рейсы"""
+import orjson
+
+from app.services.flight_availability import flight_availability
+from tests.conftest import insert_flight
+
+
+def list_pages(client, limit: int) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        response = client.get("/flights/", params={"limit": limit} | ({"cursor": cursor} if cursor else {}))
+        assert response.status_code == 200
+        ids += [flight["id"] for flight in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return ids
+
+
+def stream(client, cursor: str | None = None) -> list[int]:
+    response = client.get("/flights/", params={"stream": "true"} | ({"cursor": cursor} if cursor else {}))
+    assert response.status_code == 200
+    return [orjson.loads(line)["id"] for line in response.text.splitlines()]
+
+
+def test_pages_and_stream_share_cursor(client, db):
+    # Одинаковое время вылета: порядок решает id
+    for _ in range(5):
+        insert_flight(db, departure_time="2031-05-05 08:00:00")
+    flight_availability.invalidate()
+
+    paged = list_pages(client, limit=2)
+    assert len(paged) == len(set(paged))
+    assert stream(client) == paged
+
+    first = client.get("/flights/", params={"limit": 3})
+    assert stream(client, first.headers["x-next-cursor"]) == paged[3:]
+
+
+def test_invalid_cursor(client):
+    assert client.get("/flights/", params={"cursor": "???"}).status_code == 400
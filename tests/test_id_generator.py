@@ -0,0 +1,112 @@
+"""🔢 Генератор номеров брони: уникальность, порядок, переполнение счетчика, fork"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from app.services.id_generator import (
+    ENCODED_LENGTH,
+    NODE_BITS,
+    PID_BITS,
+    SEQUENCE_BITS,
+    IdGenerator,
+    id_generator,
+)
+
+# Всего идентификаторов на все процессы; полный прогон на 10M:
+#   ID_GENERATOR_COUNT=10000000 python -m pytest tests/test_id_generator.py
+COUNT = int(os.environ.get("ID_GENERATOR_COUNT", "80000"))
+PROCESSES = 4
+
+fork = multiprocessing.get_context("fork")
+
+
+def timestamp(value: int) -> int:
+    return value >> (NODE_BITS + PID_BITS + SEQUENCE_BITS)
+
+
+def sequence(value: int) -> int:
+    return value & ((1 << SEQUENCE_BITS) - 1)
+
+
+def frozen_clock(monkeypatch, ticks):
+    """Подменяет часы: каждый вызов time_ns отдает следующую миллисекунду из ticks"""
+    ticks = iter(ticks)
+    current = [0]
+
+    def time_ns():
+        current[0] = next(ticks, current[0])
+        return current[0] * 1_000_000
+
+    monkeypatch.setattr(time, "time_ns", time_ns)
+
+
+def generate(count: int) -> list[int]:
+    return [id_generator.next_int() for _ in range(count)]
+
+
+def test_unique_and_ordered_across_processes():
+    with fork.Pool(PROCESSES) as pool:
+        batches = pool.map(generate, [COUNT // PROCESSES] * PROCESSES)
+
+    for batch in batches:
+        # Внутри процесса значения строго возрастают
+        assert all(a < b for a, b in zip(batch, batch[1:]))
+    values = [value for batch in batches for value in batch]
+    assert len(set(values)) == len(values)
+    # Строки сортируются так же, как числа
+    sample = sorted(values[::max(1, len(values) // 10_000)])
+    encoded = [IdGenerator.encode(value) for value in sample]
+    assert encoded == sorted(encoded)
+    assert {len(text) for text in encoded} == {ENCODED_LENGTH}
+
+
+def test_sequence_overflow_moves_to_next_millisecond(monkeypatch):
+    frozen_clock(monkeypatch, [1_000])
+    generator = IdGenerator()
+    values = [generator.next_int() for _ in range((1 << SEQUENCE_BITS) + 2)]
+
+    assert all(a < b for a, b in zip(values, values[1:]))
+    assert timestamp(values[(1 << SEQUENCE_BITS) - 1]) == 1_000
+    assert sequence(values[(1 << SEQUENCE_BITS) - 1]) == (1 << SEQUENCE_BITS) - 1
+    assert timestamp(values[1 << SEQUENCE_BITS]) == 1_001
+    assert sequence(values[1 << SEQUENCE_BITS]) == 0
+
+
+def test_clock_going_backwards_keeps_increasing(monkeypatch):
+    frozen_clock(monkeypatch, [5_000, 5_000, 4_000, 3_000, 5_001])
+    generator = IdGenerator()
+    values = [generator.next_int() for _ in range(5)]
+
+    assert all(a < b for a, b in zip(values, values[1:]))
+    # Пока часы отстают, идет счетчик той же "логической" миллисекунды
+    assert [timestamp(value) for value in values] == [5_000] * 4 + [5_001]
+    assert [sequence(value) for value in values] == [0, 1, 2, 3, 0]
+
+
+def child_state(generator: IdGenerator, queue) -> None:
+    # В родителе замок был захвачен в момент fork - без сброса здесь был бы deadlock
+    value = generator.next_int()
+    queue.put((generator._pid, os.getpid(), sequence(value)))
+
+
+def test_fork_resets_pid_and_lock():
+    generator = IdGenerator(node=3)
+    generator.next_int()
+    queue = fork.Queue()
+    with generator._lock:
+        process = fork.Process(target=child_state, args=(generator, queue))
+        process.start()
+    process.join(timeout=10)
+
+    assert process.exitcode == 0
+    child_pid_field, child_pid, child_sequence = queue.get(timeout=1)
+    assert child_pid_field == child_pid & ((1 << PID_BITS) - 1)
+    assert child_pid_field != generator._pid
+    assert child_sequence == 0
+
+
+def test_node_out_of_range():
+    with pytest.raises(ValueError):
+        IdGenerator(node=1 << NODE_BITS)
@@ -0,0 +1,87 @@
+"""📈 Метрики: потоковые шарды, гистограммы, сложение снимков воркеров"""
+import os
+import threading
+
+import orjson
+import pytest
+
+from app.metrics import Counter, Histogram, MetricsRegistry
+
+THREADS = 8
+PER_THREAD = 10_000
+# Больше pid_max в Linux (2**22) - такого процесса нет
+DEAD_PID = 1 << 23
+
+
+def run_in_threads(func) -> None:
+    """func в THREADS живых одновременно потоках (ident завершившегося потока переиспользуется)"""
+    barrier = threading.Barrier(THREADS)
+
+    def target():
+        func()
+        barrier.wait()
+
+    threads = [threading.Thread(target=target) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counter_shards_per_thread():
+    counter = Counter("test_total", "Test", ("kind",))
+
+    def work():
+        for _ in range(PER_THREAD):
+            counter.inc(("a",))
+        counter.inc(("b",), 2.5)
+
+    run_in_threads(work)
+    assert len(counter._shards) == THREADS
+    assert counter.samples() == {("a",): THREADS * PER_THREAD, ("b",): THREADS * 2.5}
+    counter.reset()
+    assert counter.samples() == {}
+
+
+def test_histogram_merges_buckets():
+    histogram = Histogram("test_seconds", "Test", buckets=(0.1, 1.0))
+
+    def work():
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+    run_in_threads(work)
+    # Корзины не накопительные: <= 0.1, <= 1.0, +Inf, затем сумма
+    assert histogram.samples() == {(): [2 * THREADS, THREADS, THREADS, pytest.approx(5.65 * THREADS)]}
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ("method",)).inc(("GET",), 3)
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1,)).observe(0.05)
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="GET"} 3.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1.0' in text
+    assert "latency_seconds_count 1.0" in text
+
+
+def write_snapshot(directory, pid: int, data: dict) -> None:
+    with open(os.path.join(directory, f"metrics_{pid}.json"), "wb") as file:
+        file.write(orjson.dumps(data))
+
+
+def test_collect_all_sums_workers(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    registry.counter("jobs_total", "Jobs").inc(amount=1)
+    registry.gauge("in_flight", "In flight").inc(amount=2)
+    registry.flush()
+    assert os.path.exists(tmp_path / f"metrics_{os.getpid()}.json")
+
+    # Живой воркер - все метрики; завершившийся - без gauge
+    write_snapshot(tmp_path, os.getppid(), {"jobs_total": [[[], 10.0]], "in_flight": [[[], 3.0]]})
+    write_snapshot(tmp_path, DEAD_PID, {"jobs_total": [[[], 100.0]], "in_flight": [[[], 50.0]]})
+    total = registry.collect_all()
+    assert total["jobs_total"] == {(): 111.0}
+    assert total["in_flight"] == {(): 5.0}
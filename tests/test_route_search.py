@@ -0,0 +1,69 @@
+"""🧭 Поиск маршрутов с пересадками по графу рейсов в памяти"""
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.flight_availability import FlightAvailabilityView
+from app.services.route_search import RouteSearchEngine
+
+DAY = date(2030, 3, 1)
+
+
+def flight(flight_id, departure_airport_id, arrival_airport_id, departs_at, hours=1, seats=10, price=100.0):
+    departure_time = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=departs_at)
+    return SimpleNamespace(
+        id=flight_id, flight_number=f"RS-{flight_id}", airline="Test",
+        departure_airport_id=departure_airport_id, arrival_airport_id=arrival_airport_id,
+        departure_time=departure_time, arrival_time=departure_time + timedelta(hours=hours),
+        total_seats=seats, available_seats=seats, price=price,
+    )
+
+
+@pytest.fixture
+def view():
+    view = FlightAvailabilityView()
+    view.put_flight(flight(1, 1, 2, 8, hours=2))   # прямой, прилет 10:00
+    view.put_flight(flight(2, 1, 3, 6))            # 1 -> 3, прилет 07:00
+    view.put_flight(flight(3, 3, 2, 8.5))          # 3 -> 2 через 90 мин, прилет 09:30
+    view.put_flight(flight(4, 3, 2, 7.5))          # 3 -> 2 через 30 мин, прилет 08:30
+    return view
+
+
+def ids(routes):
+    return [[leg.id for leg in legs] for legs in routes]
+
+
+def test_routes_sorted_by_arrival(view):
+    engine = RouteSearchEngine(view)
+    assert ids(engine.search(1, 2, DAY)) == [[2, 3], [1]]
+    assert ids(engine.search(1, 2, DAY, min_connection_minutes=30)) == [[2, 4], [2, 3], [1]]
+
+
+def test_max_stops_and_limit(view):
+    engine = RouteSearchEngine(view)
+    assert ids(engine.search(1, 2, DAY, max_stops=0)) == [[1]]
+    assert ids(engine.search(1, 2, DAY, limit=1)) == [[2, 3]]
+
+
+def test_no_routes(view):
+    engine = RouteSearchEngine(view)
+    assert engine.search(1, 1, DAY) == []
+    assert engine.search(2, 1, DAY) == []
+    assert engine.search(1, 2, DAY + timedelta(days=1)) == []
+
+
+def test_seats_filter_passengers(view):
+    engine = RouteSearchEngine(view)
+    assert engine.search(1, 2, DAY, passengers=11) == []
+    view.apply(3, available=-9)
+    assert ids(engine.search(1, 2, DAY, passengers=2)) == [[1]]
+
+
+def test_incremental_updates_without_rebuild(view):
+    engine = RouteSearchEngine(view)
+    engine.search(1, 2, DAY)
+    view.remove_flight(1)
+    view.put_flight(flight(5, 1, 2, 5, hours=1))
+    assert ids(engine.search(1, 2, DAY)) == [[5], [2, 3]]
+    assert engine.builds == 1
@@ -0,0 +1,77 @@
+"""💺 Карта мест: поиск соседних мест, выбор мест и согласованность со счетчиком рейса"""
+from app.services.seat_inventory import SeatMap, seat_label
+from tests.conftest import insert_flight
+
+BOOKING = {
+    "passenger_name": "Test Passenger",
+    "passenger_email": "test@example.com",
+    "passenger_phone": "+70000000000",
+}
+
+
+def test_seat_label():
+    assert [seat_label(n) for n in (1, 6, 7, 8)] == ["1A", "1F", "2A", "2B"]
+
+
+def test_find_adjacent_stays_within_row():
+    # В первом ряду свободны только 5 и 6 (1E, 1F), второй ряд свободен
+    seat_map = SeatMap(12, taken=[1, 2, 3, 4])
+    assert seat_map.find_adjacent(2) == 5
+    # 1E-1F-2A подряд по номерам, но это разные ряды
+    assert seat_map.find_adjacent(3) == 7
+    assert seat_map.find_adjacent(6) == 7
+
+
+def test_find_adjacent_none():
+    seat_map = SeatMap(12, taken=[2, 5, 8, 11])
+    assert seat_map.find_adjacent(3) is None
+    assert seat_map.find_adjacent(0) is None
+    assert seat_map.find_adjacent(7) is None
+
+
+def test_pick_prefers_adjacent_then_first_free():
+    seat_map = SeatMap(12, taken=[2, 5, 8, 11])
+    assert seat_map.pick(2) == [3, 4]
+    assert seat_map.pick(3) == [1, 3, 4]
+    assert seat_map.pick(9) is None
+
+
+def test_reserve_and_release():
+    seat_map = SeatMap(6)
+    seat_map.reserve([1, 2])
+    assert seat_map.free_count() == 4 and not seat_map.is_free(1)
+    seat_map.release([1, 2, 99])
+    assert seat_map.free_count() == 6
+
+
+def test_available_caps_free_seats():
+    # Продано 8 мест, строк в flight_seats только у двух - свободно ровно 4
+    seat_map = SeatMap(12, taken=[1, 2], available=4)
+    assert seat_map.free_count() == 4
+    assert seat_map.free_seats() == [3, 4, 5, 6]
+    assert SeatMap(12, available=0).pick(1) is None
+
+
+def test_seat_map_matches_available_seats(client, db):
+    """Места, проданные без строк flight_seats, карта не предлагает"""
+    flight_id = insert_flight(db, total_seats=12, available_seats=4)
+    assert client.get(f"/flights/{flight_id}/seats").json()["free_count"] == 4
+
+    response = client.post("/bookings/", json=BOOKING | {"flight_id": flight_id, "seats_count": 2})
+    assert response.status_code == 201
+    assert client.get(f"/flights/{flight_id}/seats").json()["free_count"] == 2
+
+    response = client.post("/bookings/", json=BOOKING | {"flight_id": flight_id, "seats_count": 3})
+    assert response.status_code == 400
+    assert db.execute("SELECT available_seats FROM flights WHERE id = ?", (flight_id,)).fetchone() == (2,)
+
+
+def test_no_overbooking(client, db):
+    flight_id = insert_flight(db, total_seats=6)
+    statuses = [
+        client.post("/bookings/", json=BOOKING | {"flight_id": flight_id, "seats_count": 2}).status_code
+        for _ in range(4)
+    ]
+    assert statuses == [201, 201, 201, 400]
+    seats = db.execute("SELECT seat_number FROM flight_seats WHERE flight_id = ?", (flight_id,)).fetchall()
+    assert sorted(seat for seat, in seats) == [1, 2, 3, 4, 5, 6]
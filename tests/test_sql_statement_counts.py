@@ -0,0 +1,130 @@
+"""
+🧮 Число SQL-запросов на каждый эндпоинт
+
+Запросы идут к приложению через TestClient, выполненные SQL-выражения
+считаются на обоих движках. Каждый случай сам создает нужные ему рейс и
+бронь (эти запросы не считаются) и проверяет точное число выражений:
+тест падает и при лишних запросах (например, вернулась каскадная
+selectin-загрузка аэропорт -> все рейсы), и когда ожидание устарело.
+"""
+import itertools
+import logging
+
+import pytest
+from sqlalchemy import event
+
+from app.database.database import engine, read_engine
+
+BOOKING = {
+    "passenger_name": "Test Passenger",
+    "passenger_email": "test@example.com",
+    "passenger_phone": "+70000000000",
+    "seats_count": 1,
+}
+FLIGHT = {
+    "airline": "Test",
+    "departure_airport_id": 1,
+    "arrival_airport_id": 2,
+    "departure_time": "2030-01-01T10:00:00",
+    "arrival_time": "2030-01-01T12:00:00",
+    "total_seats": 100,
+    "available_seats": 100,
+    "price": 1000.0,
+}
+
+_flight_numbers = itertools.count(1)
+
+
+def no_fixtures(client) -> dict:
+    return {}
+
+
+def flight(client) -> dict:
+    """Рейс через API - он сразу есть в read-модели"""
+    response = client.post("/flights/", json=FLIGHT | {"flight_number": f"SC-{next(_flight_numbers)}"})
+    assert response.status_code == 201, response.text
+    return {"flight_id": response.json()["id"]}
+
+
+def booked_flight(client) -> dict:
+    """Рейс с одной бронью (карта мест рейса уже загружена)"""
+    fixtures = flight(client)
+    response = client.post("/bookings/", json=BOOKING | {"flight_id": fixtures["flight_id"]})
+    assert response.status_code == 201, response.text
+    return fixtures | {"booking_id": response.json()["id"]}
+
+
+# (метод, путь, тело, фикстуры, точное число SQL-выражений);
+# транзакция записи начинается отдельным BEGIN IMMEDIATE - он тоже в счете
+CASES = [
+    # Список и поиск - из read-модели рейсов в памяти
+    ("GET", "/flights/", None, flight, 0),
+    ("GET", "/flights/?departure_airport_id=1&departure_date=2030-01-01", None, flight, 0),
+    ("GET", "/flights/{flight_id}", None, flight, 1),
+    ("GET", "/flights/airports/", None, no_fixtures, 0),
+    ("GET", "/flights/airports/1", None, no_fixtures, 0),
+    ("GET", "/flights/airports/suggest?q=%D1%88%D0%B5%D1%80", None, no_fixtures, 0),
+    # BEGIN + INSERT рейса + чтение рейса с аэропортами для ответа
+    ("POST", "/flights/", FLIGHT | {"flight_number": "SC-NEW"}, no_fixtures, 3),
+    ("PUT", "/flights/{flight_id}", {"price": 5000.0}, flight, 3),
+    # BEGIN + reserve_seats + INSERT брони + загрузка карты мест рейса + INSERT мест
+    ("POST", "/bookings/", BOOKING | {"flight_id": "{flight_id}"}, flight, 5),
+    ("GET", "/flights/{flight_id}/seats?adjacent=2", None, booked_flight, 0),
+    ("GET", "/flights/{flight_id}/availability", None, flight, 0),
+    ("GET", "/flights/routes?departure_airport_id=1&arrival_airport_id=2&departure_date=2030-01-01&max_stops=2", None, flight, 0),
+    ("GET", "/flights/calendar?from=1&to=2&month=2030-01", None, flight, 0),
+    ("GET", "/bookings/", None, booked_flight, 1),
+    ("GET", "/bookings/{booking_id}", None, booked_flight, 1),
+    ("DELETE", "/bookings/{booking_id}?is_admin=true", None, booked_flight, 5),
+    # Рейс с бронью: BEGIN и по одному DELETE на места, платежи, брони и сам рейс
+    ("DELETE", "/flights/{flight_id}", None, booked_flight, 5),
+    # Метрики - только счетчики в памяти
+    ("GET", "/metrics", None, no_fixtures, 0),
+]
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+@pytest.fixture
+def counter():
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    event.listen(read_engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+    event.remove(read_engine.sync_engine, "before_cursor_execute", counter)
+
+
+def fill(value, fixtures: dict):
+    """Подставляет id из фикстур; "{flight_id}" целиком заменяется самим значением"""
+    if isinstance(value, dict):
+        return {key: fill(item, fixtures) for key, item in value.items()}
+    if isinstance(value, str):
+        if value.startswith("{") and value.endswith("}") and value[1:-1] in fixtures:
+            return fixtures[value[1:-1]]
+        return value.format(**fixtures)
+    return value
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "body", "setup", "expected"),
+    CASES,
+    ids=[f"{method} {path}" for method, path, _, _, _ in CASES],
+)
+def test_statement_count(client, counter, method, path, body, setup, expected):
+    fixtures = setup(client)
+    # Справочник аэропортов и read-модель рейсов прогреты - в счет идет только сам запрос
+    client.get("/flights/airports/")
+    client.get("/flights/")
+
+    counter.count = 0
+    response = client.request(method, fill(path, fixtures), json=fill(body, fixtures))
+    assert response.status_code < 400, response.text
+    assert counter.count == expected, f"SQL: {counter.count} (ожидается {expected})"
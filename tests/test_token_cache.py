@@ -0,0 +1,49 @@
+"""🎟️ LRU-кэш декодированных JWT"""
+import time
+
+from app.services.token_cache import TokenClaimsCache
+
+NOW = 1_900_000_000.0
+
+
+def claims(user_id: int, ttl: float = 60) -> dict:
+    return {"sub": str(user_id), "exp": NOW + ttl}
+
+
+def test_hit_until_exp(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: NOW)
+    cache = TokenClaimsCache(max_size=10)
+    assert cache.get("a") is None
+    cache.put("a", claims(1))
+    assert cache.get("a") == claims(1)
+
+    # Как PyJWT без leeway: в момент exp токен уже недействителен
+    monkeypatch.setattr(time, "time", lambda: NOW + 60)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (0, 1, 2)
+
+
+def test_tokens_without_exp_not_cached(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: NOW)
+    cache = TokenClaimsCache(max_size=10)
+    cache.put("a", {"sub": "1"})
+    assert cache.get("a") is None
+    disabled = TokenClaimsCache(max_size=0)
+    disabled.put("a", claims(1))
+    assert disabled.get("a") is None
+
+
+def test_lru_eviction(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: NOW)
+    cache = TokenClaimsCache(max_size=2)
+    cache.put("a", claims(1))
+    cache.put("b", claims(2))
+    # Обращение освежает запись: вытесняется b, а не a
+    cache.get("a")
+    cache.put("c", claims(3))
+    assert cache.get("b") is None
+    assert cache.get("a") == claims(1)
+    assert cache.get("c") == claims(3)
+    cache.clear()
+    assert cache.stats()["size"] == 0